@@ -0,0 +1,352 @@
+#!/usr/bin/env python
+"""
+Benchmarks for python-webpack's hot paths.
+
+Builds are sent to a StubBuildServer, so neither node nor webpack-build are required.
+
+    python -m benchmarks.run
+    python -m benchmarks.run --output results.json
+    python -m benchmarks.run --compare results.json --threshold 0.1
+"""
+
+from __future__ import print_function
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import timeit
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BASE_DIR not in sys.path:
+    sys.path.insert(0, BASE_DIR)
+
+import webpack
+from webpack.stub_server import StubBuildServer
+
+MANIFEST_SIZES = (10, 1000, 100000)
+QUICK_MANIFEST_SIZES = (10, 1000)
+THREAD_COUNTS = (1, 8, 32)
+
+
+def summarize(timings):
+    """
+    Returns the statistics of a list of timings, in seconds.
+    """
+    timings = sorted(timings)
+    count = len(timings)
+    return {
+        'count': count,
+        'min': timings[0],
+        'max': timings[-1],
+        'mean': sum(timings) / count,
+        'median': timings[count // 2],
+        'p95': timings[min(count - 1, int(count * 0.95))],
+    }
+
+
+def measure(func, repeat=5, min_time=0.1):
+    """
+    Returns the statistics of the time taken by a call to `func`. Calls are batched so that each
+    repetition takes at least `min_time` seconds.
+    """
+    timer = timeit.Timer(func)
+    number = 1
+    while True:
+        if timer.timeit(number) >= min_time:
+            break
+        number *= 10
+
+    return dict(summarize([timing / number for timing in timer.repeat(repeat, number)]), number=number)
+
+
+class Environment(object):
+    """
+    The files, settings and stub server shared by the benchmarks.
+    """
+    def __init__(self, latency, size):
+        self.root = tempfile.mkdtemp()
+        self.config_file = os.path.join(self.root, 'webpack.config.js')
+        with open(self.config_file, 'w') as _file:
+            _file.write('module.exports = function() { return {}; };\n')
+        self.server = StubBuildServer(latency=latency, size=size, entries=3).start()
+        self.settings = {
+            'OUTPUT_ROOT': os.path.join(self.root, 'output'),
+            'STATIC_URL': '/static/',
+            'CONFIG_DIRS': (self.root,),
+            'BUILD_URL': self.server.url,
+            'RESULT_CACHE': True,
+        }
+        self.django = configure_django(self.settings)
+        if not self.django:
+            webpack.conf.settings.configure(**self.settings)
+
+    def close(self):
+        self.server.stop()
+        shutil.rmtree(self.root)
+
+
+def configure_django(settings):
+    try:
+        import django
+        from django.conf import settings as django_settings
+    except ImportError:
+        return False
+
+    django_settings.configure(
+        DEBUG=False,
+        SECRET_KEY='benchmarks',
+        ROOT_URLCONF=__name__,
+        ALLOWED_HOSTS=['*'],
+        INSTALLED_APPS=('webpack',),
+        TEMPLATES=[{'BACKEND': 'django.template.backends.django.DjangoTemplates'}],
+        MIDDLEWARE=(),
+        MIDDLEWARE_CLASSES=(),
+        WEBPACK=settings,
+    )
+    if hasattr(django, 'setup'):
+        django.setup()
+    return True
+
+
+def template_view(request):
+    from django.http import HttpResponse
+    from django.template import Context, Template
+
+    template = Template(
+        '{% load webpack %}{% webpack path as bundle %}{{ bundle.render_css|safe }}{{ bundle.render_js|safe }}'
+    )
+    return HttpResponse(template.render(Context({'path': request.GET['path']})))
+
+
+try:
+    from django.conf.urls import url
+except ImportError:
+    try:
+        from django.urls import re_path as url
+    except ImportError:
+        url = None
+
+urlpatterns = [url(r'^$', template_view)] if url else []
+
+
+def bench_generate_compiler_options(env):
+    from webpack.options import generate_compiler_options
+
+    context = {'foo': 'bar', 'nested': {'baz': [1, 2, 3]}}
+    yield 'generate_compiler_options', measure(lambda: generate_compiler_options(env.config_file, context))
+
+    counter = [0]
+
+    def uncached():
+        counter[0] += 1
+        generate_compiler_options(env.config_file, {'counter': counter[0]})
+
+    yield 'generate_compiler_options:uncached', measure(uncached)
+
+
+def bench_generate_key(env):
+    from webpack.manifest import generate_key
+
+    yield 'generate_key', measure(lambda: generate_key(env.config_file))
+    yield 'generate_key:context', measure(lambda: generate_key(env.config_file, {'foo': 'bar', 'baz': [1, 2]}))
+
+
+def bench_manifest_read(env, sizes=MANIFEST_SIZES):
+    from webpack.manifest import ManifestReader, write_manifest, generate_key
+
+    for size in sizes:
+        path = os.path.join(env.root, 'manifest_{}.json'.format(size))
+        manifest = {}
+        for i in range(size):
+            name = 'entry_{}'.format(i)
+            manifest[generate_key('config.js', {'entry': i})] = {
+                'urls': {name: {'js': ['/static/{}.js'.format(name)], 'css': ['/static/{}.css'.format(name)]}},
+            }
+        write_manifest(path, manifest)
+
+        yield 'manifest.load:{}'.format(size), measure(lambda: ManifestReader(path).load(), repeat=3)
+
+        reader = ManifestReader(path)
+        context = {'entry': size // 2}
+        reader.read('config.js', context)
+        yield 'manifest.read:{}'.format(size), measure(lambda: reader.read('config.js', context))
+
+        os.remove(path)
+
+
+def bench_render_js(env):
+    from webpack.bundle import WebpackBundle
+
+    urls = dict(
+        ('entry_{}'.format(i), {'js': ['/static/entry_{}.js'.format(i)], 'css': []}) for i in range(10)
+    )
+    bundle = WebpackBundle({'urls': urls})
+    yield 'render_js', measure(lambda: bundle.render_js())
+    yield 'render_js:entries', measure(lambda: bundle.render_js(entries=['entry_1', 'entry_2']))
+    yield 'render_js:defer', measure(lambda: bundle.render_js(mode='defer'))
+
+
+def bench_build_server(env, thread_counts=THREAD_COUNTS, builds=20):
+    from webpack.build_server import BuildServer
+
+    for thread_count in thread_counts:
+        build_server = BuildServer(env.server.url)
+        timings = []
+        errors = []
+        lock = threading.Lock()
+
+        def run(thread):
+            for i in range(builds):
+                # Distinct contexts prevent concurrent builds from sharing a request
+                context = {'thread': thread, 'build': i}
+                started = time.time()
+                try:
+                    build_server.build(env.config_file, context, None)
+                except Exception as e:
+                    with lock:
+                        errors.append(e)
+                    return
+                elapsed = time.time() - started
+                with lock:
+                    timings.append(elapsed)
+
+        threads = [threading.Thread(target=run, args=(thread,)) for thread in range(thread_count)]
+        started = time.time()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.time() - started
+
+        if errors:
+            raise errors[0]
+
+        result = summarize(timings)
+        result['threads'] = thread_count
+        result['throughput'] = len(timings) / elapsed
+        yield 'build_server.build:{}_threads'.format(thread_count), result
+
+
+def bench_template_tag(env):
+    if not env.django:
+        return
+
+    from django.test import Client
+
+    client = Client()
+    path = '/?path=' + env.config_file
+    try:
+        response = client.get(path)
+        if response.status_code != 200:
+            raise Exception('Unexpected response: {}'.format(response.status_code))
+    except Exception as e:
+        print('Skipping the template tag benchmark: {}'.format(e), file=sys.stderr)
+        return
+
+    yield 'template_tag', measure(lambda: client.get(path))
+
+
+# Benchmarks and the prefix of the names of their results
+BENCHMARKS = (
+    ('generate_compiler_options', bench_generate_compiler_options),
+    ('generate_key', bench_generate_key),
+    ('manifest', bench_manifest_read),
+    ('render_js', bench_render_js),
+    ('build_server', bench_build_server),
+    ('template_tag', bench_template_tag),
+)
+
+
+def get_commit():
+    try:
+        output = subprocess.check_output(('git', 'rev-parse', 'HEAD'), cwd=BASE_DIR, stderr=subprocess.STDOUT)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return output.decode('utf-8').strip()
+
+
+def run(names=None, quick=False, latency=0.001, size=16 * 1024):
+    env = Environment(latency, size)
+    results = {}
+    try:
+        for group, benchmark in BENCHMARKS:
+            if names and not any(group.startswith(name) or name.startswith(group) for name in names):
+                continue
+            kwargs = {}
+            if quick and benchmark is bench_manifest_read:
+                kwargs['sizes'] = QUICK_MANIFEST_SIZES
+            for name, result in benchmark(env, **kwargs):
+                if names and not any(name.startswith(prefix) for prefix in names):
+                    continue
+                results[name] = result
+                print('{:<45} {:>12.3f} us'.format(name, result['median'] * 1e6), file=sys.stderr)
+    finally:
+        env.close()
+
+    return {
+        'version': webpack.__version__,
+        'commit': get_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'timestamp': time.time(),
+        'stub_server': {'latency': latency, 'size': size},
+        'results': results,
+    }
+
+
+def compare(previous, current, threshold):
+    """
+    Prints the change in the median time of each benchmark and returns the names of the
+    benchmarks which are slower by more than `threshold`, as a fraction.
+    """
+    regressions = []
+    for name, result in sorted(current['results'].items()):
+        before = previous['results'].get(name, None)
+        if before is None:
+            continue
+        change = (result['median'] - before['median']) / before['median']
+        print('{:<45} {:>+8.1%}'.format(name, change))
+        if change > threshold:
+            regressions.append(name)
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark python-webpack')
+    parser.add_argument('names', nargs='*', help='Only run benchmarks with names starting with these prefixes')
+    parser.add_argument('--output', help='Write the results as JSON to a file, rather than stdout')
+    parser.add_argument('--compare', help='Compare the results to those in a previous output file')
+    parser.add_argument('--threshold', type=float, default=0.1,
+                        help='Exit with an error if a benchmark is slower than the comparison by this fraction')
+    parser.add_argument('--quick', action='store_true', help='Skip the largest manifests')
+    parser.add_argument('--latency', type=float, default=0.001, help='Latency of the stub build server, in seconds')
+    parser.add_argument('--size', type=int, default=16 * 1024,
+                        help='Size of the stub build server\'s responses, in bytes')
+    args = parser.parse_args(argv)
+
+    results = run(args.names, args.quick, args.latency, args.size)
+
+    output = json.dumps(results, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, 'w') as _file:
+            _file.write(output)
+    else:
+        print(output)
+
+    if args.compare:
+        with open(args.compare, 'r') as _file:
+            previous = json.load(_file)
+        regressions = compare(previous, results, args.threshold)
+        if regressions:
+            print('Regressions: {}'.format(', '.join(regressions)), file=sys.stderr)
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
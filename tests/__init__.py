@@ -43,11 +43,11 @@ if 'webpack-build v' not in output:
 # Travis can take a while to boot the server up
 if os.environ.get('TRAVIS', None):
     for i in range(5):
-        if not build_server.is_running(True):
+        if not build_server.is_running(True, force=True):
             time.sleep(1)
 
 time.sleep(0.5)
-if not build_server.is_running():
+if not build_server.is_running(force=True):
     raise Exception(
         'The build server appears to have booted, but it is not responding at {} within the expected time period'.format(
             build_server.url
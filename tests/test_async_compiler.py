@@ -0,0 +1,121 @@
+import sys
+import time
+import unittest
+import warnings
+import mock
+from webpack.cache import ResultCache
+from webpack.exceptions import BundlingError, BuildServerConnectionError
+from .settings import ConfigFiles
+
+ASYNC_SUPPORTED = sys.version_info >= (3, 5)
+
+if ASYNC_SUPPORTED:
+    import asyncio
+    from webpack.async_compiler import AsyncBuildServer, webpack_async, webpack_many_async
+
+
+class SlowCompiler(object):
+    def __init__(self, delay=0):
+        self.delay = delay
+        self.calls = []
+        self.unavailable = False
+
+    def build(self, config_file, extra_context, setting_overrides):
+        self.calls.append((config_file, extra_context))
+        time.sleep(self.delay)
+        if config_file == '/broken':
+            raise BundlingError('Tried to build /broken')
+        if self.unavailable:
+            raise BuildServerConnectionError('Tried to send build request')
+        return config_file, extra_context
+
+    def is_running(self, debug=False, force=False):
+        return True
+
+
+def run(coroutine):
+    return asyncio.get_event_loop().run_until_complete(coroutine)
+
+
+class TestAsyncCompiler(unittest.TestCase):
+    # Prevent nose from running these tests on Python versions without async/await
+    __test__ = ASYNC_SUPPORTED
+
+    @classmethod
+    def setUpClass(cls):
+        asyncio.set_event_loop(asyncio.new_event_loop())
+
+    @classmethod
+    def tearDownClass(cls):
+        asyncio.get_event_loop().close()
+
+    def test_builds_can_be_awaited(self):
+        compiler = AsyncBuildServer(SlowCompiler())
+        self.assertTrue(run(compiler.is_running()))
+        bundle = run(webpack_async(ConfigFiles.BASIC_CONFIG, context={'foo': 'bar'}, compiler=compiler))
+        self.assertEqual(bundle, (ConfigFiles.BASIC_CONFIG, {'foo': 'bar'}))
+
+    def test_errors_are_raised_from_awaited_builds(self):
+        compiler = AsyncBuildServer(SlowCompiler())
+        self.assertRaises(BundlingError, run, webpack_async('/broken', compiler=compiler))
+
+    def test_awaited_builds_use_the_result_cache(self):
+        sync_compiler = SlowCompiler()
+        compiler = AsyncBuildServer(sync_compiler)
+        cache = ResultCache()
+        settings = {'RESULT_CACHE': True}
+
+        run(webpack_async(ConfigFiles.BASIC_CONFIG, settings=settings, compiler=compiler, cache=cache))
+        run(webpack_async(ConfigFiles.BASIC_CONFIG, settings=settings, compiler=compiler, cache=cache))
+        self.assertEqual(len(sync_compiler.calls), 1)
+
+    def test_multiple_builds_can_be_run_concurrently(self):
+        compiler = AsyncBuildServer(SlowCompiler(delay=0.2))
+
+        start = time.time()
+        bundles = run(webpack_many_async(
+            (
+                ConfigFiles.BASIC_CONFIG,
+                (ConfigFiles.LIBRARY_CONFIG, {'foo': 'bar'}),
+                ConfigFiles.MULTIPLE_BUNDLES_CONFIG,
+            ),
+            compiler=compiler,
+        ))
+        self.assertLess(time.time() - start, 0.5)
+
+        self.assertEqual(bundles, [
+            (ConfigFiles.BASIC_CONFIG, None),
+            (ConfigFiles.LIBRARY_CONFIG, {'foo': 'bar'}),
+            (ConfigFiles.MULTIPLE_BUNDLES_CONFIG, None),
+        ])
+
+    def test_multiple_builds_can_return_exceptions(self):
+        compiler = AsyncBuildServer(SlowCompiler())
+        bundles = run(webpack_many_async(
+            (ConfigFiles.BASIC_CONFIG, '/broken'),
+            compiler=compiler,
+            return_exceptions=True,
+        ))
+        self.assertEqual(bundles[0], (ConfigFiles.BASIC_CONFIG, None))
+        self.assertIsInstance(bundles[1], BundlingError)
+
+    def test_awaited_builds_can_compress_their_assets(self):
+        compiler = AsyncBuildServer(SlowCompiler())
+        with mock.patch('webpack.async_compiler._compress') as compress:
+            bundle = run(webpack_async(ConfigFiles.BASIC_CONFIG, settings={'COMPRESS_ASSETS': True}, compiler=compiler))
+        compress.assert_called_once_with(bundle, {'COMPRESS_ASSETS': True})
+
+    def test_awaited_builds_can_fall_back_to_the_last_successful_build(self):
+        sync_compiler = SlowCompiler()
+        compiler = AsyncBuildServer(sync_compiler)
+        fallback_cache = ResultCache()
+        kwargs = {'settings': {'BUILD_FALLBACK': True}, 'compiler': compiler, 'fallback_cache': fallback_cache}
+
+        bundle = run(webpack_async(ConfigFiles.BASIC_CONFIG, **kwargs))
+
+        sync_compiler.unavailable = True
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter('always')
+            self.assertEqual(run(webpack_async(ConfigFiles.BASIC_CONFIG, **kwargs)), bundle)
+
+        self.assertEqual(len(caught), 1)
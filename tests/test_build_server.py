@@ -0,0 +1,253 @@
+import json
+import socket
+import threading
+import time
+import unittest
+import mock
+import requests
+from optional_django.six.moves import BaseHTTPServer, socketserver
+from webpack.build_server import BuildServer
+from webpack.cache import SingleFlight
+from webpack.exceptions import BundlingError, BuildServerConnectionError, BuildServerTimeout, BuildServerUnavailable
+from webpack.health import CircuitBreaker, probe
+from .settings import ConfigFiles
+
+
+class SlowHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    delay = 0
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        self.rfile.read(length)
+        time.sleep(self.delay)
+        body = json.dumps({'error': 'Config file not defined', 'data': None}).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        self.server.connections.add(self.client_address)
+        self.server.requests += 1
+
+    def log_message(self, *args):
+        pass
+
+
+class ThreadedServer(socketserver.ThreadingMixIn, BaseHTTPServer.HTTPServer):
+    daemon_threads = True
+
+
+def start_server(delay=0):
+    handler = type('Handler', (SlowHandler,), {'delay': delay})
+    server = ThreadedServer(('127.0.0.1', 0), handler)
+    server.connections = set()
+    server.requests = 0
+    thread = threading.Thread(target=server.serve_forever)
+    thread.daemon = True
+    thread.start()
+    return server, 'http://127.0.0.1:{}/build'.format(server.server_address[1])
+
+
+def get_unused_port():
+    sock = socket.socket()
+    sock.bind(('127.0.0.1', 0))
+    port = sock.getsockname()[1]
+    sock.close()
+    return port
+
+
+class TestBuildServer(unittest.TestCase):
+    def test_connections_are_reused_between_requests(self):
+        server, url = start_server()
+        try:
+            build_server = BuildServer(url)
+            for i in range(5):
+                build_server.post()
+            self.assertEqual(len(server.connections), 1)
+            build_server.close()
+        finally:
+            server.shutdown()
+            server.server_close()
+
+    def test_sessions_are_per_thread_and_share_a_pool(self):
+        build_server = BuildServer('http://127.0.0.1:1/build')
+        sessions = []
+
+        def get_session():
+            sessions.append(build_server.get_session())
+
+        thread = threading.Thread(target=get_session)
+        thread.start()
+        thread.join()
+        get_session()
+
+        self.assertIsNot(sessions[0], sessions[1])
+        self.assertIs(sessions[0].get_adapter(build_server.url), sessions[1].get_adapter(build_server.url))
+        self.assertIs(build_server.get_session(), sessions[1])
+
+    def test_keep_alive_can_be_disabled(self):
+        build_server = BuildServer('http://127.0.0.1:1/build', keep_alive=False)
+        self.assertEqual(build_server.get_session().headers['Connection'], 'close')
+
+    def test_timeouts_can_be_configured(self):
+        build_server = BuildServer('http://127.0.0.1:1/build', connect_timeout=1, timeout=2)
+        self.assertEqual(build_server.get_timeout(), (1, 2))
+
+    def test_builds_raise_on_timeouts(self):
+        server, url = start_server(delay=1)
+        try:
+            build_server = BuildServer(url, timeout=0.1)
+            self.assertRaises(BuildServerTimeout, build_server.build, ConfigFiles.BASIC_CONFIG, None, None)
+            self.assertFalse(build_server.is_running())
+        finally:
+            server.shutdown()
+            server.server_close()
+
+    def test_builds_raise_on_connection_errors(self):
+        build_server = BuildServer('http://127.0.0.1:{}/build'.format(get_unused_port()))
+        self.assertRaises(BuildServerConnectionError, build_server.build, ConfigFiles.BASIC_CONFIG, None, None)
+        self.assertFalse(build_server.is_running())
+
+    def test_concurrent_identical_builds_share_a_request(self):
+        server, url = start_server(delay=0.2)
+        try:
+            build_server = BuildServer(url)
+            errors = []
+
+            def build():
+                try:
+                    build_server.build(ConfigFiles.BASIC_CONFIG, None, None)
+                except BundlingError as e:
+                    errors.append(e)
+
+            threads = [threading.Thread(target=build) for i in range(5)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+            self.assertEqual(server.requests, 1)
+            self.assertEqual(len(errors), 5)
+            for error in errors:
+                self.assertIs(error, errors[0])
+        finally:
+            server.shutdown()
+            server.server_close()
+
+
+class TestSingleFlight(unittest.TestCase):
+    def test_concurrent_calls_with_the_same_key_share_a_result(self):
+        single_flight = SingleFlight()
+        calls = []
+        results = []
+
+        def func(value):
+            calls.append(value)
+            time.sleep(0.1)
+            return object()
+
+        def call(key):
+            results.append((key, single_flight.do(key, func, key)))
+
+        threads = [threading.Thread(target=call, args=(key,)) for key in ('a', 'a', 'a', 'b')]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(sorted(calls), ['a', 'b'])
+        shared = [result for key, result in results if key == 'a']
+        self.assertEqual(len(shared), 3)
+        self.assertTrue(all(result is shared[0] for result in shared))
+        self.assertNotIn('a', single_flight)
+
+    def test_calls_are_not_coalesced_once_complete(self):
+        single_flight = SingleFlight()
+        self.assertNotEqual(single_flight.do('a', object), single_flight.do('a', object))
+
+
+class TestHealth(unittest.TestCase):
+    def test_health_checks_are_cached(self):
+        server, url = start_server()
+        try:
+            build_server = BuildServer(url)
+            with mock.patch('webpack.health.probe', return_value=True) as probe:
+                self.assertTrue(build_server.is_running())
+                self.assertTrue(build_server.is_running())
+                self.assertEqual(probe.call_count, 1)
+                build_server.is_running(force=True)
+                self.assertEqual(probe.call_count, 2)
+            # Health checks do not send requests
+            self.assertEqual(server.requests, 0)
+        finally:
+            server.shutdown()
+            server.server_close()
+
+    def test_repeated_failures_open_the_circuit(self):
+        build_server = BuildServer('http://127.0.0.1:{}/build'.format(get_unused_port()))
+        build_server.breaker.threshold = 2
+        build_server.breaker.cooldown = 60
+
+        for i in range(2):
+            self.assertRaises(BuildServerConnectionError, build_server.build, ConfigFiles.BASIC_CONFIG, None, None)
+
+        with mock.patch.object(build_server, 'post') as post:
+            self.assertRaises(BuildServerUnavailable, build_server.build, ConfigFiles.BASIC_CONFIG, None, None)
+            self.assertFalse(post.called)
+
+    def test_the_circuit_closes_once_the_server_recovers(self):
+        server, url = start_server()
+        try:
+            build_server = BuildServer(url)
+            build_server.breaker.threshold = 1
+            build_server.breaker.cooldown = 0.1
+
+            with mock.patch.object(build_server, 'post', side_effect=requests.ConnectionError):
+                self.assertRaises(BuildServerConnectionError, build_server.build, ConfigFiles.BASIC_CONFIG, None, None)
+            self.assertRaises(BuildServerUnavailable, build_server.build, ConfigFiles.BASIC_CONFIG, None, None)
+
+            time.sleep(0.1)
+            self.assertRaises(BundlingError, build_server.build, ConfigFiles.BASIC_CONFIG, None, None)
+            self.assertEqual(build_server.breaker.state, CircuitBreaker.CLOSED)
+        finally:
+            server.shutdown()
+            server.server_close()
+
+    def test_unexpected_errors_during_a_trial_reopen_the_circuit(self):
+        server, url = start_server()
+        try:
+            build_server = BuildServer(url)
+            build_server.breaker.threshold = 1
+            build_server.breaker.cooldown = 0.1
+
+            with mock.patch.object(build_server, 'post', side_effect=requests.ConnectionError):
+                self.assertRaises(BuildServerConnectionError, build_server.build, ConfigFiles.BASIC_CONFIG, None, None)
+
+            time.sleep(0.1)
+            error = requests.exceptions.ChunkedEncodingError
+            with mock.patch.object(build_server, 'post', side_effect=error):
+                self.assertRaises(error, build_server.build, ConfigFiles.BASIC_CONFIG, None, None)
+            self.assertEqual(build_server.breaker.state, CircuitBreaker.OPEN)
+
+            # The next trial is allowed once the cooldown has elapsed
+            time.sleep(0.1)
+            self.assertRaises(BundlingError, build_server.build, ConfigFiles.BASIC_CONFIG, None, None)
+            self.assertEqual(build_server.breaker.state, CircuitBreaker.CLOSED)
+        finally:
+            server.shutdown()
+            server.server_close()
+
+    def test_failed_trials_reopen_the_circuit(self):
+        breaker = CircuitBreaker(threshold=1, cooldown=0)
+        breaker.record_failure()
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+        self.assertTrue(breaker.allow())
+        self.assertEqual(breaker.state, CircuitBreaker.HALF_OPEN)
+        # Only a single trial is allowed at a time
+        self.assertFalse(breaker.allow())
+        breaker.record_failure()
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+
+    def test_probes_detect_closed_ports(self):
+        self.assertFalse(probe('http://127.0.0.1:{}/build'.format(get_unused_port()), 1))
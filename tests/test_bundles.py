@@ -1,8 +1,9 @@
 import os
 import unittest
+import mock
 from webpack.bundle import WebpackBundle
 from webpack.compiler import webpack
-from webpack.exceptions import ConfigFileNotFound
+from webpack.exceptions import ConfigFileNotFound, EntryNotFound
 from webpack.conf import settings
 from .settings import ConfigFiles
 from .utils import clean_output_root, read_file
@@ -190,3 +191,157 @@ class TestBundles(unittest.TestCase):
         self.assertEqual(bundle.data['buildOptions']['context']['default_context'], 'test')
         self.assertIn('foo', bundle.data['buildOptions']['context'])
         self.assertEqual(bundle.data['buildOptions']['context']['foo'], 'bar')
+
+    def test_bundles_can_be_prerendered(self):
+        bundle = webpack(ConfigFiles.MULTIPLE_BUNDLES_CONFIG)
+        rendered = bundle.prerender()
+        self.assertEqual(rendered['js'], bundle.render_js())
+        self.assertEqual(rendered['css'], bundle.render_css())
+        urls = bundle.get_urls()
+        self.assertEqual(
+            rendered['entries']['bundle_1']['js'],
+            '<script src="' + urls['bundle_1']['js'][0] + '"></script>',
+        )
+        self.assertEqual(rendered['entries']['bundle_2']['css'], '')
+
+    def test_prerendered_bundles_return_the_stored_elements(self):
+        bundle = WebpackBundle(
+            {'urls': {'main': {'js': ['/static/main.js'], 'css': ['/static/main.css']}}},
+            rendered={'js': '<script>stored</script>', 'css': '<style>stored</style>', 'entries': {}},
+        )
+        self.assertEqual(bundle.render_js(), '<script>stored</script>')
+        self.assertEqual(bundle.render_css(), '<style>stored</style>')
+
+    def test_bundles_hold_their_output_compactly(self):
+        data = {
+            'urls': {
+                'one': {'js': ['/static/common.js', '/static/one.js'], 'css': []},
+                'two': {'js': ['/static/common.js', '/static/two.js'], 'css': []},
+            },
+            'assets': ['/root/common.js', '/root/one.js', '/root/two.js'],
+            'stats': {'hash': 'foo'},
+        }
+        bundle = WebpackBundle(data)
+
+        self.assertFalse(hasattr(bundle, '__dict__'))
+        self.assertEqual(bundle.data, data)
+        urls = bundle.get_urls()
+        self.assertIsInstance(urls['one']['js'], tuple)
+        self.assertIs(urls['one']['js'][0], urls['two']['js'][0])
+
+    def test_rendered_elements_are_memoized(self):
+        bundle = WebpackBundle({'urls': {'main': {'js': ['/static/main.js'], 'css': ['/static/main.css']}}})
+        self.assertIs(bundle.render_js(), bundle.render_js())
+        self.assertIs(bundle.render_css(), bundle.render_css())
+
+    def test_stats_can_be_loaded_lazily(self):
+        loader = mock.Mock(return_value={'hash': 'foo'})
+        bundle = WebpackBundle({'urls': {}}, stats_loader=loader)
+        self.assertFalse(loader.called)
+        self.assertEqual(bundle.data, {'urls': {}})
+        self.assertFalse(loader.called)
+        self.assertEqual(bundle.get_stats(), {'hash': 'foo'})
+        self.assertEqual(bundle.data, {'urls': {}, 'stats': {'hash': 'foo'}})
+        self.assertEqual(loader.call_count, 1)
+
+    def test_bundles_can_render_specific_entries(self):
+        bundle = webpack(ConfigFiles.MULTIPLE_BUNDLES_CONFIG)
+        urls = bundle.get_urls()
+
+        rendered = bundle.render_js('bundle_1')
+        self.assertEqual(rendered, '<script src="' + urls['bundle_1']['js'][0] + '"></script>')
+        self.assertEqual(bundle.render_js(['bundle_1', 'bundle_2']), bundle.render_js())
+
+        selected = bundle.select('bundle_2')
+        self.assertEqual(selected.render_js(), '<script src="' + urls['bundle_2']['js'][0] + '"></script>')
+        self.assertEqual(bundle.render_js(), bundle.render_js(['bundle_1', 'bundle_2']))
+
+        self.assertRaises(EntryNotFound, bundle.render_js, 'missing')
+
+    def test_chunks_shared_between_selected_entries_are_rendered_once(self):
+        bundle = WebpackBundle({
+            'urls': {
+                'one': {'js': ['/static/common.js', '/static/one.js'], 'css': ['/static/common.css']},
+                'two': {'js': ['/static/common.js', '/static/two.js'], 'css': ['/static/common.css']},
+                'three': {'js': ['/static/three.js'], 'css': []},
+            },
+        })
+        self.assertEqual(
+            bundle.render_js(['one', 'two']),
+            '\n'.join([
+                '<script src="/static/common.js"></script>',
+                '<script src="/static/one.js"></script>',
+                '<script src="/static/two.js"></script>',
+            ])
+        )
+        self.assertEqual(bundle.render_css(['two', 'one']), '<link rel="stylesheet" href="/static/common.css">')
+
+    def test_prerendered_bundles_can_render_specific_entries(self):
+        bundle = WebpackBundle(
+            {
+                'urls': {
+                    'main': {'js': ['/static/main.js'], 'css': []},
+                    'other': {'js': ['/static/other.js'], 'css': []},
+                },
+            },
+            rendered={'js': '', 'css': '', 'entries': {'main': {'js': '<script>stored</script>', 'css': ''}}},
+        )
+        self.assertEqual(bundle.select('main').render_js(), '<script>stored</script>')
+        self.assertEqual(bundle.render_js(['main', 'other']), (
+            '<script src="/static/main.js"></script>\n<script src="/static/other.js"></script>'
+        ))
+
+    def _create_bundle_with_shared_chunks(self, **kwargs):
+        return WebpackBundle({
+            'urls': {
+                'one': {'js': ['/static/common.js', '/static/one.js'], 'css': ['/static/one.css']},
+                'two': {'js': ['/static/common.js', '/static/two.js'], 'css': []},
+            },
+        }, **kwargs)
+
+    def test_scripts_can_be_rendered_with_async_or_defer(self):
+        bundle = self._create_bundle_with_shared_chunks()
+        self.assertEqual(
+            bundle.render_js('two', mode='defer'),
+            '<script src="/static/common.js" defer></script>\n<script src="/static/two.js" defer></script>'
+        )
+        self.assertEqual(bundle.select('one', js_mode='async').render_js(), (
+            '<script src="/static/common.js" async></script>\n<script src="/static/one.js" async></script>'
+        ))
+        self.assertRaises(ValueError, bundle.render_js, mode='blocking')
+        self.assertRaises(ValueError, bundle.select, js_mode='blocking')
+
+    def test_bundles_can_render_preload_hints(self):
+        bundle = self._create_bundle_with_shared_chunks()
+        self.assertEqual(bundle.render_preload('one'), '\n'.join([
+            '<link rel="preload" href="/static/one.css" as="style">',
+            '<link rel="preload" href="/static/common.js" as="script">',
+            '<link rel="preload" href="/static/one.js" as="script">',
+        ]))
+        self.assertEqual(bundle.select('two').render_modulepreload(), '\n'.join([
+            '<link rel="modulepreload" href="/static/common.js">',
+            '<link rel="modulepreload" href="/static/two.js">',
+        ]))
+
+    def test_bundles_can_prefetch_the_entries_that_are_not_selected(self):
+        bundle = self._create_bundle_with_shared_chunks()
+        self.assertEqual(bundle.render_prefetch(), '')
+        self.assertEqual(bundle.select('one').render_prefetch(), '<link rel="prefetch" href="/static/two.js">')
+        self.assertEqual(bundle.render_prefetch('one'), '\n'.join([
+            '<link rel="prefetch" href="/static/one.css">',
+            '<link rel="prefetch" href="/static/common.js">',
+            '<link rel="prefetch" href="/static/one.js">',
+        ]))
+
+    def test_resource_hints_can_be_prerendered(self):
+        bundle = self._create_bundle_with_shared_chunks()
+        rendered = bundle.prerender(('js:defer', 'preload'))
+        self.assertEqual(sorted(rendered.keys()), ['entries', 'js:defer', 'preload'])
+        self.assertEqual(rendered['entries']['one']['preload'], bundle.render_preload('one'))
+
+        rendered['entries']['one']['preload'] = '<stored>'
+        prerendered = self._create_bundle_with_shared_chunks(rendered=rendered)
+        self.assertEqual(prerendered.select('one').render_preload(), '<stored>')
+        self.assertEqual(prerendered.render_js(mode='defer'), bundle.render_js(mode='defer'))
+        # Renderers which were not prerendered fall back to rendering the urls
+        self.assertEqual(prerendered.render_js(), bundle.render_js())
@@ -0,0 +1,93 @@
+import gzip
+import os
+import shutil
+import tempfile
+import unittest
+import mock
+from webpack.compiler import webpack
+from webpack.compression import compress_assets, compress_file, get_available_encodings
+from webpack.conf import Conf
+from .settings import ConfigFiles, WEBPACK
+from .utils import clean_output_root, write_file
+
+
+class TestCompression(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.js = os.path.join(self.root, 'main.js')
+        write_file(self.js, 'var foo = "bar";\n' * 100)
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def configure(self, **kwargs):
+        settings = Conf()
+        settings.configure(**dict(WEBPACK, **kwargs))
+        return mock.patch('webpack.conf.settings', settings)
+
+    def test_files_are_compressed_alongside_the_original(self):
+        self.assertEqual(compress_file(self.js, ('gzip',)), [self.js + '.gz'])
+
+        with gzip.open(self.js + '.gz', 'rb') as gzip_file:
+            self.assertEqual(gzip_file.read().decode('utf-8'), 'var foo = "bar";\n' * 100)
+
+    def test_up_to_date_files_are_skipped(self):
+        compress_file(self.js, ('gzip',))
+        self.assertEqual(compress_file(self.js, ('gzip',)), [])
+
+        write_file(self.js, 'var foo = "woz";\n' * 100)
+        mtime = os.stat(self.js + '.gz').st_mtime
+        os.utime(self.js, (mtime + 10, mtime + 10))
+        self.assertEqual(compress_file(self.js, ('gzip',)), [self.js + '.gz'])
+
+    def test_incompressible_files_are_skipped(self):
+        write_file(self.js, 'a')
+        self.assertEqual(compress_file(self.js, ('gzip',)), [])
+        self.assertFalse(os.path.exists(self.js + '.gz'))
+
+    def test_assets_are_compressed_in_parallel(self):
+        paths = []
+        for i in range(4):
+            path = os.path.join(self.root, '{}.js'.format(i))
+            write_file(path, 'var foo = {};\n'.format(i) * 100)
+            paths.append(path)
+        # Unknown extensions and small files are ignored
+        write_file(os.path.join(self.root, 'image.png'), 'a' * 1000)
+        write_file(os.path.join(self.root, 'small.js'), 'a')
+        paths += [os.path.join(self.root, 'image.png'), os.path.join(self.root, 'small.js')]
+
+        with self.configure():
+            written = compress_assets(paths, workers=2, encodings=('gzip',))
+
+        self.assertEqual(written, sorted(path + '.gz' for path in paths[:4]))
+
+    def test_up_to_date_assets_do_not_start_a_pool(self):
+        paths = []
+        for i in range(2):
+            path = os.path.join(self.root, '{}.js'.format(i))
+            write_file(path, 'var foo = {};\n'.format(i) * 100)
+            paths.append(path)
+
+        with self.configure():
+            compress_assets(paths, workers=2, encodings=('gzip',))
+            with mock.patch('multiprocessing.Pool') as pool:
+                self.assertEqual(compress_assets(paths, workers=2, encodings=('gzip',)), [])
+        self.assertFalse(pool.called)
+
+    def test_brotli_is_only_available_if_installed(self):
+        with mock.patch('webpack.compression.brotli', None):
+            self.assertEqual(get_available_encodings(('gzip', 'br')), ('gzip',))
+
+    def test_builds_can_compress_their_assets(self):
+        clean_output_root()
+        with self.configure(COMPRESS_ASSETS=True, COMPRESS_ENCODINGS=('gzip',), COMPRESS_MIN_SIZE=0):
+            bundle = webpack(ConfigFiles.BASIC_CONFIG)
+        for path in bundle.get_assets():
+            self.assertTrue(os.path.exists(path + '.gz'))
+
+        # Each build is only compressed once per process
+        with self.configure(COMPRESS_ASSETS=True, COMPRESS_ENCODINGS=('gzip',), COMPRESS_MIN_SIZE=0):
+            with mock.patch('webpack.compression.compress_assets') as compress_assets:
+                webpack(ConfigFiles.BASIC_CONFIG)
+        self.assertFalse(compress_assets.called)
+        clean_output_root()
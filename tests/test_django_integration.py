@@ -7,15 +7,16 @@ from .settings import ConfigFiles
 from .utils import clean_output_root
 
 
-def render_template_tag(path):
+def render_template_tag(path, entries=None):
     from django.template import Template, Context
     template = Template("""
         {% load webpack %}
-        {% webpack path as bundle %}
+        {% webpack path entries=entries as bundle %}
         {{ bundle.render_js|safe }}
     """)
     return template.render(Context({
         'path': path,
+        'entries': entries,
     }))
 
 
@@ -47,9 +48,32 @@ class TestDjangoIntegration(unittest.TestCase):
         self.assertIn('bundle_1.js', rendered)
         self.assertIn('bundle_2.js', rendered)
 
+    def test_template_tag_can_render_specific_entries(self):
+        rendered = render_template_tag(ConfigFiles.MULTIPLE_BUNDLES_CONFIG, 'bundle_2')
+        self.assertNotIn('bundle_1.js', rendered)
+        self.assertIn('bundle_2.js', rendered)
+
+        rendered = render_template_tag(ConfigFiles.MULTIPLE_BUNDLES_CONFIG, 'bundle_1, bundle_2')
+        self.assertIn('bundle_1.js', rendered)
+        self.assertIn('bundle_2.js', rendered)
+
     def test_template_tag_raises_on_errors(self):
         self.assertRaises(
             ConfigFileNotFound,
             render_template_tag,
             '/non_existent_path',
         )
+
+    def test_assets_can_be_served_by_the_view(self):
+        from django.test import RequestFactory
+        from webpack.django_integration import serve
+
+        bundle = webpack(ConfigFiles.BASIC_CONFIG)
+        relative_url = bundle.get_urls()['main']['js'][0].split('/webpack_assets/')[-1]
+
+        response = serve(RequestFactory().get('/'), relative_url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('immutable', response['Cache-Control'])
+
+        response = serve(RequestFactory().get('/', HTTP_IF_NONE_MATCH=response['ETag']), relative_url)
+        self.assertEqual(response.status_code, 304)
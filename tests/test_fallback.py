@@ -0,0 +1,157 @@
+import threading
+import unittest
+import warnings
+import mock
+from webpack import cache as webpack_cache
+from webpack.cache import ResultCache
+from webpack.compiler import revalidator, webpack
+from webpack.exceptions import (
+    BuildServerConnectionError, BuildServerFallbackWarning, BuildServerTimeout, BundlingError, ManifestMissingEntry
+)
+from .settings import ConfigFiles
+
+
+class FlakyCompiler(object):
+    def __init__(self):
+        self.error = None
+
+    def build(self, config_file, extra_context, setting_overrides):
+        if self.error:
+            raise self.error
+        return object()
+
+
+class FakeManifest(object):
+    def __init__(self, bundles=None):
+        self.bundles = bundles or {}
+
+    def read(self, config_file, context):
+        try:
+            return self.bundles[config_file]
+        except KeyError:
+            raise ManifestMissingEntry(config_file)
+
+
+class TestFallback(unittest.TestCase):
+    def build(self, compiler, manifest=None, fallback_cache=None, **settings):
+        return webpack(
+            ConfigFiles.BASIC_CONFIG,
+            settings=dict(settings, BUILD_FALLBACK=settings.get('BUILD_FALLBACK', True)),
+            compiler=compiler,
+            manifest=manifest or FakeManifest(),
+            fallback_cache=fallback_cache if fallback_cache is not None else ResultCache(),
+        )
+
+    def test_errors_are_raised_without_a_fallback(self):
+        compiler = FlakyCompiler()
+        compiler.error = BuildServerConnectionError()
+        self.assertRaises(BuildServerConnectionError, self.build, compiler, BUILD_FALLBACK=False)
+        # Neither the manifest nor a previous build contain the config file
+        self.assertRaises(BuildServerConnectionError, self.build, compiler)
+
+    def test_the_last_successful_build_is_used_when_the_server_is_unavailable(self):
+        compiler = FlakyCompiler()
+        fallback_cache = ResultCache()
+        bundle = self.build(compiler, fallback_cache=fallback_cache)
+
+        compiler.error = BuildServerTimeout()
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter('always')
+            self.assertIs(self.build(compiler, fallback_cache=fallback_cache), bundle)
+
+        self.assertEqual(len(caught), 1)
+        self.assertTrue(issubclass(caught[0].category, BuildServerFallbackWarning))
+        self.assertIn('last successful build', str(caught[0].message))
+
+    def test_the_manifest_is_used_when_the_server_is_unavailable(self):
+        compiler = FlakyCompiler()
+        compiler.error = BuildServerConnectionError()
+        bundle = object()
+        manifest = FakeManifest({ConfigFiles.BASIC_CONFIG: bundle})
+
+        with warnings.catch_warnings(record=True):
+            warnings.simplefilter('always')
+            self.assertIs(self.build(compiler, manifest=manifest), bundle)
+
+    def test_build_errors_are_not_hidden(self):
+        compiler = FlakyCompiler()
+        fallback_cache = ResultCache()
+        self.build(compiler, fallback_cache=fallback_cache)
+
+        compiler.error = BundlingError()
+        self.assertRaises(BundlingError, self.build, compiler, fallback_cache=fallback_cache)
+
+
+class SequenceCompiler(object):
+    def __init__(self):
+        self.calls = 0
+        self.error = None
+        self.started = threading.Event()
+        self.release = threading.Event()
+        self.release.set()
+
+    def build(self, config_file, extra_context, setting_overrides):
+        self.started.set()
+        self.release.wait()
+        if self.error:
+            raise self.error
+        self.calls += 1
+        return self.calls
+
+
+class TestStaleWhileRevalidate(unittest.TestCase):
+    def setUp(self):
+        self.compiler = SequenceCompiler()
+        self.fallback_cache = ResultCache()
+
+    def tearDown(self):
+        self.compiler.release.set()
+        revalidator.wait()
+
+    def build(self, **settings):
+        return webpack(
+            ConfigFiles.BASIC_CONFIG,
+            settings=dict({'BUILD_STALE_WHILE_REVALIDATE': True}, **settings),
+            compiler=self.compiler,
+            fallback_cache=self.fallback_cache,
+        )
+
+    def test_previous_builds_are_returned_while_rebuilding_in_the_background(self):
+        self.assertEqual(self.build(), 1)
+
+        self.compiler.started.clear()
+        self.compiler.release.clear()
+        self.assertEqual(self.build(), 1)
+        self.assertTrue(self.compiler.started.wait(5))
+        # Rebuilds are not duplicated while one is in progress
+        self.assertEqual(self.build(), 1)
+
+        self.compiler.release.set()
+        revalidator.wait()
+        self.assertEqual(self.compiler.calls, 2)
+        self.assertEqual(self.build(), 2)
+
+    def test_builds_older_than_the_max_staleness_are_rebuilt_synchronously(self):
+        self.assertEqual(self.build(), 1)
+        with mock.patch('webpack.cache._clock', return_value=webpack_cache._clock() + 120):
+            self.assertEqual(self.build(BUILD_MAX_STALENESS=60), 2)
+
+    def test_the_mode_can_be_disabled_per_call(self):
+        self.assertEqual(self.build(), 1)
+        self.assertEqual(self.build(BUILD_STALE_WHILE_REVALIDATE=False), 2)
+
+    def test_failed_rebuilds_are_raised_by_the_next_call(self):
+        self.assertEqual(self.build(), 1)
+
+        self.compiler.error = BundlingError()
+        self.assertEqual(self.build(), 1)
+        revalidator.wait()
+        self.assertRaises(BundlingError, self.build)
+
+    def test_previous_builds_are_kept_while_the_server_is_unavailable(self):
+        self.assertEqual(self.build(), 1)
+
+        self.compiler.error = BuildServerConnectionError()
+        self.assertEqual(self.build(), 1)
+        revalidator.wait()
+        self.assertEqual(self.build(), 1)
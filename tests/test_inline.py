@@ -0,0 +1,87 @@
+import os
+import shutil
+import tempfile
+import unittest
+import mock
+from webpack.conf import Conf
+from webpack.bundle import WebpackBundle
+from webpack.inline import AssetContentCache, render_inline
+from .settings import WEBPACK
+from .utils import write_file
+
+
+class TestInline(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.js = os.path.join(self.root, 'main.js')
+        self.css = os.path.join(self.root, 'main.css')
+        write_file(self.js, 'var foo = "</script>";')
+        write_file(self.css, 'body { color: red; }')
+        self.bundle = WebpackBundle({
+            'urls': {'main': {'js': ['/static/main.js'], 'css': ['/static/main.css']}},
+            'output': {'main': {'js': [self.js], 'css': [self.css]}},
+        })
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def test_scripts_can_be_inlined(self):
+        self.assertEqual(self.bundle.render_js(mode='inline'), '<script>var foo = "<\\/script>";</script>')
+
+    def test_stylesheets_can_be_inlined(self):
+        self.assertEqual(self.bundle.render_css(mode='inline'), '<style>body { color: red; }</style>')
+        self.assertEqual(self.bundle.select(css_mode='inline').render_css(), self.bundle.render_css(mode='inline'))
+
+    def test_large_assets_are_referenced(self):
+        mock_settings = Conf()
+        mock_settings.configure(**dict(WEBPACK, INLINE_MAX_SIZE=5))
+
+        with mock.patch('webpack.conf.settings', mock_settings):
+            self.assertEqual(self.bundle.render_js(mode='inline'), '<script src="/static/main.js"></script>')
+            self.assertEqual(
+                self.bundle.render_css(mode='inline'),
+                '<link rel="stylesheet" href="/static/main.css">'
+            )
+
+    def test_missing_assets_are_referenced(self):
+        os.remove(self.js)
+        self.assertEqual(self.bundle.render_js(mode='inline'), '<script src="/static/main.js"></script>')
+
+    def test_non_utf8_assets_are_referenced(self):
+        with open(self.js, 'wb') as js_file:
+            js_file.write(b'var foo = "\xff";')
+        self.assertEqual(self.bundle.render_js(mode='inline'), '<script src="/static/main.js"></script>')
+
+    def test_unicode_content_can_be_inlined(self):
+        with open(self.js, 'wb') as js_file:
+            js_file.write(u'var foo = "\u2603";'.encode('utf-8'))
+        self.assertEqual(self.bundle.render_js(mode='inline'), u'<script>var foo = "\u2603";</script>')
+
+    def test_unknown_css_modes_raise(self):
+        self.assertRaises(ValueError, self.bundle.render_css, mode='defer')
+        self.assertRaises(ValueError, self.bundle.select, css_mode='defer')
+
+    def test_content_is_cached_until_the_file_changes(self):
+        cache = AssetContentCache()
+        self.assertEqual(
+            render_inline('css', '/static/main.css', self.css, cache=cache),
+            '<style>body { color: red; }</style>'
+        )
+
+        with mock.patch('io.open') as open_file:
+            render_inline('css', '/static/main.css', self.css, cache=cache)
+            self.assertFalse(open_file.called)
+
+        write_file(self.css, 'body { color: blue; }')
+        mtime = os.stat(self.css).st_mtime
+        os.utime(self.css, (mtime + 10, mtime + 10))
+        self.assertEqual(
+            render_inline('css', '/static/main.css', self.css, cache=cache),
+            '<style>body { color: blue; }</style>'
+        )
+
+    def test_cache_is_bounded(self):
+        cache = AssetContentCache(size=1)
+        cache.read(self.js, 1024)
+        cache.read(self.css, 1024)
+        self.assertEqual(len(cache._cache), 1)
@@ -0,0 +1,150 @@
+import os
+import shutil
+import tempfile
+import unittest
+import warnings
+import mock
+from webpack import instrumentation
+from webpack.build_server import BuildServer
+from webpack.bundle import WebpackBundle
+from webpack.conf import Conf
+from webpack.exceptions import BundlingError, EntryNotFound, ManifestMissingEntry, WebpackWarning
+from webpack.instrumentation import Metrics
+from webpack.manifest import ManifestReader, write_manifest
+from .settings import ConfigFiles, WEBPACK
+from .test_build_server import start_server
+
+
+def get_settings(**overrides):
+    settings = Conf()
+    settings.configure(**dict(WEBPACK, **overrides))
+    return settings
+
+
+class TestInstrumentation(unittest.TestCase):
+    def setUp(self):
+        self.before = []
+        self.after = []
+        instrumentation.before.connect(self.before.append)
+        instrumentation.after.connect(self.after.append)
+
+    def tearDown(self):
+        instrumentation.before.disconnect(self.before.append)
+        instrumentation.after.disconnect(self.after.append)
+
+    def test_events_are_not_created_when_nothing_is_observing(self):
+        self.tearDown()
+        self.assertIsNone(instrumentation.start('render'))
+        # Finishing a missing event is a no-op
+        instrumentation.finish(None)
+
+    def test_hooks_receive_builds(self):
+        server, url = start_server()
+        try:
+            build_server = BuildServer(url)
+            self.assertRaises(BundlingError, build_server.build, ConfigFiles.BASIC_CONFIG, None, None)
+        finally:
+            server.shutdown()
+            server.server_close()
+
+        self.assertEqual([event.name for event in self.before], ['build'])
+        event = self.after[0]
+        self.assertIs(event, self.before[0])
+        self.assertEqual(event.outcome, 'error')
+        self.assertIsInstance(event.error, BundlingError)
+        self.assertTrue(event.data['config_file'].endswith(ConfigFiles.BASIC_CONFIG))
+        self.assertTrue(event.data['hash'])
+        self.assertTrue(event.data['size'] > 0)
+        self.assertTrue(event.duration >= 0)
+
+    def test_hooks_receive_manifest_reads(self):
+        root = tempfile.mkdtemp()
+        try:
+            path = os.path.join(root, 'manifest.json')
+            write_manifest(path, {'foo': {'urls': {}}})
+            size = os.path.getsize(path)
+            reader = ManifestReader(path)
+            reader.read('foo', None)
+            self.assertRaises(ManifestMissingEntry, reader.read, 'bar', None)
+        finally:
+            shutil.rmtree(root)
+
+        events = [(event.name, event.outcome) for event in self.after]
+        self.assertEqual(events, [('manifest.load', 'success'), ('manifest.read', 'hit'), ('manifest.read', 'miss')])
+        self.assertEqual(self.after[0].data['entries'], 1)
+        self.assertEqual(self.after[0].data['size'], size)
+
+    def test_hooks_receive_renders(self):
+        bundle = WebpackBundle({'urls': {'main': {'js': ['/static/main.js'], 'css': ['/static/main.css']}}})
+        js = bundle.render_js(mode='defer')
+        css = bundle.render_css()
+
+        self.assertEqual([event.data['renderer'] for event in self.after], ['js', 'css'])
+        self.assertEqual(self.after[0].data['mode'], 'defer')
+        self.assertEqual(self.after[0].data['size'], len(js))
+        self.assertEqual(self.after[1].data['size'], len(css))
+
+    def test_hooks_receive_failed_renders(self):
+        bundle = WebpackBundle({'urls': {'main': {'js': ['/static/main.js'], 'css': ['/static/main.css']}}})
+        self.assertRaises(EntryNotFound, bundle.render_js, entries='missing')
+        self.assertRaises(EntryNotFound, bundle.render_css, entries='missing', mode='inline')
+
+        self.assertEqual([(event.data['renderer'], event.outcome) for event in self.after], [
+            ('js', 'error'), ('css', 'error')
+        ])
+        self.assertIsInstance(self.after[0].error, EntryNotFound)
+
+    def test_failing_hooks_only_warn(self):
+        def receiver(event):
+            raise ValueError('foo')
+
+        instrumentation.after.connect(receiver)
+        try:
+            with warnings.catch_warnings(record=True) as caught:
+                warnings.simplefilter('always')
+                bundle = WebpackBundle({'urls': {'main': {'js': ['/static/main.js']}}})
+                self.assertEqual(bundle.render_js(), '<script src="/static/main.js"></script>')
+        finally:
+            instrumentation.after.disconnect(receiver)
+
+        self.assertEqual(len(caught), 1)
+        self.assertTrue(issubclass(caught[0].category, WebpackWarning))
+        self.assertIn('foo', str(caught[0].message))
+
+
+class TestMetrics(unittest.TestCase):
+    def test_events_are_recorded_when_metrics_are_enabled(self):
+        metrics = Metrics()
+        bundle = WebpackBundle({'urls': {'main': {'js': ['/static/main.js']}}})
+
+        with mock.patch('webpack.instrumentation.metrics', metrics):
+            with mock.patch('webpack.conf.settings', get_settings()):
+                bundle.render_js()
+            self.assertEqual(metrics.dump()['counters'], {})
+
+            with mock.patch('webpack.conf.settings', get_settings(METRICS=True)):
+                rendered = bundle.render_js()
+                bundle.render_js()
+
+        dump = metrics.dump()
+        self.assertEqual(dump['counters'], {'render': {'success': 2}})
+        self.assertEqual(dump['durations']['render']['count'], 2)
+        self.assertEqual(dump['durations']['render']['buckets'][-1], (float('inf'), 2))
+        self.assertEqual(dump['sizes'], {'render': 2 * len(rendered)})
+
+        metrics.reset()
+        self.assertEqual(metrics.dump(), {'counters': {}, 'durations': {}, 'sizes': {}})
+
+    def test_metrics_can_be_rendered_for_prometheus(self):
+        metrics = Metrics()
+        event = instrumentation.Event('manifest.read', {'key': 'foo'})
+        event.duration = 0.003
+        event.outcome = 'hit'
+        metrics.record(event)
+
+        output = metrics.render_prometheus()
+        self.assertIn('webpack_events_total{event="manifest.read",outcome="hit"} 1\n', output)
+        self.assertIn('webpack_event_duration_seconds_bucket{event="manifest.read",le="0.0025"} 0\n', output)
+        self.assertIn('webpack_event_duration_seconds_bucket{event="manifest.read",le="0.005"} 1\n', output)
+        self.assertIn('webpack_event_duration_seconds_bucket{event="manifest.read",le="+Inf"} 1\n', output)
+        self.assertIn('webpack_event_duration_seconds_count{event="manifest.read"} 1\n', output)
@@ -0,0 +1,76 @@
+import unittest
+import mock
+from django.core.management.base import CommandError
+from webpack.conf import Conf
+from webpack.exceptions import ImproperlyConfigured
+from webpack.loadtest import get_entries, percentile, run_load_test
+from webpack.management.commands.webpack import Command
+from webpack.stub_server import StubBuildServer
+from .settings import ConfigFiles, WEBPACK
+from .test_build_server import get_unused_port
+
+
+class TestLoadTest(unittest.TestCase):
+    def test_requests_are_replayed_against_the_server(self):
+        entries = get_entries([ConfigFiles.BASIC_CONFIG, ConfigFiles.LIBRARY_CONFIG])
+        with StubBuildServer() as server:
+            result = run_load_test(entries, url=server.url, concurrency=4, total=20)
+            self.assertEqual(server.requests, 20)
+
+        summary = result.summary()
+        self.assertEqual(summary['requests'], 20)
+        self.assertEqual(summary['errors'], {})
+        self.assertTrue(summary['throughput'] > 0)
+        self.assertTrue(0 < summary['p50'] <= summary['p95'] <= summary['p99'] <= summary['max'])
+        self.assertIn('Throughput:', result.format())
+
+    def test_requests_can_be_rate_limited(self):
+        entries = get_entries([ConfigFiles.BASIC_CONFIG])
+        with StubBuildServer() as server:
+            result = run_load_test(entries, url=server.url, concurrency=4, rate=20, total=10)
+        # The last request starts 9 intervals after the first
+        self.assertTrue(result.elapsed >= 0.45)
+
+    def test_requests_can_run_for_a_duration(self):
+        entries = get_entries([ConfigFiles.BASIC_CONFIG])
+        with StubBuildServer() as server:
+            result = run_load_test(entries, url=server.url, concurrency=2, rate=50, duration=0.3)
+        self.assertTrue(5 <= result.requests <= 20)
+
+    def test_errors_are_counted(self):
+        entries = get_entries([ConfigFiles.BASIC_CONFIG])
+        url = 'http://127.0.0.1:{}/build'.format(get_unused_port())
+        result = run_load_test(entries, url=url, concurrency=2, total=4)
+        self.assertEqual(result.summary()['errors'], {'connection': 4})
+        self.assertIsNone(result.summary()['p50'])
+
+    def test_entries_default_to_the_manifest_setting(self):
+        settings = Conf()
+        settings.configure(**dict(WEBPACK, MANIFEST={ConfigFiles.BASIC_CONFIG: ({'foo': 'bar'}, None)}))
+        with mock.patch('webpack.conf.settings', settings):
+            self.assertEqual(
+                get_entries(),
+                [(ConfigFiles.BASIC_CONFIG, {'foo': 'bar'}), (ConfigFiles.BASIC_CONFIG, None)]
+            )
+
+        settings = Conf()
+        settings.configure(**WEBPACK)
+        with mock.patch('webpack.conf.settings', settings):
+            self.assertRaises(ImproperlyConfigured, get_entries)
+
+    def test_percentiles(self):
+        values = list(range(1, 101))
+        self.assertEqual(percentile(values, 50), 50)
+        self.assertEqual(percentile(values, 99), 99)
+        self.assertEqual(percentile([1], 95), 1)
+        self.assertIsNone(percentile([], 50))
+
+    def test_the_command_accepts_the_action_as_a_positional_argument(self):
+        # Django < 1.8 passes positional arguments to `handle`, rather than an `action` option
+        command = Command()
+        with mock.patch.object(command, 'loadtest') as loadtest:
+            command.handle('loadtest', concurrency=1)
+            loadtest.assert_called_once_with({'concurrency': 1})
+
+        self.assertRaises(CommandError, command.handle, 'bogus')
+        self.assertRaises(CommandError, command.handle, 'loadtest', 'populate')
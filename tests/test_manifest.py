@@ -1,13 +1,29 @@
 import unittest
+import datetime
+import decimal
 import os
 import json
 import mock
 import hashlib
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
 from webpack.conf import Conf
-from webpack.manifest import generate_manifest, generate_key, write_manifest, read_manifest, populate_manifest_file
-from webpack.compiler import webpack
-from .settings import ConfigFiles, OUTPUT_ROOT, WEBPACK
-from .utils import clean_output_root
+from webpack.manifest import (
+    generate_manifest, generate_key, get_journal_path, write_manifest, read_manifest, populate_manifest_file,
+    ManifestJournal, ManifestReader
+)
+from webpack.compiler import build_server, webpack
+from webpack.exceptions import BundlingError, ManifestChanged, ManifestGenerationError
+from webpack.fingerprint import FrozenContext, hash_context
+from .settings import BUNDLES, ConfigFiles, OUTPUT_ROOT, WEBPACK
+from .utils import clean_output_root, write_file
+
+
+def without_fingerprint(entry):
+    return dict((key, value) for key, value in entry.items() if key != 'fingerprint')
 
 
 class TestManifest(unittest.TestCase):
@@ -45,7 +61,7 @@ class TestManifest(unittest.TestCase):
         entry = manifest[key]
 
         bundle = webpack(ConfigFiles.BASIC_CONFIG)
-        self.assertEqual(entry, bundle.data)
+        self.assertEqual(without_fingerprint(entry), bundle.data)
 
     def test_a_manifest_can_be_generated_from_a_dictionary(self):
         manifest = generate_manifest({
@@ -59,7 +75,7 @@ class TestManifest(unittest.TestCase):
         entry = manifest[key]
 
         bundle = webpack(ConfigFiles.BASIC_CONFIG)
-        self.assertEqual(entry, bundle.data)
+        self.assertEqual(without_fingerprint(entry), bundle.data)
 
     def test_a_manifest_can_be_generated_from_multiple_config_files(self):
         manifest = generate_manifest(
@@ -76,14 +92,14 @@ class TestManifest(unittest.TestCase):
         entry1 = manifest[key1]
 
         bundle1 = webpack(ConfigFiles.BASIC_CONFIG)
-        self.assertEqual(entry1, bundle1.data)
+        self.assertEqual(without_fingerprint(entry1), bundle1.data)
 
         key2 = generate_key(ConfigFiles.LIBRARY_CONFIG)
         self.assertIn(key2, manifest)
         entry2 = manifest[key2]
 
         bundle2 = webpack(ConfigFiles.LIBRARY_CONFIG)
-        self.assertEqual(entry2, bundle2.data)
+        self.assertEqual(without_fingerprint(entry2), bundle2.data)
 
     def test_a_manifest_can_be_generated_from_multiple_config_files_in_a_dictionary(self):
         manifest = generate_manifest({
@@ -98,14 +114,14 @@ class TestManifest(unittest.TestCase):
         entry1 = manifest[key1]
 
         bundle1 = webpack(ConfigFiles.BASIC_CONFIG)
-        self.assertEqual(entry1, bundle1.data)
+        self.assertEqual(without_fingerprint(entry1), bundle1.data)
 
         key2 = generate_key(ConfigFiles.LIBRARY_CONFIG)
         self.assertIn(key2, manifest)
         entry2 = manifest[key2]
 
         bundle2 = webpack(ConfigFiles.LIBRARY_CONFIG)
-        self.assertEqual(entry2, bundle2.data)
+        self.assertEqual(without_fingerprint(entry2), bundle2.data)
 
     def test_a_manifest_can_be_generated_with_multiple_contexts(self):
         manifest = generate_manifest({
@@ -124,19 +140,62 @@ class TestManifest(unittest.TestCase):
         self.assertIn(key1, manifest)
         entry1 = manifest[key1]
         bundle1 = webpack(ConfigFiles.BASIC_CONFIG, context={'foo': 'bar'})
-        self.assertEqual(entry1, bundle1.data)
+        self.assertEqual(without_fingerprint(entry1), bundle1.data)
 
         key2 = generate_key(ConfigFiles.LIBRARY_CONFIG, {'foo': 'bar'})
         self.assertIn(key2, manifest)
         entry2 = manifest[key2]
         bundle2 = webpack(ConfigFiles.LIBRARY_CONFIG, context={'foo': 'bar'})
-        self.assertEqual(entry2, bundle2.data)
+        self.assertEqual(without_fingerprint(entry2), bundle2.data)
 
         key3 = generate_key(ConfigFiles.LIBRARY_CONFIG, {'woz': 'woo'})
         self.assertIn(key3, manifest)
         entry3 = manifest[key3]
         bundle3 = webpack(ConfigFiles.LIBRARY_CONFIG, context={'woz': 'woo'})
-        self.assertEqual(entry3, bundle3.data)
+        self.assertEqual(without_fingerprint(entry3), bundle3.data)
+
+    def test_a_manifest_can_be_generated_concurrently(self):
+        entries = {
+            ConfigFiles.BASIC_CONFIG: (
+                {'foo': 'bar'},
+            ),
+            ConfigFiles.LIBRARY_CONFIG: (
+                {'foo': 'bar'},
+                {'woz': 'woo'},
+            ),
+            ConfigFiles.MULTIPLE_BUNDLES_CONFIG: (),
+        }
+
+        self.assertEqual(
+            generate_manifest(entries, workers=4),
+            generate_manifest(entries, workers=1),
+        )
+
+    def test_concurrent_manifest_generation_reports_errors_for_each_entry(self):
+        def fake_webpack(config_file, context=None, settings=None):
+            if config_file != ConfigFiles.BASIC_CONFIG:
+                raise BundlingError('Failed to build {}'.format(config_file))
+            return mock.Mock(data={'config_file': config_file}, options=None)
+
+        with mock.patch('webpack.compiler.webpack', fake_webpack):
+            with self.assertRaises(ManifestGenerationError) as context:
+                generate_manifest(
+                    (
+                        ConfigFiles.BASIC_CONFIG,
+                        ConfigFiles.LIBRARY_CONFIG,
+                        ConfigFiles.MULTIPLE_BUNDLES_CONFIG,
+                    ),
+                    workers=3,
+                )
+
+        errors = context.exception.errors
+        self.assertEqual(
+            [key for key, error in errors],
+            [generate_key(ConfigFiles.LIBRARY_CONFIG), generate_key(ConfigFiles.MULTIPLE_BUNDLES_CONFIG)],
+        )
+        for key, error in errors:
+            self.assertIsInstance(error, BundlingError)
+            self.assertIn(key, str(context.exception))
 
     def test_a_manifest_can_be_written_to_and_read_from_disk(self):
         manifest = generate_manifest({
@@ -187,7 +246,27 @@ class TestManifest(unittest.TestCase):
 
             with mock.patch('webpack.conf.settings', mock_settings):
                 bundle = webpack(ConfigFiles.BASIC_CONFIG)
-                self.assertEqual(bundle.data, manifest[key])
+                self.assertEqual(bundle.get_stats(), manifest[key]['stats'])
+                self.assertEqual(bundle.data, without_fingerprint(manifest[key]))
+
+    def test_reading_from_the_manifest_does_not_import_the_build_server(self):
+        root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, root)
+        path = os.path.join(root, 'manifest.json')
+        write_manifest(path, {'foo': {'urls': {'main': {'js': ['/static/foo.js']}}}})
+
+        script = '\n'.join([
+            'import sys',
+            'from webpack.conf import settings',
+            'settings.configure(USE_MANIFEST=True, MANIFEST_PATH={!r})'.format(path),
+            'from webpack.compiler import webpack',
+            'print(webpack("foo").render_js())',
+            'print("requests" in sys.modules, "webpack.build_server" in sys.modules)',
+        ])
+        env = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+        output = subprocess.check_output([sys.executable, '-c', script], env=env).decode('utf-8')
+
+        self.assertEqual(output.splitlines(), ['<script src="/static/foo.js"></script>', 'False False'])
 
     def test_the_manifest_can_be_populated_from_settings(self):
         path = os.path.join(OUTPUT_ROOT, 'test_populate_manifest_file.json')
@@ -215,7 +294,197 @@ class TestManifest(unittest.TestCase):
                 (ConfigFiles.BASIC_CONFIG,)
             )
 
-            self.assertEqual(manifest, expected)
+            self.assertEqual(
+                dict((key, without_fingerprint(entry)) for key, entry in manifest.items()),
+                dict((key, without_fingerprint(entry)) for key, entry in expected.items()),
+            )
+
+    def test_manifest_entries_record_a_fingerprint(self):
+        manifest = generate_manifest((ConfigFiles.BASIC_CONFIG,))
+        fingerprint = manifest[generate_key(ConfigFiles.BASIC_CONFIG)]['fingerprint']
+
+        bundle = webpack(ConfigFiles.BASIC_CONFIG)
+        self.assertEqual(fingerprint['options'], bundle.options['__python_webpack_hash__'])
+        self.assertEqual(
+            sorted(os.path.basename(path) for path in fingerprint['inputs']),
+            ['entry.js', 'require_test.js']
+        )
+
+    def test_fresh_entries_are_reused_by_incremental_generation(self):
+        source = tempfile.mkdtemp()
+        try:
+            shutil.copytree(os.path.join(BUNDLES, 'basic'), os.path.join(source, 'basic'))
+            config_file = os.path.join(source, 'basic', 'webpack.config.js')
+            entry_file = os.path.join(source, 'basic', 'app', 'require_test.js')
+
+            previous = generate_manifest((config_file, ConfigFiles.LIBRARY_CONFIG))
+
+            with mock.patch('webpack.compiler.build_server.build', self._raise_if_called):
+                manifest = generate_manifest((config_file, ConfigFiles.LIBRARY_CONFIG), previous=previous)
+                self.assertEqual(manifest, previous)
+
+                # Files which are touched, but not changed, are compared by their content
+                mtime = os.stat(entry_file).st_mtime
+                os.utime(entry_file, (mtime + 10, mtime + 10))
+                generate_manifest((config_file,), previous=previous)
+
+            with open(entry_file, 'r') as _file:
+                content = _file.read()
+            write_file(entry_file, content + '\n// changed')
+
+            with mock.patch('webpack.compiler.build_server.build', wraps=build_server.build) as build:
+                manifest = generate_manifest((config_file, ConfigFiles.LIBRARY_CONFIG), previous=previous)
+
+            self.assertEqual(build.call_count, 1)
+            self.assertEqual(build.call_args[1]['config_file'], config_file)
+            key = generate_key(config_file)
+            self.assertNotEqual(manifest[key]['assets'], previous[key]['assets'])
+            self.assertEqual(
+                manifest[generate_key(ConfigFiles.LIBRARY_CONFIG)],
+                previous[generate_key(ConfigFiles.LIBRARY_CONFIG)]
+            )
+        finally:
+            shutil.rmtree(source)
+
+    def test_entries_without_recorded_inputs_are_rebuilt(self):
+        previous = generate_manifest((ConfigFiles.BASIC_CONFIG,))
+        key = generate_key(ConfigFiles.BASIC_CONFIG)
+        previous[key]['fingerprint']['inputs'] = {}
+
+        with mock.patch('webpack.compiler.build_server.build', wraps=build_server.build) as build:
+            manifest = generate_manifest((ConfigFiles.BASIC_CONFIG,), previous=previous)
+
+        self.assertEqual(build.call_count, 1)
+        self.assertTrue(manifest[key]['fingerprint']['inputs'])
+
+    def test_entries_with_missing_assets_are_rebuilt(self):
+        previous = generate_manifest((ConfigFiles.BASIC_CONFIG,))
+        key = generate_key(ConfigFiles.BASIC_CONFIG)
+        os.remove(previous[key]['assets'][0])
+
+        manifest = generate_manifest((ConfigFiles.BASIC_CONFIG,), previous=previous)
+        self.assertTrue(os.path.exists(manifest[key]['assets'][0]))
+
+    def test_populating_the_manifest_can_compress_assets(self):
+        path = os.path.join(OUTPUT_ROOT, 'test_populate_compressed_manifest_file.json')
+
+        mock_settings = Conf()
+        mock_settings.configure(
+            **dict(
+                WEBPACK,
+                MANIFEST_PATH=path,
+                MANIFEST=(ConfigFiles.BASIC_CONFIG, ConfigFiles.MULTIPLE_BUNDLES_CONFIG),
+                COMPRESS_ASSETS=True,
+                COMPRESS_ENCODINGS=('gzip',),
+                COMPRESS_MIN_SIZE=0,
+            )
+        )
+
+        with mock.patch('webpack.conf.settings', mock_settings):
+            with mock.patch('webpack.compression.compress_assets') as compress_assets:
+                populate_manifest_file()
+
+            manifest = read_manifest(path)
+
+        # Every asset is compressed in a single batch, rather than after each build
+        self.assertEqual(compress_assets.call_count, 1)
+        paths = compress_assets.call_args[0][0]
+        self.assertEqual(len(paths), sum(len(data['assets']) for data in manifest.values()))
+
+    def test_manifests_are_written_in_the_same_format_as_json_dumps(self):
+        path = os.path.join(OUTPUT_ROOT, 'test_formatted_manifest.json')
+        if not os.path.exists(OUTPUT_ROOT):
+            os.makedirs(OUTPUT_ROOT)
+
+        manifests = (
+            {},
+            {'foo': {}, 'bar': {'urls': {'main': {'js': ['/static/"main"\n.js'], 'css': []}}, 'stats': None}},
+        )
+        for manifest in manifests:
+            write_manifest(path, manifest)
+            with open(path, 'r') as _file:
+                content = _file.read()
+            self.assertEqual(content, json.dumps(manifest, indent=4, sort_keys=True, separators=(',', ': ')))
+            self.assertEqual(read_manifest(path), manifest)
+
+    def test_the_manifest_journal_can_be_resumed(self):
+        path = os.path.join(OUTPUT_ROOT, 'test_manifest.json.journal')
+        if not os.path.exists(OUTPUT_ROOT):
+            os.makedirs(OUTPUT_ROOT)
+
+        journal = ManifestJournal(path)
+        journal.open(resume=False)
+        journal.append('foo', {'version': 1})
+        journal.append('bar', {'version': 1})
+        journal.append('foo', {'version': 2})
+        journal.close()
+
+        # Simulate a process which was interrupted while writing an entry
+        with open(path, 'ab') as _file:
+            _file.write(b'{"data": {"ver')
+
+        journal = ManifestJournal(path)
+        journal.open()
+        self.assertEqual(sorted(journal.offsets), ['bar', 'foo'])
+        self.assertEqual(journal['foo'], {'version': 2})
+        journal.append('woz', {'version': 1})
+        self.assertEqual(journal['woz'], {'version': 1})
+        journal.close()
+
+        journal = ManifestJournal(path)
+        journal.open(resume=False)
+        self.assertNotIn('foo', journal)
+        journal.remove()
+        self.assertFalse(os.path.exists(path))
+
+    def test_populating_the_manifest_resumes_after_failures(self):
+        path = os.path.join(OUTPUT_ROOT, 'test_resumed_manifest_file.json')
+
+        mock_settings = Conf()
+        mock_settings.configure(
+            **dict(
+                WEBPACK,
+                MANIFEST_PATH=path,
+                MANIFEST=(ConfigFiles.BASIC_CONFIG, ConfigFiles.LIBRARY_CONFIG),
+            )
+        )
+
+        build = build_server.build
+
+        def fail_library_builds(config_file, *args, **kwargs):
+            if config_file == ConfigFiles.LIBRARY_CONFIG:
+                raise BundlingError('Failed to build {}'.format(config_file))
+            return build(config_file, *args, **kwargs)
+
+        with mock.patch('webpack.conf.settings', mock_settings):
+            with mock.patch('webpack.compiler.build_server.build', side_effect=fail_library_builds):
+                self.assertRaises(BundlingError, populate_manifest_file)
+
+            self.assertFalse(os.path.exists(path))
+            journal = ManifestJournal(get_journal_path(path))
+            journal.open()
+            journal.close()
+            self.assertEqual(list(journal.offsets), [generate_key(ConfigFiles.BASIC_CONFIG)])
+
+            append = ManifestJournal.append
+            with mock.patch('webpack.compiler.build_server.build', wraps=build_server.build) as build:
+                with mock.patch.object(ManifestJournal, 'append', autospec=True, side_effect=append) as journaled:
+                    with mock.patch('webpack.manifest.open', create=True, side_effect=open) as opened:
+                        populate_manifest_file()
+
+            # The completed entry is reused from the journal, without being journaled again
+            self.assertEqual(build.call_count, 1)
+            self.assertEqual(build.call_args[1]['config_file'], ConfigFiles.LIBRARY_CONFIG)
+            self.assertEqual(journaled.call_count, 1)
+            self.assertEqual(journaled.call_args[0][1], generate_key(ConfigFiles.LIBRARY_CONFIG))
+            # The journal is read once for its offsets, once while building and once while writing the manifest
+            reads = [call for call in opened.call_args_list if call[0] == (get_journal_path(path), 'rb')]
+            self.assertEqual(len(reads), 3)
+            self.assertEqual(
+                sorted(read_manifest(path)),
+                sorted([generate_key(ConfigFiles.BASIC_CONFIG), generate_key(ConfigFiles.LIBRARY_CONFIG)])
+            )
+            self.assertFalse(os.path.exists(get_journal_path(path)))
 
     def test_the_manifest_can_be_populated_from_a_dictionary(self):
         path = os.path.join(OUTPUT_ROOT, 'test_populate_dict_manifest_file.json')
@@ -243,4 +512,207 @@ class TestManifest(unittest.TestCase):
                 ConfigFiles.BASIC_CONFIG: (),
             })
 
-            self.assertEqual(manifest, expected)
+            self.assertEqual(
+                dict((key, without_fingerprint(entry)) for key, entry in manifest.items()),
+                dict((key, without_fingerprint(entry)) for key, entry in expected.items()),
+            )
+
+    def test_a_manifest_can_store_prerendered_elements(self):
+        manifest = generate_manifest((ConfigFiles.BASIC_CONFIG,), prerender=True)
+        key = generate_key(ConfigFiles.BASIC_CONFIG)
+        bundle = webpack(ConfigFiles.BASIC_CONFIG)
+
+        self.assertEqual(manifest[key]['rendered'], bundle.prerender())
+        self.assertEqual(dict(without_fingerprint(manifest[key]), rendered=None), dict(bundle.data, rendered=None))
+
+    def test_the_manifest_reader_returns_prerendered_bundles(self):
+        path = os.path.join(OUTPUT_ROOT, 'test_prerendered_manifest.json')
+        if not os.path.exists(OUTPUT_ROOT):
+            os.makedirs(OUTPUT_ROOT)
+
+        write_manifest(path, {
+            'foo': {
+                'urls': {'main': {'js': ['/static/main.js'], 'css': []}},
+                'rendered': {'js': '<script src="/static/main.js"></script>', 'css': '', 'entries': {}},
+            },
+        })
+
+        bundle = ManifestReader(path).read('foo', None)
+        with mock.patch('webpack.bundle._render_elements', self._raise_if_called):
+            self.assertEqual(bundle.render_js(), '<script src="/static/main.js"></script>')
+
+    def test_the_manifest_reader_loads_stats_lazily(self):
+        path = os.path.join(OUTPUT_ROOT, 'test_lazy_stats_manifest.json')
+        if not os.path.exists(OUTPUT_ROOT):
+            os.makedirs(OUTPUT_ROOT)
+
+        manifest = {'foo': {'urls': {}, 'stats': {'hash': 'bar'}}}
+        write_manifest(path, manifest)
+
+        reader = ManifestReader(path)
+        bundle = reader.read('foo', None)
+        self.assertIs(reader.read('foo', None), bundle)
+        self.assertNotIn('stats', bundle._extra)
+        self.assertEqual(bundle.data, {'urls': {}})
+        self.assertNotIn('stats', bundle._extra)
+        self.assertEqual(bundle.get_stats(), {'hash': 'bar'})
+        self.assertEqual(bundle.data, without_fingerprint(manifest['foo']))
+
+    def test_the_manifest_reader_does_not_load_stats_from_a_changed_file(self):
+        path = os.path.join(OUTPUT_ROOT, 'test_changed_stats_manifest.json')
+        if not os.path.exists(OUTPUT_ROOT):
+            os.makedirs(OUTPUT_ROOT)
+
+        write_manifest(path, {'foo': {'urls': {}, 'stats': {'hash': 'bar'}}})
+        bundle = ManifestReader(path).read('foo', None)
+
+        write_manifest(path, {'foo': {'urls': {}, 'stats': {'hash': 'woz'}}})
+        self.assertRaises(ManifestChanged, bundle.get_stats)
+
+    def test_manifests_are_written_atomically(self):
+        path = os.path.join(OUTPUT_ROOT, 'test_atomic_manifest.json')
+        if not os.path.exists(OUTPUT_ROOT):
+            os.makedirs(OUTPUT_ROOT)
+
+        write_manifest(path, {'foo': {'bar': 'woz'}})
+        inode = os.stat(path).st_ino
+
+        with mock.patch('webpack.manifest._replace_file', side_effect=OSError('Interrupted')):
+            self.assertRaises(OSError, write_manifest, path, {'foo': {'bar': 'woo'}})
+
+        # Neither the original file nor temporary files have been left in an inconsistent state
+        self.assertEqual(read_manifest(path), {'foo': {'bar': 'woz'}})
+        self.assertEqual([name for name in os.listdir(OUTPUT_ROOT) if name.endswith('.tmp')], [])
+
+        write_manifest(path, {'foo': {'bar': 'woo'}})
+        self.assertEqual(read_manifest(path), {'foo': {'bar': 'woo'}})
+        self.assertNotEqual(os.stat(path).st_ino, inode)
+
+    def test_the_manifest_reader_can_reload_changed_manifests(self):
+        path = os.path.join(OUTPUT_ROOT, 'test_reloaded_manifest.json')
+        if not os.path.exists(OUTPUT_ROOT):
+            os.makedirs(OUTPUT_ROOT)
+
+        write_manifest(path, {'foo': {'version': 1}})
+
+        mock_settings = Conf()
+        mock_settings.configure(
+            **dict(
+                WEBPACK,
+                USE_MANIFEST=True,
+                MANIFEST_PATH=path,
+                MANIFEST_RELOAD=True,
+                MANIFEST_RELOAD_INTERVAL=0,
+            )
+        )
+
+        with mock.patch('webpack.conf.settings', mock_settings):
+            reader = ManifestReader()
+            self.assertEqual(reader.read('foo', None).data, {'version': 1})
+
+            write_manifest(path, {'foo': {'version': 2}})
+
+            # The previous manifest is used until the new one has been parsed
+            data = reader.read('foo', None).data
+            self.assertIn(data, ({'version': 1}, {'version': 2}))
+
+            for i in range(50):
+                if reader.read('foo', None).data == {'version': 2}:
+                    break
+                time.sleep(0.01)
+            self.assertEqual(reader.read('foo', None).data, {'version': 2})
+
+    def test_the_manifest_reader_does_not_reload_by_default(self):
+        path = os.path.join(OUTPUT_ROOT, 'test_unreloaded_manifest.json')
+        if not os.path.exists(OUTPUT_ROOT):
+            os.makedirs(OUTPUT_ROOT)
+
+        write_manifest(path, {'foo': {'version': 1}})
+
+        reader = ManifestReader(path)
+        self.assertEqual(reader.read('foo', None).data, {'version': 1})
+
+        write_manifest(path, {'foo': {'version': 2}})
+        with mock.patch('threading.Thread') as thread:
+            self.assertEqual(reader.read('foo', None).data, {'version': 1})
+            self.assertFalse(thread.called)
+
+
+class TestManifestKeys(unittest.TestCase):
+    def test_context_hashes_are_independent_of_key_order(self):
+        context1 = {'a': 1, 'b': {'c': [1, 2], 'd': None}}
+        context2 = {'b': {'d': None, 'c': [1, 2]}, 'a': 1}
+        self.assertEqual(
+            generate_key(ConfigFiles.BASIC_CONFIG, context1),
+            generate_key(ConfigFiles.BASIC_CONFIG, context2),
+        )
+        self.assertNotEqual(hash_context({'a': 1}), hash_context({'a': 2}))
+        self.assertNotEqual(hash_context({'a': 1}), hash_context({'a': True}))
+
+    def test_context_hashes_support_non_json_types(self):
+        context = {
+            'set': set(['b', 'a']),
+            'date': datetime.date(2015, 1, 1),
+            'decimal': decimal.Decimal('1.5'),
+        }
+        self.assertEqual(
+            hash_context(context),
+            hash_context({'set': ['a', 'b'], 'date': '2015-01-01', 'decimal': '1.5'}),
+        )
+        self.assertRaises(TypeError, hash_context, {'foo': object()})
+
+    def test_context_hashes_are_memoized(self):
+        context = {'foo': 'bar'}
+        context_hash = hash_context(context)
+        # Contexts are memoized once they have been seen twice
+        self.assertEqual(hash_context(context), context_hash)
+
+        with mock.patch('webpack.fingerprint._hash_context') as _hash_context:
+            self.assertEqual(hash_context(context), context_hash)
+            self.assertFalse(_hash_context.called)
+
+        # Mutations are detected
+        context['foo'] = 'woz'
+        self.assertEqual(hash_context(context), hash_context({'foo': 'woz'}))
+        self.assertNotEqual(hash_context(context), context_hash)
+
+    def test_memoized_context_hashes_detect_mutations_to_equal_values_of_other_types(self):
+        context = {'a': 1, 'b': [1], 'c': {1: 'd'}}
+        hash_context(context)
+        hash_context(context)
+
+        for key, value in (('a', True), ('b', [1.0]), ('c', {True: 'd'})):
+            expected = dict(context, **{key: value})
+            original = context[key]
+            context[key] = value
+            self.assertEqual(hash_context(context), hash_context(expected))
+            context[key] = original
+            hash_context(context)
+
+    def test_frozen_contexts_are_hashed_once(self):
+        context = FrozenContext({'foo': 'bar'})
+        self.assertEqual(context, {'foo': 'bar'})
+        self.assertEqual(
+            generate_key(ConfigFiles.BASIC_CONFIG, context),
+            generate_key(ConfigFiles.BASIC_CONFIG, {'foo': 'bar'}),
+        )
+        self.assertEqual(json.loads(json.dumps(context)), {'foo': 'bar'})
+        self.assertRaises(TypeError, context.__setitem__, 'foo', 'woz')
+        self.assertRaises(TypeError, context.update, {'foo': 'woz'})
+
+        with mock.patch('webpack.fingerprint._hash_context') as _hash_context:
+            generate_key(ConfigFiles.BASIC_CONFIG, context)
+            self.assertFalse(_hash_context.called)
+
+    def test_the_manifest_reader_matches_contexts_in_any_order(self):
+        root = tempfile.mkdtemp()
+        try:
+            path = os.path.join(root, 'manifest.json')
+            context = {'a': 1, 'b': 2, 'c': {'d': 3, 'e': 4}}
+            write_manifest(path, {generate_key('foo', context): {'urls': {}}})
+
+            reader = ManifestReader(path)
+            reader.read('foo', {'c': {'e': 4, 'd': 3}, 'b': 2, 'a': 1})
+            reader.read('foo', FrozenContext(context))
+        finally:
+            shutil.rmtree(root)
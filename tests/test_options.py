@@ -0,0 +1,93 @@
+import os
+import shutil
+import tempfile
+import unittest
+import mock
+from webpack.conf import Conf, settings
+from webpack.exceptions import ConfigFileNotFound
+from webpack.options import generate_compiler_options
+from .settings import ConfigFiles, WEBPACK
+from .utils import write_file
+
+
+class TestOptions(unittest.TestCase):
+    def test_options_are_memoized(self):
+        context = {'foo': 'bar', 'woz': ['woo']}
+        options = generate_compiler_options(ConfigFiles.BASIC_CONFIG, extra_context=context)
+
+        with mock.patch('webpack.options.hashlib') as hashlib:
+            with mock.patch('os.stat', wraps=os.stat) as stat:
+                self.assertEqual(generate_compiler_options(ConfigFiles.BASIC_CONFIG, extra_context=context), options)
+                self.assertFalse(hashlib.md5.called)
+                # The resolved config file is trusted within CONFIG_FILE_CACHE_TTL
+                self.assertEqual(stat.call_count, 0)
+
+    def test_memoized_options_are_not_returned_for_removed_config_files(self):
+        mock_settings = Conf()
+        mock_settings.configure(**dict(WEBPACK, CONFIG_FILE_CACHE_TTL=0))
+
+        root = tempfile.mkdtemp()
+        try:
+            config_file = os.path.join(root, 'webpack.config.js')
+            write_file(config_file, '')
+
+            with mock.patch('webpack.conf.settings', mock_settings):
+                self.assertEqual(generate_compiler_options(config_file)['config'], config_file)
+
+                os.remove(config_file)
+                # Ensure that the modification time differs on file systems with a coarse resolution
+                mtime = os.stat(root).st_mtime
+                os.utime(root, (mtime + 10, mtime + 10))
+
+                self.assertRaises(ConfigFileNotFound, generate_compiler_options, config_file)
+        finally:
+            shutil.rmtree(root)
+
+    def test_memoized_options_are_not_shared_between_calls(self):
+        options = generate_compiler_options(ConfigFiles.BASIC_CONFIG)
+        options['config'] = None
+        options['context']['default_context'] = None
+        options = generate_compiler_options(ConfigFiles.BASIC_CONFIG)
+        self.assertIsNotNone(options['config'])
+        self.assertEqual(options['context']['default_context'], 'test')
+
+    def test_memoized_options_are_not_shared_with_the_context(self):
+        context = {'foo': ['bar']}
+        generate_compiler_options(ConfigFiles.BASIC_CONFIG, extra_context=context)
+        context['foo'].append('woz')
+
+        options = generate_compiler_options(ConfigFiles.BASIC_CONFIG, extra_context={'foo': ['bar']})
+        self.assertEqual(options['context']['foo'], ['bar'])
+
+    def test_context_ordering_does_not_affect_the_options_hash(self):
+        options1 = generate_compiler_options(ConfigFiles.BASIC_CONFIG, extra_context={'a': 1, 'b': 2})
+        options2 = generate_compiler_options(ConfigFiles.BASIC_CONFIG, extra_context={'b': 2, 'a': 1})
+        self.assertEqual(options1['context'], options2['context'])
+
+    def test_setting_overrides_are_distinguished_by_type(self):
+        options1 = generate_compiler_options(ConfigFiles.BASIC_CONFIG, setting_overrides={'WATCH': True})
+        options2 = generate_compiler_options(ConfigFiles.BASIC_CONFIG, setting_overrides={'WATCH': 1})
+        self.assertIs(options1['watch'], True)
+        self.assertEqual(options2['watch'], 1)
+        self.assertNotEqual(options1['__python_webpack_hash__'], options2['__python_webpack_hash__'])
+
+    def test_memoized_options_are_discarded_when_settings_change(self):
+        options = generate_compiler_options(ConfigFiles.BASIC_CONFIG)
+
+        mock_settings = Conf()
+        mock_settings.configure(**dict(WEBPACK, STATIC_URL='/other_static/'))
+
+        with mock.patch('webpack.conf.settings', mock_settings):
+            new_options = generate_compiler_options(ConfigFiles.BASIC_CONFIG)
+            self.assertNotEqual(new_options['__python_webpack_hash__'], options['__python_webpack_hash__'])
+            self.assertTrue(new_options['publicPath'].startswith('/other_static/'))
+
+    def test_settings_snapshots_are_reused_until_the_settings_are_configured(self):
+        self.assertIs(settings.get_snapshot(), settings.get_snapshot())
+
+        mock_settings = Conf()
+        snapshot = mock_settings.get_snapshot()
+        self.assertIsNone(snapshot['OUTPUT_ROOT'])
+        mock_settings.configure(**WEBPACK)
+        self.assertIsNot(mock_settings.get_snapshot(), snapshot)
+        self.assertEqual(mock_settings.get_snapshot()['OUTPUT_ROOT'], WEBPACK['OUTPUT_ROOT'])
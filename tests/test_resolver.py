@@ -0,0 +1,118 @@
+import os
+import shutil
+import tempfile
+import unittest
+import mock
+from webpack.conf import Conf
+from webpack.exceptions import ConfigFileNotFound
+from webpack.resolver import ConfigFileResolver, find_config_file
+from .settings import WEBPACK
+from .utils import write_file
+
+
+class TestResolver(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.dir_1 = os.path.join(self.root, 'dir_1')
+        self.dir_2 = os.path.join(self.root, 'dir_2')
+        os.makedirs(os.path.join(self.dir_1, 'app'))
+        os.makedirs(os.path.join(self.dir_2, 'app'))
+        self.config_1 = os.path.join(self.dir_1, 'app', 'webpack.config.js')
+        self.config_2 = os.path.join(self.dir_2, 'app', 'webpack.config.js')
+        write_file(self.config_2, '')
+
+        self.patch = None
+        self.configure()
+
+    def tearDown(self):
+        self.patch.stop()
+        shutil.rmtree(self.root)
+
+    def configure(self, **kwargs):
+        if self.patch:
+            self.patch.stop()
+        settings = Conf()
+        settings.configure(**dict(WEBPACK, CONFIG_DIRS=(self.dir_1, self.dir_2), **kwargs))
+        self.patch = mock.patch('webpack.conf.settings', settings)
+        self.patch.start()
+
+    def test_relative_paths_resolve_to_the_first_match(self):
+        resolver = ConfigFileResolver()
+        self.assertEqual(resolver.resolve(os.path.join('app', 'webpack.config.js')), self.config_2)
+
+        write_file(self.config_1, '')
+        resolver.invalidate()
+        self.assertEqual(resolver.resolve(os.path.join('app', 'webpack.config.js')), self.config_1)
+
+    def test_resolved_paths_are_indexed(self):
+        resolver = ConfigFileResolver()
+        resolver.resolve(os.path.join('app', 'webpack.config.js'))
+
+        # Within the default ttl, lookups do not touch the file system
+        with mock.patch('os.stat', wraps=os.stat) as stat:
+            self.assertEqual(resolver.resolve(os.path.join('app', 'webpack.config.js')), self.config_2)
+            self.assertEqual(stat.call_count, 0)
+
+    def test_indexed_paths_are_revalidated_with_a_stat_of_each_searched_directory(self):
+        self.configure(CONFIG_FILE_CACHE_TTL=0)
+
+        resolver = ConfigFileResolver()
+        resolver.resolve(os.path.join('app', 'webpack.config.js'))
+
+        with mock.patch('os.stat', wraps=os.stat) as stat:
+            self.assertEqual(resolver.resolve(os.path.join('app', 'webpack.config.js')), self.config_2)
+            self.assertEqual(stat.call_count, 2)
+
+    def test_indexed_paths_are_revalidated_when_their_directory_changes(self):
+        self.configure(CONFIG_FILE_CACHE_TTL=0)
+
+        resolver = ConfigFileResolver()
+        resolver.resolve(os.path.join('app', 'webpack.config.js'))
+
+        os.remove(self.config_2)
+        # Ensure that the modification time differs on file systems with a coarse resolution
+        mtime = os.stat(os.path.dirname(self.config_2)).st_mtime
+        os.utime(os.path.dirname(self.config_2), (mtime + 10, mtime + 10))
+
+        self.assertRaises(ConfigFileNotFound, resolver.resolve, os.path.join('app', 'webpack.config.js'))
+
+    def test_indexed_paths_are_revalidated_when_a_higher_priority_directory_changes(self):
+        self.configure(CONFIG_FILE_CACHE_TTL=0)
+
+        resolver = ConfigFileResolver()
+        self.assertEqual(resolver.resolve(os.path.join('app', 'webpack.config.js')), self.config_2)
+
+        write_file(self.config_1, '')
+        # Ensure that the modification time differs on file systems with a coarse resolution
+        mtime = os.stat(os.path.dirname(self.config_1)).st_mtime
+        os.utime(os.path.dirname(self.config_1), (mtime + 10, mtime + 10))
+
+        self.assertEqual(resolver.resolve(os.path.join('app', 'webpack.config.js')), self.config_1)
+
+    def test_indexed_paths_are_revalidated_when_a_missing_higher_priority_directory_is_created(self):
+        self.configure(CONFIG_FILE_CACHE_TTL=0)
+
+        shutil.rmtree(self.dir_1)
+        resolver = ConfigFileResolver()
+        self.assertEqual(resolver.resolve(os.path.join('app', 'webpack.config.js')), self.config_2)
+
+        os.makedirs(os.path.dirname(self.config_1))
+        write_file(self.config_1, '')
+
+        self.assertEqual(resolver.resolve(os.path.join('app', 'webpack.config.js')), self.config_1)
+
+    def test_indexed_paths_are_trusted_within_the_ttl(self):
+        self.configure(CONFIG_FILE_CACHE_TTL=60)
+
+        resolver = ConfigFileResolver()
+        resolver.resolve(os.path.join('app', 'webpack.config.js'))
+
+        with mock.patch('os.stat') as stat:
+            self.assertEqual(resolver.resolve(os.path.join('app', 'webpack.config.js')), self.config_2)
+            self.assertFalse(stat.called)
+
+    def test_missing_files_report_the_paths_tried(self):
+        with self.assertRaises(ConfigFileNotFound) as context:
+            find_config_file('missing.js')
+        self.assertIn(os.path.join(self.dir_1, 'missing.js'), str(context.exception))
+        self.assertIn(os.path.join(self.dir_2, 'missing.js'), str(context.exception))
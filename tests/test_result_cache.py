@@ -0,0 +1,120 @@
+import unittest
+import mock
+from webpack.cache import ResultCache
+from webpack.conf import Conf
+from webpack.compiler import webpack, invalidate_result_cache, SettingsResultCache
+from webpack.options import generate_compiler_options
+from .settings import ConfigFiles, WEBPACK
+from .utils import clean_output_root
+
+
+class CountingCompiler(object):
+    def __init__(self):
+        self.calls = 0
+
+    def build(self, config_file, extra_context, setting_overrides):
+        self.calls += 1
+        return object()
+
+
+class TestResultCache(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        clean_output_root()
+
+    @classmethod
+    def tearDownClass(cls):
+        clean_output_root()
+
+    def test_cache_evicts_the_least_recently_used_entry(self):
+        cache = ResultCache(size=2)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.get('a')
+        cache.set('c', 3)
+        self.assertEqual(cache.get('a'), 1)
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('c'), 3)
+
+    def test_cache_expires_entries_after_the_ttl(self):
+        cache = ResultCache(ttl=10)
+        with mock.patch('webpack.cache._clock', return_value=100):
+            cache.set('a', 1)
+        with mock.patch('webpack.cache._clock', return_value=105):
+            self.assertEqual(cache.get('a'), 1)
+        with mock.patch('webpack.cache._clock', return_value=111):
+            self.assertIsNone(cache.get('a'))
+        self.assertEqual(len(cache), 0)
+
+    def test_cache_can_be_invalidated(self):
+        cache = ResultCache()
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.invalidate('a')
+        self.assertIsNone(cache.get('a'))
+        self.assertEqual(cache.get('b'), 2)
+        cache.invalidate()
+        self.assertEqual(len(cache), 0)
+
+    def test_results_are_not_cached_by_default(self):
+        compiler = CountingCompiler()
+        cache = ResultCache()
+        webpack(ConfigFiles.BASIC_CONFIG, compiler=compiler, cache=cache)
+        webpack(ConfigFiles.BASIC_CONFIG, compiler=compiler, cache=cache)
+        self.assertEqual(compiler.calls, 2)
+        self.assertEqual(len(cache), 0)
+
+    def test_results_can_be_cached_by_their_options_hash(self):
+        compiler = CountingCompiler()
+        cache = ResultCache()
+        settings = {'RESULT_CACHE': True}
+
+        bundle = webpack(ConfigFiles.BASIC_CONFIG, settings=settings, compiler=compiler, cache=cache)
+        self.assertIs(webpack(ConfigFiles.BASIC_CONFIG, settings=settings, compiler=compiler, cache=cache), bundle)
+        self.assertEqual(compiler.calls, 1)
+
+        options = generate_compiler_options(ConfigFiles.BASIC_CONFIG, setting_overrides=settings)
+        self.assertIs(cache.get(options['__python_webpack_hash__']), bundle)
+
+        webpack(ConfigFiles.BASIC_CONFIG, context={'foo': 'bar'}, settings=settings, compiler=compiler, cache=cache)
+        self.assertEqual(compiler.calls, 2)
+
+    def test_cached_results_can_be_invalidated(self):
+        compiler = CountingCompiler()
+        cache = ResultCache()
+        settings = {'RESULT_CACHE': True}
+
+        webpack(ConfigFiles.BASIC_CONFIG, settings=settings, compiler=compiler, cache=cache)
+        webpack(ConfigFiles.LIBRARY_CONFIG, settings=settings, compiler=compiler, cache=cache)
+        self.assertEqual(len(cache), 2)
+
+        invalidate_result_cache(ConfigFiles.BASIC_CONFIG, settings=settings, cache=cache)
+        self.assertEqual(len(cache), 1)
+        webpack(ConfigFiles.BASIC_CONFIG, settings=settings, compiler=compiler, cache=cache)
+        self.assertEqual(compiler.calls, 3)
+
+        invalidate_result_cache(cache=cache)
+        self.assertEqual(len(cache), 0)
+
+    def test_the_bounds_of_provided_caches_are_not_replaced(self):
+        compiler = CountingCompiler()
+        cache = ResultCache(size=1, ttl=60)
+        settings = {'RESULT_CACHE': True}
+
+        webpack(ConfigFiles.BASIC_CONFIG, settings=settings, compiler=compiler, cache=cache)
+        webpack(ConfigFiles.LIBRARY_CONFIG, settings=settings, compiler=compiler, cache=cache)
+        self.assertEqual((cache.size, cache.ttl), (1, 60))
+        self.assertEqual(len(cache), 1)
+
+    def test_settings_caches_read_their_bounds_from_the_settings(self):
+        cache = SettingsResultCache('RESULT_CACHE_SIZE', 'RESULT_CACHE_TTL')
+
+        mock_settings = Conf()
+        mock_settings.configure(**dict(WEBPACK, RESULT_CACHE_SIZE=1, RESULT_CACHE_TTL=None))
+        with mock.patch('webpack.conf.settings', mock_settings):
+            self.assertEqual((cache.get_size(), cache.get_ttl()), (1, None))
+            cache.set('a', 1)
+            cache.set('b', 2)
+            self.assertEqual(len(cache), 1)
+
+        self.assertIsNone(SettingsResultCache('BUILD_FALLBACK_CACHE_SIZE').get_ttl())
@@ -0,0 +1,117 @@
+import gzip
+import io
+import os
+import shutil
+import tempfile
+import unittest
+from webpack.serve import AssetServer, parse_accept_encoding, parse_range
+from .utils import write_file
+
+CONTENT = 'var foo = "bar";\n' * 100
+
+
+class StartResponse(object):
+    def __call__(self, status, headers):
+        self.status = status
+        self.headers = dict(headers)
+
+
+class TestServe(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        os.makedirs(os.path.join(self.root, 'abc123'))
+        self.path = os.path.join(self.root, 'abc123', 'bundle.js')
+        write_file(self.path, CONTENT)
+        self.server = AssetServer(self.root, max_age=60)
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def request(self, path='/abc123/bundle.js', method='GET', **headers):
+        environ = {'PATH_INFO': path, 'REQUEST_METHOD': method}
+        for name, value in headers.items():
+            environ['HTTP_' + name.upper()] = value
+        start_response = StartResponse()
+        body = b''.join(self.server(environ, start_response))
+        return start_response, body
+
+    def test_assets_are_served_with_far_future_headers(self):
+        response, body = self.request()
+        self.assertEqual(response.status, '200 OK')
+        self.assertEqual(body.decode('utf-8'), CONTENT)
+        self.assertEqual(response.headers['Cache-Control'], 'public, max-age=60, immutable')
+        self.assertEqual(response.headers['Content-Length'], str(len(CONTENT)))
+        self.assertIn('javascript', response.headers['Content-Type'])
+        self.assertTrue(response.headers['ETag'].startswith('"'))
+        self.assertNotIn('Vary', response.headers)
+
+    def test_missing_files_and_paths_outside_the_root_are_not_found(self):
+        self.assertEqual(self.request('/abc123/missing.js')[0].status, '404 Not Found')
+        self.assertEqual(self.request('/abc123')[0].status, '404 Not Found')
+        self.assertEqual(self.request('/../' + os.path.basename(self.root) + '/abc123/bundle.js')[0].status,
+                         '404 Not Found')
+
+    def test_only_get_and_head_are_allowed(self):
+        self.assertEqual(self.request(method='POST')[0].status, '405 Method Not Allowed')
+
+        response, body = self.request(method='HEAD')
+        self.assertEqual(response.status, '200 OK')
+        self.assertEqual(body, b'')
+
+    def test_matching_etags_are_not_modified(self):
+        etag = self.request()[0].headers['ETag']
+
+        response, body = self.request(if_none_match=etag)
+        self.assertEqual(response.status, '304 Not Modified')
+        self.assertEqual(body, b'')
+        self.assertEqual(response.headers['ETag'], etag)
+
+        self.assertEqual(self.request(if_none_match='"other"')[0].status, '200 OK')
+
+    def test_byte_ranges_are_served(self):
+        response, body = self.request(range='bytes=4-6')
+        self.assertEqual(response.status, '206 Partial Content')
+        self.assertEqual(body, b'foo')
+        self.assertEqual(response.headers['Content-Range'], 'bytes 4-6/{}'.format(len(CONTENT)))
+
+        response, body = self.request(range='bytes=-3')
+        self.assertEqual(body, b'";\n')
+
+        response, body = self.request(range='bytes={}-'.format(len(CONTENT)))
+        self.assertEqual(response.status, '416 Range Not Satisfiable')
+        self.assertEqual(response.headers['Content-Range'], 'bytes */{}'.format(len(CONTENT)))
+
+    def test_stale_if_range_requests_receive_the_full_content(self):
+        response, body = self.request(range='bytes=4-6', if_range='"other"')
+        self.assertEqual(response.status, '200 OK')
+        self.assertEqual(body.decode('utf-8'), CONTENT)
+
+    def test_compressed_copies_are_negotiated(self):
+        with gzip.open(self.path + '.gz', 'wb') as gzip_file:
+            gzip_file.write(CONTENT.encode('utf-8'))
+
+        response, body = self.request(accept_encoding='gzip, deflate')
+        self.assertEqual(response.headers['Content-Encoding'], 'gzip')
+        self.assertEqual(response.headers['Vary'], 'Accept-Encoding')
+        self.assertIn('javascript', response.headers['Content-Type'])
+        self.assertEqual(gzip.GzipFile(fileobj=io.BytesIO(body)).read().decode('utf-8'), CONTENT)
+
+        response, body = self.request(accept_encoding='gzip;q=0')
+        self.assertNotIn('Content-Encoding', response.headers)
+        self.assertEqual(response.headers['Vary'], 'Accept-Encoding')
+        self.assertEqual(body.decode('utf-8'), CONTENT)
+
+    def test_the_file_wrapper_is_used_for_full_responses(self):
+        environ = {
+            'PATH_INFO': '/abc123/bundle.js',
+            'REQUEST_METHOD': 'GET',
+            'wsgi.file_wrapper': lambda asset_file, block_size: ('wrapped', asset_file.close()),
+        }
+        self.assertEqual(self.server(environ, StartResponse())[0], 'wrapped')
+
+    def test_headers_are_parsed(self):
+        self.assertEqual(parse_accept_encoding('gzip;q=0.5, br'), {'gzip': 0.5, 'br': 1.0})
+        self.assertEqual(parse_range('bytes=0-', 10), (0, 10))
+        self.assertEqual(parse_range('bytes=5-100', 10), (5, 5))
+        self.assertIsNone(parse_range('bytes=0-1,4-5', 10))
+        self.assertIs(parse_range('bytes=-0', 10), False)
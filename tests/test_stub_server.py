@@ -0,0 +1,62 @@
+import json
+import time
+import unittest
+from webpack.build_server import BuildServer
+from webpack.fingerprint import compact_stats
+from webpack.stub_server import StubBuildServer
+from .settings import ConfigFiles
+
+
+class TestStubBuildServer(unittest.TestCase):
+    def test_builds_can_be_sent_to_the_stub_server(self):
+        with StubBuildServer(entries=2) as server:
+            bundle = BuildServer(server.url).build(ConfigFiles.BASIC_CONFIG, None, None)
+            self.assertEqual(server.requests, 1)
+
+        self.assertEqual(sorted(bundle.get_urls()), ['entry_1', 'main'])
+        self.assertIn('<script src="', bundle.render_js())
+        self.assertTrue(bundle.get_stats()['hash'])
+
+    def test_requests_without_a_config_file_error(self):
+        with StubBuildServer() as server:
+            output = BuildServer(server.url).post(json={}).json()
+        self.assertEqual(output, {'error': 'webpack-build: Config file not defined', 'data': None})
+
+    def test_latency_can_be_configured(self):
+        with StubBuildServer(latency=0.2) as server:
+            started = time.time()
+            BuildServer(server.url).build(ConfigFiles.BASIC_CONFIG, None, None)
+            self.assertTrue(time.time() - started >= 0.2)
+
+    def test_responses_are_padded_to_the_configured_size(self):
+        options = {'config': '/foo/webpack.config.js', 'outputPath': '/foo', 'publicPath': '/static'}
+        small = len(json.dumps(StubBuildServer().get_response(options)))
+        padded = len(json.dumps(StubBuildServer(size=64 * 1024).get_response(options)))
+        self.assertTrue(small < 1024)
+        self.assertTrue(64 * 1024 - 100 < padded <= 64 * 1024)
+
+    def test_built_bundles_only_hold_the_stats_that_are_used(self):
+        with StubBuildServer(size=16 * 1024) as server:
+            build_server = BuildServer(server.url)
+            bundle = build_server.build(ConfigFiles.BASIC_CONFIG, None, None)
+            full_bundle = build_server.build(ConfigFiles.BASIC_CONFIG, None, {'BUILD_COMPACT_STATS': False})
+
+        stats = full_bundle.get_stats()
+        self.assertIn('warnings', stats)
+        self.assertEqual(stats['modules'][0], {'identifier': '/stub/module_000000.js', 'name': './module_000000.js'})
+
+        self.assertEqual(bundle.get_stats(), compact_stats(stats))
+        self.assertEqual(sorted(bundle.get_stats()), ['hash', 'modules'])
+        self.assertEqual(bundle.get_stats()['modules'][0], {'identifier': '/stub/module_000000.js'})
+
+    def test_compacted_stats_retain_the_modules_of_child_compilers(self):
+        stats = {
+            'hash': 'foo',
+            'errors': [],
+            'children': [{'hash': 'bar', 'modules': [{'identifier': '/foo.js', 'source': '...'}, {'name': 'baz'}]}],
+        }
+        self.assertEqual(compact_stats(stats), {
+            'hash': 'foo',
+            'children': [{'hash': 'bar', 'modules': [{'identifier': '/foo.js'}]}],
+        })
+        self.assertIsNone(compact_stats(None))
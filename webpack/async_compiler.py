@@ -0,0 +1,119 @@
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from . import conf
+from .compiler import (
+    manifest_reader, build_server, result_cache, fallback_cache, _use_manifest, _get_cache_key,
+    _fallback, _compress
+)
+from .exceptions import BuildServerConnectionError
+from .options import _setting
+
+
+class AsyncBuildServer(object):
+    """
+    An awaitable client for webpack-build's build server.
+
+    Build requests are delegated to a BuildServer on a thread pool, so they share its
+    pooled connections and error handling - BundlingError, WebpackWarning, and the
+    unpacking of errors from webpack's stats - without blocking the event loop.
+    """
+    def __init__(self, build_server, executor=None):
+        self.build_server = build_server
+        self._executor = executor
+        self._executor_lock = threading.Lock()
+
+    @property
+    def url(self):
+        return self.build_server.url
+
+    def get_executor(self):
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=conf.settings.BUILD_POOL_SIZE)
+            return self._executor
+
+    async def _run(self, func, *args):
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(self.get_executor(), functools.partial(func, *args))
+
+    async def is_running(self, debug=False, force=False):
+        return await self._run(self.build_server.is_running, debug, force)
+
+    async def build(self, config_file, extra_context=None, setting_overrides=None):
+        return await self._run(self.build_server.build, config_file, extra_context, setting_overrides)
+
+
+async_build_server = AsyncBuildServer(build_server)
+
+
+async def _build(compiler, config_file, context, settings):
+    bundle = await compiler.build(
+        config_file=config_file,
+        extra_context=context,
+        setting_overrides=settings,
+    )
+
+    if _setting(settings, 'COMPRESS_ASSETS'):
+        # Compression blocks, so it runs alongside the build requests
+        loop = asyncio.get_event_loop()
+        await loop.run_in_executor(async_build_server.get_executor(), _compress, bundle, settings)
+
+    return bundle
+
+
+async def _get_bundle(compiler, config_file, context, settings, cache):
+    if not _setting(settings, 'RESULT_CACHE'):
+        return await _build(compiler, config_file, context, settings)
+
+    key = _get_cache_key(config_file, context, settings)
+
+    bundle = cache.get(key)
+    if bundle is None:
+        bundle = await _build(compiler, config_file, context, settings)
+        cache.set(key, bundle)
+
+    return bundle
+
+
+async def webpack_async(config_file, context=None, settings=None, manifest=manifest_reader,
+                        compiler=async_build_server, cache=result_cache, fallback_cache=fallback_cache):
+    """
+    An awaitable equivalent of webpack.compiler.webpack. `compiler` should expose a
+    coroutine `build` method.
+    """
+    if _use_manifest(settings):
+        return manifest.read(config_file, context)
+
+    if not _setting(settings, 'BUILD_FALLBACK'):
+        return await _get_bundle(compiler, config_file, context, settings, cache)
+
+    try:
+        bundle = await _get_bundle(compiler, config_file, context, settings, cache)
+    except BuildServerConnectionError as e:
+        return _fallback(e, config_file, context, settings, manifest, fallback_cache)
+
+    fallback_cache.set(_get_cache_key(config_file, context, settings), bundle)
+
+    return bundle
+
+
+async def webpack_many_async(config_files, return_exceptions=False, **kwargs):
+    """
+    Concurrently builds multiple config files, returning a list of bundles in the same order.
+
+    Each item in `config_files` should be either a path to a config file, or a tuple of
+    (config_file, context). Any other keyword arguments are passed to `webpack_async`.
+    If `return_exceptions` is True, failed builds are returned in place of their bundles
+    rather than being raised.
+    """
+    coroutines = []
+    for item in config_files:
+        if isinstance(item, tuple):
+            config_file, context = item
+        else:
+            config_file, context = item, None
+        coroutines.append(webpack_async(config_file, context=context, **kwargs))
+
+    return await asyncio.gather(*coroutines, return_exceptions=return_exceptions)
@@ -1,33 +1,100 @@
+import threading
 import requests
 import warnings
+from requests.adapters import HTTPAdapter
+from . import conf, instrumentation
+from .cache import SingleFlight
 from .exceptions import BundlingError, WebpackWarning
 from .bundle import WebpackBundle
-from .exceptions import BuildServerConnectionError, BuildServerUnexpectedResponse
-from .options import generate_compiler_options
+from .exceptions import (
+    BuildServerConnectionError, BuildServerTimeout, BuildServerUnavailable, BuildServerUnexpectedResponse
+)
+from .health import CircuitBreaker, HealthCheck
+from .fingerprint import compact_stats
+from .options import generate_compiler_options, _setting
 
 
 class BuildServer(object):
-    def __init__(self, url):
+    """
+    A client for webpack-build's build server.
+
+    Requests are sent over keep-alive connections drawn from a pool that is shared between
+    threads, while each thread uses its own session. Unless they are provided as arguments,
+    the pool size, keep-alive behaviour and timeouts are read from the BUILD_* settings when
+    the pool is first used.
+
+    The server's health is probed with a TCP connection and cached, see `is_running`. After
+    repeated connection failures, a circuit breaker causes builds to fail immediately with
+    BuildServerUnavailable until the BUILD_FAILURE_COOLDOWN has passed.
+    """
+    def __init__(self, url, pool_size=None, keep_alive=None, connect_timeout=None, timeout=None):
         self.url = url
-
-    def is_running(self, debug=False):
-        try:
-            res = requests.post(self.url)
-        except requests.ConnectionError:
-            if debug:
-                print('connection error')
-            return False
-
-        if debug:
-            print('res', 'static_code', res.status_code, 'text', res.text)
-
-        # Hacky, but it works for now
+        self.pool_size = pool_size
+        self.keep_alive = keep_alive
+        self.connect_timeout = connect_timeout
+        self.timeout = timeout
+        self._adapter = None
+        self._adapter_lock = threading.Lock()
+        self._local = threading.local()
+        self._in_flight = SingleFlight()
+        self.health = HealthCheck(url)
+        self.breaker = CircuitBreaker()
+
+    def _get_option(self, value, key):
+        if value is None:
+            return getattr(conf.settings, key)
+        return value
+
+    def get_timeout(self):
         return (
-            res.status_code == 200 and
-            'webpack-build' in res.text and
-            'Config file not defined' in res.text
+            self._get_option(self.connect_timeout, 'BUILD_CONNECT_TIMEOUT'),
+            self._get_option(self.timeout, 'BUILD_TIMEOUT'),
         )
 
+    def get_adapter(self):
+        with self._adapter_lock:
+            if self._adapter is None:
+                pool_size = self._get_option(self.pool_size, 'BUILD_POOL_SIZE')
+                self._adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+            return self._adapter
+
+    def get_session(self):
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            adapter = self.get_adapter()
+            session = requests.Session()
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            if not self._get_option(self.keep_alive, 'BUILD_KEEP_ALIVE'):
+                session.headers['Connection'] = 'close'
+            self._local.session = session
+        return session
+
+    def close(self):
+        """
+        Closes the pooled connections. The pool is recreated if another request is sent.
+        """
+        with self._adapter_lock:
+            adapter = self._adapter
+            self._adapter = None
+            self._local = threading.local()
+        if adapter is not None:
+            adapter.close()
+
+    def post(self, **kwargs):
+        kwargs.setdefault('timeout', self.get_timeout())
+        return self.get_session().post(self.url, **kwargs)
+
+    def is_running(self, debug=False, force=False):
+        """
+        Indicates that the server is accepting connections. The result is cached for
+        BUILD_HEALTH_CHECK_TTL seconds, unless `force` is True.
+        """
+        running = self.health.check(force=force)
+        if debug:
+            print('{} is {}'.format(self.url, 'accepting connections' if running else 'not accepting connections'))
+        return running
+
     def build(self, config_file, extra_context, setting_overrides):
         options = generate_compiler_options(
             config_file=config_file,
@@ -35,10 +102,67 @@ class BuildServer(object):
             setting_overrides=setting_overrides,
         )
 
+        compact = _setting(setting_overrides, 'BUILD_COMPACT_STATS')
+
+        # Concurrent requests for identical builds share a single request to the server
+        return self._in_flight.do((options['__python_webpack_hash__'], compact), self._build, options, compact)
+
+    def _raise_unavailable(self):
+        raise BuildServerUnavailable(
+            'Build requests to {} are suspended after {} consecutive failures, retrying in {:.1f}s'.format(
+                self.url, self.breaker.failures, self.breaker.retry_after()
+            )
+        )
+
+    def _build(self, options, compact=False):
+        event = instrumentation.start('build', hash=options['__python_webpack_hash__'], config_file=options['config'])
+        try:
+            bundle = self._request_build(options, event, compact)
+        except Exception as e:
+            instrumentation.finish(event, error=e)
+            raise
+        instrumentation.finish(event)
+        return bundle
+
+    def _request_build(self, options, event=None, compact=False):
+        if not self.breaker.allow():
+            self._raise_unavailable()
+
+        # Before a trial request is sent to a server that has been failing, check that it is accepting connections
+        if self.breaker.state == CircuitBreaker.HALF_OPEN:
+            try:
+                healthy = self.health.check(force=True)
+            except Exception:
+                self.breaker.record_failure()
+                raise
+            if not healthy:
+                self.breaker.record_failure()
+                self._raise_unavailable()
+
         try:
-            res = requests.post(self.url, json=options)
+            res = self.post(json=options)
+        except requests.Timeout:
+            self._record_failure()
+            connect_timeout, timeout = self.get_timeout()
+            raise BuildServerTimeout(
+                'Timed out waiting for {} (connect timeout: {}s, read timeout: {}s)'.format(
+                    self.url, connect_timeout, timeout
+                )
+            )
         except requests.ConnectionError:
+            self._record_failure()
             raise BuildServerConnectionError('Tried to send build request to {}'.format(self.url))
+        except Exception:
+            # Any other failure - such as a truncated response - must also be recorded, otherwise a
+            # trial request would leave the breaker half-open and every later request would be refused
+            self._record_failure()
+            raise
+
+        self.breaker.record_success()
+        self.health.set(True)
+
+        if event is not None:
+            event.data['size'] = len(res.content)
 
         if res.status_code != 200:
             raise BuildServerUnexpectedResponse(
@@ -83,4 +207,13 @@ class BuildServer(object):
 
             raise BundlingError(message)
 
+        if compact and stats:
+            # Bundles can be held in memory for the life of the process, so the bulk of the stats is
+            # discarded once their warnings and errors have been reported
+            data['stats'] = compact_stats(stats)
+
         return WebpackBundle(data, options)
+
+    def _record_failure(self):
+        self.breaker.record_failure()
+        self.health.set(False)
@@ -1,33 +1,345 @@
+from optional_django import six
+from optional_django.six.moves import intern
+from . import instrumentation
+from .exceptions import EntryNotFound
+from .inline import render_inline
+
+# Keys of the build output which are held in a compact form
+COMPACT_KEYS = ('urls', 'output', 'assets', 'outputOptions')
+
+
+def _intern(value):
+    # Interning allows identical urls and paths - for example, chunks shared between entries
+    # and contexts - to be stored once per process
+    if isinstance(value, str):
+        return intern(value)
+    return value
+
+
+def _compact_entries(entries):
+    compacted = {}
+    for name, entry in six.iteritems(entries):
+        compacted[_intern(name)] = dict(
+            (_intern(kind), tuple(_intern(path) for path in paths)) for kind, paths in six.iteritems(entry)
+        )
+    return compacted
+
+
+def _expand_entries(entries):
+    return dict(
+        (name, dict((kind, list(paths)) for kind, paths in six.iteritems(entry)))
+        for name, entry in six.iteritems(entries)
+    )
+
+
+def _normalize_entries(entries):
+    if entries is None:
+        return None
+    if isinstance(entries, six.string_types):
+        return (entries,)
+    return tuple(entries)
+
+
+# The elements emitted by each style of rendering, as tuples of (asset type, element template)
+RENDERERS = {
+    'css': (
+        ('css', '<link rel="stylesheet" href="{}">'),
+    ),
+    'js': (
+        ('js', '<script src="{}"></script>'),
+    ),
+    'js:async': (
+        ('js', '<script src="{}" async></script>'),
+    ),
+    'js:defer': (
+        ('js', '<script src="{}" defer></script>'),
+    ),
+    'preload': (
+        ('css', '<link rel="preload" href="{}" as="style">'),
+        ('js', '<link rel="preload" href="{}" as="script">'),
+    ),
+    'modulepreload': (
+        ('js', '<link rel="modulepreload" href="{}">'),
+    ),
+    'prefetch': (
+        ('css', '<link rel="prefetch" href="{}">'),
+        ('js', '<link rel="prefetch" href="{}">'),
+    ),
+}
+
+JS_MODES = (None, 'async', 'defer', 'inline')
+
+CSS_MODES = (None, 'inline')
+
+# The renderers that are stored by default when a bundle is prerendered
+DEFAULT_PRERENDERERS = ('css', 'js')
+
+
+def _render_elements(renderer, urls_by_type):
+    rendered = []
+    for asset_type, template in RENDERERS[renderer]:
+        rendered += [template.format(url) for url in urls_by_type(asset_type)]
+    return '\n'.join(rendered)
+
+
 class WebpackBundle(object):
-    def __init__(self, data, options=None):
-        self.data = data
+    """
+    The output of a build.
+
+    Urls and paths are held as tuples of interned strings, and rendered elements are
+    memoized on the instance. webpack's stats can be provided lazily via `stats_loader`,
+    a callable which is invoked the first time the stats are requested.
+
+    If `entries` is defined, the render methods only emit elements for the named entries. `js_mode`
+    and `css_mode` define the default modes used by `render_js` and `render_css`.
+    """
+    __slots__ = (
+        'options', 'rendered', 'entries', 'js_mode', 'css_mode', '_keys', '_urls', '_output', '_assets',
+        '_output_options', '_extra', '_stats_loader', '_memo',
+    )
+
+    def __init__(self, data, options=None, rendered=None, stats_loader=None, entries=None, js_mode=None,
+                 css_mode=None):
         self.options = options
+        # Elements that were rendered ahead of time, see `prerender`
+        self.rendered = rendered
+        self.entries = _normalize_entries(entries)
+        self.js_mode = js_mode
+        self.css_mode = css_mode
 
-    def render_css(self):
-        urls = []
-        for entry in self.get_urls().values():
-            urls += entry['css']
-        rendered = ['<link rel="stylesheet" href="{}">'.format(url) for url in urls]
+        self._keys = tuple(key for key in COMPACT_KEYS if key in data)
+        self._urls = _compact_entries(data.get('urls', {}))
+        self._output = _compact_entries(data.get('output', {}))
+        self._assets = tuple(_intern(path) for path in data.get('assets', ()))
+        self._output_options = data.get('outputOptions', None)
+        # Any other output - such as the stats - is held as-is
+        self._extra = dict((key, value) for key, value in six.iteritems(data) if key not in COMPACT_KEYS)
+        self._stats_loader = None if 'stats' in data else stats_loader
+        self._memo = {}
+
+    @property
+    def data(self):
+        """
+        The build output, in the form that it was received from the build server. Stats which are
+        loaded lazily are omitted until they have been requested with `get_stats`.
+        """
+        data = dict(self._extra)
+        if 'urls' in self._keys:
+            data['urls'] = _expand_entries(self._urls)
+        if 'output' in self._keys:
+            data['output'] = _expand_entries(self._output)
+        if 'assets' in self._keys:
+            data['assets'] = list(self._assets)
+        if 'outputOptions' in self._keys:
+            data['outputOptions'] = self._output_options
+        return data
+
+    def _memoize(self, key, render):
+        try:
+            return self._memo[key]
+        except KeyError:
+            rendered = self._memo[key] = render()
+            return rendered
+
+    def select(self, entries=None, js_mode=None, css_mode=None):
+        """
+        Returns a copy of the bundle which only renders elements for `entries` - either the name of
+        an entry or an iterable of names - and which renders scripts and stylesheets in `js_mode`
+        and `css_mode`. Rendered elements are shared with the original bundle.
+        """
+        if js_mode not in JS_MODES:
+            raise ValueError('Unknown js_mode "{}", expected one of {}'.format(js_mode, JS_MODES))
+        if css_mode not in CSS_MODES:
+            raise ValueError('Unknown css_mode "{}", expected one of {}'.format(css_mode, CSS_MODES))
+
+        bundle = type(self).__new__(type(self))
+        for attr in WebpackBundle.__slots__:
+            setattr(bundle, attr, getattr(self, attr))
+        bundle.entries = _normalize_entries(entries)
+        bundle.js_mode = js_mode
+        bundle.css_mode = css_mode
+        return bundle
+
+    def _render(self, renderer, entries):
+        entries = self.entries if entries is None else _normalize_entries(entries)
+
+        if self.rendered is not None:
+            if entries is None:
+                rendered = self.rendered.get(renderer, None)
+            elif len(entries) == 1:
+                rendered = self.rendered.get('entries', {}).get(entries[0], {}).get(renderer, None)
+            else:
+                rendered = None
+            if rendered is not None:
+                return rendered
+
+        return self._memoize(
+            (renderer, entries),
+            lambda: _render_elements(renderer, lambda asset_type: self._get_urls_of_kind(asset_type, entries))
+        )
+
+    def _get_paths_by_url(self, asset_type):
+        def get_paths():
+            paths = {}
+            for name, entry in self._urls.items():
+                output = self._output.get(name, {}).get(asset_type, ())
+                for url, path in zip(entry.get(asset_type, ()), output):
+                    paths[url] = path
+            return paths
+
+        return self._memoize(('paths', asset_type), get_paths)
+
+    def _render_inline(self, asset_type, entries):
+        # As the content of assets can change, inlined elements are not memoized
+        entries = self.entries if entries is None else _normalize_entries(entries)
+        paths = self._get_paths_by_url(asset_type)
+        fallback = RENDERERS[asset_type][0][1]
+
+        rendered = []
+        for url in self._get_urls_of_kind(asset_type, entries):
+            element = render_inline(asset_type, url, paths.get(url, None))
+            if element is None:
+                element = fallback.format(url)
+            rendered.append(element)
         return '\n'.join(rendered)
 
-    def render_js(self):
+    def render_css(self, entries=None, mode=None):
+        """
+        Renders <link rel="stylesheet"> elements. If `mode` - which defaults to the bundle's
+        `css_mode` - is 'inline', stylesheets smaller than the INLINE_MAX_SIZE setting are inlined
+        into <style> elements.
+        """
+        mode = mode or self.css_mode
+        if mode not in CSS_MODES:
+            raise ValueError('Unknown mode "{}", expected one of {}'.format(mode, CSS_MODES))
+
+        event = instrumentation.start('render', renderer='css', mode=mode, entries=entries or self.entries)
+        try:
+            if mode == 'inline':
+                rendered = self._render_inline('css', entries)
+            else:
+                rendered = self._render('css', entries)
+        except Exception as e:
+            instrumentation.finish(event, error=e)
+            raise
+        instrumentation.finish(event, size=len(rendered))
+
+        return rendered
+
+    def render_js(self, entries=None, mode=None):
+        """
+        Renders <script> elements. `mode` - which defaults to the bundle's `js_mode` - can be
+        either 'async' or 'defer' to add the matching attribute, or 'inline' to inline scripts
+        smaller than the INLINE_MAX_SIZE setting.
+        """
+        mode = mode or self.js_mode
+        if mode not in JS_MODES:
+            raise ValueError('Unknown mode "{}", expected one of {}'.format(mode, JS_MODES))
+
+        event = instrumentation.start('render', renderer='js', mode=mode, entries=entries or self.entries)
+        try:
+            if mode == 'inline':
+                rendered = self._render_inline('js', entries)
+            else:
+                rendered = self._render('js:' + mode if mode else 'js', entries)
+        except Exception as e:
+            instrumentation.finish(event, error=e)
+            raise
+        instrumentation.finish(event, size=len(rendered))
+
+        return rendered
+
+    def render_preload(self, entries=None):
+        """
+        Renders <link rel="preload"> elements for the scripts and stylesheets of the entries.
+        """
+        return self._render('preload', entries)
+
+    def render_modulepreload(self, entries=None):
+        """
+        Renders <link rel="modulepreload"> elements for the scripts of the entries.
+        """
+        return self._render('modulepreload', entries)
+
+    def render_prefetch(self, entries=None):
+        """
+        Renders <link rel="prefetch"> elements for non-critical entries, so that browsers can fetch
+        them while idle. If `entries` is not provided, every entry that has not been selected is
+        prefetched. Assets that are required by the selected entries are never prefetched.
+        """
+        entries = _normalize_entries(entries)
+        if entries is None:
+            if self.entries is None:
+                return ''
+            entries = tuple(name for name in self._urls if name not in self.entries)
+
+        if self.entries is None:
+            return self._render('prefetch', entries)
+
+        def get_urls(asset_type):
+            selected = self._get_urls_of_kind(asset_type, self.entries)
+            return [url for url in self._get_urls_of_kind(asset_type, entries) if url not in selected]
+
+        return self._memoize(
+            ('prefetch', entries, self.entries),
+            lambda: _render_elements('prefetch', get_urls)
+        )
+
+    def _get_urls_of_kind(self, kind, entries=None):
+        if entries is None:
+            entries = self._urls.keys()
+
         urls = []
-        for entry in self.get_urls().values():
-            urls += entry['js']
-        rendered = ['<script src="{}"></script>'.format(url) for url in urls]
-        return '\n'.join(rendered)
+        for name in entries:
+            try:
+                entry = self._urls[name]
+            except KeyError:
+                raise EntryNotFound(
+                    'Entry "{}" not found, available entries: {}'.format(name, ', '.join(sorted(self._urls)))
+                )
+            # Chunks shared between entries are only emitted once
+            for url in entry.get(kind, ()):
+                if url not in urls:
+                    urls.append(url)
+        return urls
+
+    def prerender(self, renderers=DEFAULT_PRERENDERERS):
+        """
+        Returns the elements for the entire bundle, as well as for each of its entries, in a
+        form that can be stored in a manifest and passed back in as the `rendered` argument.
+
+        `renderers` should be an iterable containing keys of RENDERERS.
+        """
+        def render(entries):
+            rendered = {}
+            for renderer in renderers:
+                rendered[renderer] = _render_elements(
+                    renderer,
+                    lambda asset_type: self._get_urls_of_kind(asset_type, entries)
+                )
+            return rendered
+
+        prerendered = render(None)
+        prerendered['entries'] = dict((name, render((name,))) for name in self._urls)
+        return prerendered
 
     def get_assets(self):
-        return self.data['assets']
+        return self._assets
 
     def get_output(self):
-        return self.data['output']
+        return self._output
 
     def get_urls(self):
-        return self.data['urls']
+        return self._urls
 
     def get_output_options(self):
-        return self.data['outputOptions']
+        return self._output_options
+
+    def get_stats(self):
+        if self._stats_loader is not None:
+            self._extra['stats'] = self._stats_loader()
+            self._stats_loader = None
+        return self._extra.get('stats', None)
 
     def get_library(self):
-        return self.get_output_options().get('library', None)
\ No newline at end of file
+        return self.get_output_options().get('library', None)
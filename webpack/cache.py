@@ -0,0 +1,172 @@
+import sys
+import threading
+import time
+from collections import OrderedDict
+from optional_django import six
+
+# Prefer a clock that is unaffected by changes to the system time
+_clock = getattr(time, 'monotonic', time.time)
+
+
+class ResultCache(object):
+    """
+    A thread-safe, in-process LRU cache with an optional TTL.
+
+    Entries are evicted in least-recently-used order once `size` is exceeded, and
+    are treated as missing once they are older than `ttl` seconds. A `ttl` of None
+    disables expiry. Subclasses can override `get_size` and `get_ttl` to derive the
+    bounds from elsewhere.
+    """
+    def __init__(self, size=128, ttl=None):
+        self.size = size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_size(self):
+        return self.size
+
+    def get_ttl(self):
+        return self.ttl
+
+    def get(self, key, default=None):
+        entry = self.get_entry(key)
+        if entry is None:
+            return default
+        return entry[0]
+
+    def get_entry(self, key):
+        """
+        Returns a tuple of the value for `key` and the number of seconds since it was set,
+        or None if the cache does not contain `key`.
+        """
+        with self._lock:
+            entry = self._entries.get(key, None)
+            if entry is None:
+                return None
+
+            value, timestamp = entry
+            age = _clock() - timestamp
+            ttl = self.get_ttl()
+            if ttl is not None and age > ttl:
+                del self._entries[key]
+                return None
+
+            # Mark the entry as the most recently used
+            del self._entries[key]
+            self._entries[key] = entry
+
+            return value, age
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = (value, _clock())
+
+            size = self.get_size()
+            while len(self._entries) > size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, key=None):
+        """
+        Removes the entry for `key` from the cache. If `key` is None, every entry is removed.
+        """
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def __contains__(self, key):
+        return self.get(key) is not None
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class _Call(object):
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.exc_info = None
+
+
+class SingleFlight(object):
+    """
+    Coalesces concurrent calls that share a key, so that only one of them is executed. The
+    result of the call - or the exception that it raised - is shared with every caller that
+    was waiting on it.
+    """
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, func, *args, **kwargs):
+        with self._lock:
+            call = self._calls.get(key, None)
+            is_leader = call is None
+            if is_leader:
+                call = self._calls[key] = _Call()
+
+        if not is_leader:
+            call.event.wait()
+            if call.exc_info is not None:
+                six.reraise(*call.exc_info)
+            return call.result
+
+        try:
+            call.result = func(*args, **kwargs)
+        except Exception:
+            call.exc_info = sys.exc_info()
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.event.set()
+
+        return call.result
+
+    def __contains__(self, key):
+        return key in self._calls
+
+
+class BackgroundRefresh(object):
+    """
+    Runs calls in background threads, ensuring that only one call per key is in progress.
+    """
+    def __init__(self):
+        self._threads = {}
+        self._lock = threading.Lock()
+
+    def refresh(self, key, func, *args, **kwargs):
+        """
+        Calls `func` in a background thread, unless a call for `key` is already in progress.
+        Returns True if a call was started.
+        """
+        with self._lock:
+            if key in self._threads:
+                return False
+            thread = self._threads[key] = threading.Thread(target=self._run, args=(key, func, args, kwargs))
+
+        thread.daemon = True
+        thread.start()
+        return True
+
+    def _run(self, key, func, args, kwargs):
+        try:
+            func(*args, **kwargs)
+        finally:
+            with self._lock:
+                del self._threads[key]
+
+    def wait(self, timeout=None):
+        """
+        Blocks until every call in progress has completed.
+        """
+        with self._lock:
+            threads = list(self._threads.values())
+        for thread in threads:
+            thread.join(timeout)
+
+    def __contains__(self, key):
+        return key in self._threads
@@ -1,23 +1,225 @@
+import threading
+import warnings
 from . import conf
-from .build_server import BuildServer
+from .cache import BackgroundRefresh, ResultCache
+from .exceptions import (
+    BuildServerConnectionError, BuildServerFallbackWarning, ImproperlyConfigured, ManifestDoesNotExist,
+    ManifestMissingEntry
+)
 from .manifest import ManifestReader
+from .options import generate_compiler_options, _setting
+
+
+class LazyBuildServer(object):
+    """
+    A proxy to a BuildServer which is created when it is first used, so that processes which
+    only read from a manifest never import the build server or its dependency on requests.
+    """
+    def __init__(self):
+        object.__setattr__(self, '_build_server', None)
+        object.__setattr__(self, '_lock', threading.Lock())
+
+    def get_build_server(self):
+        build_server = self._build_server
+        if build_server is None:
+            with self._lock:
+                if self._build_server is None:
+                    from .build_server import BuildServer
+                    object.__setattr__(self, '_build_server', BuildServer(conf.settings.BUILD_URL))
+                build_server = self._build_server
+        return build_server
+
+    def __getattr__(self, name):
+        return getattr(self.get_build_server(), name)
+
+    def __setattr__(self, name, value):
+        setattr(self.get_build_server(), name, value)
+
+    def __delattr__(self, name):
+        delattr(self.get_build_server(), name)
+
+
+class SettingsResultCache(ResultCache):
+    """
+    A ResultCache whose size and ttl are read from the named settings whenever they are used,
+    so that they follow the settings configured after the cache was created.
+    """
+    def __init__(self, size_setting, ttl_setting=None):
+        super(SettingsResultCache, self).__init__()
+        self.size_setting = size_setting
+        self.ttl_setting = ttl_setting
+
+    def get_size(self):
+        return getattr(conf.settings, self.size_setting)
+
+    def get_ttl(self):
+        if self.ttl_setting is None:
+            return None
+        return getattr(conf.settings, self.ttl_setting)
+
 
 manifest_reader = ManifestReader()
-build_server = BuildServer(conf.settings.BUILD_URL)
+build_server = LazyBuildServer()
+result_cache = SettingsResultCache('RESULT_CACHE_SIZE', 'RESULT_CACHE_TTL')
+# The most recent successful build of each set of options, see the BUILD_FALLBACK and
+# BUILD_STALE_WHILE_REVALIDATE settings
+fallback_cache = SettingsResultCache('BUILD_FALLBACK_CACHE_SIZE')
+revalidator = BackgroundRefresh()
 
 
-def webpack(config_file, context=None, settings=None, manifest=manifest_reader, compiler=build_server):
+def _use_manifest(settings):
     use_manifest = conf.settings.USE_MANIFEST
 
     # Allow the USE_MANIFEST setting to be overridden when populating the manifest
     if settings:
         use_manifest = settings.get('USE_MANIFEST', use_manifest)
 
-    if use_manifest:
+    return use_manifest
+
+
+def _get_cache_key(config_file, context, settings):
+    options = generate_compiler_options(
+        config_file=config_file,
+        extra_context=context,
+        setting_overrides=settings,
+    )
+
+    return options['__python_webpack_hash__']
+
+
+def _build(compiler, config_file, context, settings):
+    bundle = compiler.build(
+        config_file=config_file,
+        extra_context=context,
+        setting_overrides=settings,
+    )
+
+    _compress(bundle, settings)
+
+    return bundle
+
+
+def _compress(bundle, settings):
+    """
+    Compresses the assets of `bundle` if the COMPRESS_ASSETS setting is True. Shared by the
+    sync and async compilers.
+    """
+    if _setting(settings, 'COMPRESS_ASSETS'):
+        from .compression import compress_build  # Avoiding a circular import
+        compress_build(bundle)
+
+
+def _get_bundle(compiler, config_file, context, settings, cache):
+    if not _setting(settings, 'RESULT_CACHE'):
+        return _build(compiler, config_file, context, settings)
+
+    key = _get_cache_key(config_file, context, settings)
+
+    bundle = cache.get(key)
+    if bundle is None:
+        bundle = _build(compiler, config_file, context, settings)
+        cache.set(key, bundle)
+
+    return bundle
+
+
+def _fallback(error, config_file, context, settings, manifest, fallback_cache):
+    """
+    Returns a bundle to use in place of a build which failed with `error`, or re-raises `error`
+    if neither the last successful build nor the manifest contain the config file.
+    """
+    bundle = fallback_cache.get(_get_cache_key(config_file, context, settings))
+    source = 'the last successful build'
+
+    if bundle is None:
+        try:
+            bundle = manifest.read(config_file, context)
+        except (ImproperlyConfigured, ManifestDoesNotExist, ManifestMissingEntry):
+            raise error
+        source = 'the manifest'
+
+    warnings.warn(
+        '{}. Using {} of {}'.format(error, source, config_file),
+        BuildServerFallbackWarning,
+    )
+
+    return bundle
+
+
+def _revalidate(key, compiler, config_file, context, settings, cache, fallback_cache):
+    try:
+        bundle = _get_bundle(compiler, config_file, context, settings, cache)
+    except BuildServerConnectionError:
+        # Continue to use the previous build until the server is available
+        return
+    except Exception:
+        # Discard the previous build, so that the error is raised by the next call
+        fallback_cache.invalidate(key)
+        return
+
+    fallback_cache.set(key, bundle)
+
+
+def _get_stale_bundle(key, compiler, config_file, context, settings, cache, fallback_cache):
+    """
+    Returns the previous build of `key` and starts a rebuild in the background, or returns None
+    if there is no previous build or it is older than the BUILD_MAX_STALENESS setting.
+    """
+    entry = fallback_cache.get_entry(key)
+    if entry is None:
+        return None
+
+    bundle, age = entry
+    max_staleness = _setting(settings, 'BUILD_MAX_STALENESS')
+    if max_staleness is not None and age > max_staleness:
+        return None
+
+    revalidator.refresh(key, _revalidate, key, compiler, config_file, context, settings, cache, fallback_cache)
+
+    return bundle
+
+
+def webpack(config_file, context=None, settings=None, manifest=manifest_reader, compiler=build_server,
+            cache=result_cache, fallback_cache=fallback_cache):
+    if _use_manifest(settings):
         return manifest.read(config_file, context)
 
-    return compiler.build(
+    use_fallback = _setting(settings, 'BUILD_FALLBACK')
+    use_stale = _setting(settings, 'BUILD_STALE_WHILE_REVALIDATE')
+
+    if not use_fallback and not use_stale:
+        return _get_bundle(compiler, config_file, context, settings, cache)
+
+    key = _get_cache_key(config_file, context, settings)
+
+    if use_stale:
+        bundle = _get_stale_bundle(key, compiler, config_file, context, settings, cache, fallback_cache)
+        if bundle is not None:
+            return bundle
+
+    try:
+        bundle = _get_bundle(compiler, config_file, context, settings, cache)
+    except BuildServerConnectionError as e:
+        if not use_fallback:
+            raise
+        return _fallback(e, config_file, context, settings, manifest, fallback_cache)
+
+    fallback_cache.set(key, bundle)
+
+    return bundle
+
+
+def invalidate_result_cache(config_file=None, context=None, settings=None, cache=result_cache):
+    """
+    Removes cached build results. If `config_file` is None, the entire cache is cleared,
+    otherwise only the result matching the config file, context and settings is removed.
+    """
+    if config_file is None:
+        return cache.invalidate()
+
+    options = generate_compiler_options(
         config_file=config_file,
         extra_context=context,
         setting_overrides=settings,
-    )
\ No newline at end of file
+    )
+    cache.invalidate(options['__python_webpack_hash__'])
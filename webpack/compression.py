@@ -0,0 +1,175 @@
+import gzip
+import io
+import multiprocessing
+import os
+from . import conf
+from .manifest import write_file_atomically
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Content encodings, in order of preference, mapped to the extension of their compressed files
+ENCODINGS = (
+    ('br', '.br'),
+    ('gzip', '.gz'),
+)
+
+
+def _compress_gzip(content):
+    buf = io.BytesIO()
+    # A fixed mtime ensures that identical assets produce identical files
+    with gzip.GzipFile(filename='', mode='wb', fileobj=buf, compresslevel=9, mtime=0) as gzip_file:
+        gzip_file.write(content)
+    return buf.getvalue()
+
+
+def _compress_brotli(content):
+    return brotli.compress(content, quality=11)
+
+
+COMPRESSORS = {
+    'gzip': _compress_gzip,
+    'br': _compress_brotli,
+}
+
+
+def get_available_encodings(encodings=None):
+    """
+    Returns the encodings from `encodings` - which defaults to the COMPRESS_ENCODINGS setting -
+    that can be produced. Brotli is only available if the `brotli` package is installed.
+    """
+    if encodings is None:
+        encodings = conf.settings.COMPRESS_ENCODINGS
+    return tuple(
+        encoding for encoding in encodings
+        if encoding in COMPRESSORS and (encoding != 'br' or brotli is not None)
+    )
+
+
+def get_compressed_path(path, encoding):
+    return path + dict(ENCODINGS)[encoding]
+
+
+def _is_up_to_date(path, compressed_path):
+    try:
+        return os.stat(compressed_path).st_mtime >= os.stat(path).st_mtime
+    except OSError:
+        return False
+
+
+def _get_pending_encodings(path, encodings):
+    return [
+        encoding for encoding in encodings
+        if not _is_up_to_date(path, get_compressed_path(path, encoding))
+    ]
+
+
+def compress_file(path, encodings):
+    """
+    Writes a compressed sibling of the file at `path` for each of `encodings`, skipping any
+    siblings which are newer than the file. Compressed files which are no smaller than the
+    original are discarded.
+
+    Returns a list of the paths written.
+    """
+    pending = _get_pending_encodings(path, encodings)
+    if not pending:
+        return []
+
+    with open(path, 'rb') as asset_file:
+        content = asset_file.read()
+
+    written = []
+    for encoding in pending:
+        compressed = COMPRESSORS[encoding](content)
+        if len(compressed) >= len(content):
+            continue
+        compressed_path = get_compressed_path(path, encoding)
+        write_file_atomically(compressed_path, compressed)
+        written.append(compressed_path)
+    return written
+
+
+def _compress_file(args):
+    return compress_file(*args)
+
+
+def _should_compress(path):
+    if not path.endswith(tuple(conf.settings.COMPRESS_EXTENSIONS)):
+        return False
+    try:
+        return os.path.getsize(path) >= conf.settings.COMPRESS_MIN_SIZE
+    except OSError:
+        return False
+
+
+def compress_assets(paths, workers=None, encodings=None):
+    """
+    Writes compressed copies of each asset in `paths`, alongside the asset.
+
+    Assets are compressed in a pool of `workers` processes, which defaults to the COMPRESS_WORKERS
+    setting, or the number of CPUs if that is None. Only assets matching COMPRESS_EXTENSIONS and
+    larger than COMPRESS_MIN_SIZE are compressed.
+
+    Returns a list of the compressed files that were written.
+    """
+    encodings = get_available_encodings(encodings)
+
+    if not encodings:
+        return []
+
+    # Assets shared between bundles are only compressed once, and assets whose compressed copies
+    # are up to date are skipped before deciding whether a pool is needed
+    jobs = []
+    for path in sorted(set(path for path in paths if _should_compress(path))):
+        pending = _get_pending_encodings(path, encodings)
+        if pending:
+            jobs.append((path, pending))
+
+    if not jobs:
+        return []
+
+    if workers is None:
+        workers = conf.settings.COMPRESS_WORKERS or multiprocessing.cpu_count()
+
+    if workers <= 1 or len(jobs) <= 1:
+        results = [_compress_file(job) for job in jobs]
+    else:
+        pool = multiprocessing.Pool(min(workers, len(jobs)))
+        try:
+            results = pool.map(_compress_file, jobs)
+        finally:
+            pool.close()
+            pool.join()
+
+    return [compressed_path for written in results for compressed_path in written]
+
+
+# The builds whose assets have been compressed, see `compress_build`
+_compressed_builds = set()
+COMPRESSED_BUILDS_SIZE = 1024
+
+
+def compress_build(bundle):
+    """
+    Compresses the assets of a build, unless the same build has already been compressed by
+    this process. Assets are compressed in the calling thread, so that no processes are forked
+    from the request path of a threaded server.
+    """
+    options = getattr(bundle, 'options', None)
+    options_hash = options and options.get('__python_webpack_hash__', None)
+    stats = bundle.get_stats() or {}
+    # Watching compilers rebuild with the same options, so the build's hash is included
+    key = (options_hash, stats.get('hash', None), tuple(bundle.get_assets()))
+    if key in _compressed_builds:
+        return []
+
+    written = compress_assets(bundle.get_assets(), workers=1)
+
+    if len(_compressed_builds) >= COMPRESSED_BUILDS_SIZE:
+        _compressed_builds.clear()
+    _compressed_builds.add(key)
+
+    return written
@@ -1,5 +1,6 @@
 import os
 from optional_django import conf
+from .cache import ResultCache
 
 
 class Conf(conf.Conf):
@@ -8,10 +9,24 @@ class Conf(conf.Conf):
     STATIC_URL = None
     OUTPUT_DIR = 'webpack_assets'
     CONFIG_DIRS = None
+    CONFIG_FILE_CACHE = True
+    CONFIG_FILE_CACHE_TTL = 1
     CONTEXT = None
 
     # Build server
     BUILD_URL = 'http://127.0.0.1:9009/build'
+    BUILD_POOL_SIZE = 10
+    BUILD_KEEP_ALIVE = True
+    BUILD_CONNECT_TIMEOUT = 5
+    BUILD_TIMEOUT = 120
+    BUILD_HEALTH_CHECK_TTL = 1
+    BUILD_FAILURE_THRESHOLD = 3
+    BUILD_FAILURE_COOLDOWN = 5
+    BUILD_FALLBACK = False
+    BUILD_STALE_WHILE_REVALIDATE = False
+    BUILD_MAX_STALENESS = 60
+    BUILD_FALLBACK_CACHE_SIZE = 128
+    BUILD_COMPACT_STATS = True
 
     # Watching
     WATCH = False
@@ -23,17 +38,64 @@ class Conf(conf.Conf):
     CACHE = True
     CACHE_DIR = None
 
+    # In-process caching of build results
+    RESULT_CACHE = False
+    RESULT_CACHE_SIZE = 128
+    RESULT_CACHE_TTL = 5
+
+    # Inlining assets
+    INLINE_MAX_SIZE = 4096
+    INLINE_CACHE_SIZE = 256
+
+    # Pre-compressing assets
+    COMPRESS_ASSETS = False
+    COMPRESS_ENCODINGS = ('gzip', 'br')
+    COMPRESS_EXTENSIONS = ('.js', '.css', '.map', '.json', '.svg', '.html', '.txt')
+    COMPRESS_MIN_SIZE = 256
+    COMPRESS_WORKERS = None
+
+    # Serving assets
+    SERVE_MAX_AGE = 31536000
+
+    # Instrumentation
+    METRICS = False
+
     # Manifest
     MANIFEST = None
     USE_MANIFEST = False
     MANIFEST_PATH = None
+    MANIFEST_WORKERS = 1
+    MANIFEST_PRERENDER = False
+    MANIFEST_INCREMENTAL = False
+    MANIFEST_RELOAD = False
+    MANIFEST_RELOAD_INTERVAL = 1
     MANIFEST_SETTINGS = {
         # Force the compiler to connect to the build server
         'USE_MANIFEST': False,
         # Ensure that the server does not add a hmr runtime
         'HMR': False,
+        # Store webpack's full stats in the manifest
+        'BUILD_COMPACT_STATS': False,
     }
 
+    _snapshot = None
+
+    def configure(self, **kwargs):
+        super(Conf, self).configure(**kwargs)
+        # Discard any snapshot of the previous values
+        object.__setattr__(self, '_snapshot', None)
+
+    def get_snapshot(self):
+        """
+        Returns an immutable snapshot of the settings, which is reused until the settings
+        are next configured.
+        """
+        snapshot = self._snapshot
+        if snapshot is None:
+            snapshot = SettingsSnapshot(self)
+            object.__setattr__(self, '_snapshot', snapshot)
+        return snapshot
+
     def get_path_to_output_dir(self):
         return os.path.join(self.OUTPUT_ROOT, self.OUTPUT_DIR)
 
@@ -44,4 +106,33 @@ class Conf(conf.Conf):
 
         return '/'.join([static_url, self.OUTPUT_DIR])
 
+class SettingsSnapshot(object):
+    """
+    A read-only copy of a Conf's settings, resolved once so that hot paths can avoid
+    repeated attribute lookups and path manipulation. Values are accessed by key, for
+    example `snapshot['OUTPUT_ROOT']`.
+
+    `options_cache` memoizes compiler options generated against this snapshot, and is
+    discarded along with it when the settings are reconfigured.
+    """
+    OPTIONS_CACHE_SIZE = 512
+
+    def __init__(self, settings):
+        self._values = dict(
+            (key, getattr(settings, key)) for key in dir(settings) if key.isupper()
+        )
+        self.path_to_output_dir = None
+        if settings.OUTPUT_ROOT:
+            self.path_to_output_dir = settings.get_path_to_output_dir()
+        self.public_path = None
+        if settings.STATIC_URL:
+            self.public_path = settings.get_public_path()
+        self.options_cache = ResultCache(size=self.OPTIONS_CACHE_SIZE)
+
+    def __getitem__(self, key):
+        return self._values[key]
+
+    def __contains__(self, key):
+        return key in self._values
+
 settings = Conf()
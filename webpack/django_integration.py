@@ -1,6 +1,9 @@
 from django.core.files.storage import FileSystemStorage
 from django.contrib.staticfiles.finders import BaseStorageFinder
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from .compression import ENCODINGS
 from .conf import settings
+from .serve import AssetServer, iter_file
 
 
 class WebpackFileStorage(FileSystemStorage):
@@ -14,11 +17,58 @@ class WebpackFileStorage(FileSystemStorage):
             base_url = settings.STATIC_URL
         super(WebpackFileStorage, self).__init__(location, base_url, *args, **kwargs)
 
+    def get_compressed_variants(self, name):
+        """
+        Returns a dictionary mapping content encodings to the names of the pre-compressed
+        copies of `name`, see the COMPRESS_ASSETS setting.
+        """
+        variants = {}
+        for encoding, extension in ENCODINGS:
+            if self.exists(name + extension):
+                variants[encoding] = name + extension
+        return variants
+
 
 class WebpackFinder(BaseStorageFinder):
     """
     A staticfiles finder that looks in webpack.conf.settings.OUTPUT_ROOT for generated bundles.
 
     To be used during development with staticfiles' development file server or during deployment.
+    Pre-compressed copies of assets are listed alongside the assets, so collectstatic will copy them.
     """
     storage = WebpackFileStorage
+
+
+asset_server = AssetServer()
+
+
+def serve(request, path, server=asset_server):
+    """
+    A view which serves webpack's output directory, see webpack.serve.AssetServer.
+
+    url(r'^static/webpack_assets/(?P<path>.*)$', 'webpack.django_integration.serve')
+    """
+    headers = dict(
+        (key[5:].replace('_', '-').lower(), value)
+        for key, value in request.META.items() if key.startswith('HTTP_')
+    )
+
+    result = server.get_response(request.method, path, headers)
+
+    if result.asset is None or request.method == 'HEAD':
+        response = HttpResponse(status=result.status)
+    elif result.status == 200:
+        # Allows the server to use `wsgi.file_wrapper` and send the file without copying it
+        response = FileResponse(open(result.asset.path, 'rb'))
+    else:
+        response = StreamingHttpResponse(
+            iter_file(open(result.asset.path, 'rb'), result.offset, result.length),
+            status=result.status,
+        )
+
+    if 'Content-Disposition' in response:
+        del response['Content-Disposition']
+    for name, value in result.headers:
+        response[name] = value
+
+    return response
@@ -10,14 +10,30 @@ class BundlingError(Exception):
     pass
 
 
+class EntryNotFound(Exception):
+    pass
+
+
 class WebpackWarning(Warning):
     pass
 
 
+class BuildServerFallbackWarning(WebpackWarning):
+    pass
+
+
 class BuildServerConnectionError(Exception):
     pass
 
 
+class BuildServerTimeout(BuildServerConnectionError):
+    pass
+
+
+class BuildServerUnavailable(BuildServerConnectionError):
+    pass
+
+
 class BuildServerUnexpectedResponse(Exception):
     pass
 
@@ -27,4 +43,15 @@ class ManifestMissingEntry(Exception):
 
 
 class ManifestDoesNotExist(Exception):
-    pass
\ No newline at end of file
+    pass
+
+
+class ManifestChanged(Exception):
+    pass
+
+
+class ManifestGenerationError(Exception):
+    def __init__(self, message, errors=None):
+        super(ManifestGenerationError, self).__init__(message)
+        # A list of (key, exception) tuples for each entry that failed to build
+        self.errors = errors or []
\ No newline at end of file
@@ -0,0 +1,225 @@
+import copy
+import datetime
+import decimal
+import hashlib
+import json
+import os
+import uuid
+from optional_django import six
+
+# The number of contexts whose hashes are memoized by `hash_context`
+CONTEXT_HASH_CACHE_SIZE = 1024
+
+
+def hash_file(path):
+    """
+    Returns the sha1 digest of the file at `path`.
+    """
+    digest = hashlib.sha1()
+    with open(path, 'rb') as _file:
+        for chunk in iter(lambda: _file.read(64 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _iter_modules(stats):
+    for module in stats.get('modules', ()):
+        yield module
+    # Multi-compiler builds nest the stats of each compiler
+    for child in stats.get('children', ()):
+        for module in _iter_modules(child):
+            yield module
+
+
+def compact_stats(stats):
+    """
+    Returns a copy of webpack's stats which only contains the parts used once a build has been
+    processed: the build's hash and the identifiers of its modules, which are used to fingerprint
+    the build.
+    """
+    if not stats:
+        return stats
+
+    compacted = {'hash': stats.get('hash', None)}
+    if 'modules' in stats:
+        compacted['modules'] = [
+            {'identifier': module['identifier']} for module in stats['modules'] if module.get('identifier', None)
+        ]
+    if 'children' in stats:
+        compacted['children'] = [compact_stats(child) for child in stats['children']]
+    return compacted
+
+
+def get_input_files(stats):
+    """
+    Returns the absolute paths of the source files recorded in webpack's stats.
+    """
+    paths = set()
+    for module in _iter_modules(stats or {}):
+        identifier = module.get('identifier', None)
+        if not identifier:
+            continue
+        # Identifiers are prefixed with any loaders and may contain a query
+        path = identifier.split('!')[-1].split('?')[0]
+        if os.path.isabs(path) and os.path.isfile(path):
+            paths.add(path)
+    return sorted(paths)
+
+
+def generate_fingerprint(options, stats):
+    """
+    Returns a fingerprint of a build, which covers the options sent to the build server, the
+    content of the config file, and the modification time, size and content of every source file.
+    """
+    inputs = {}
+    for path in get_input_files(stats):
+        file_stat = os.stat(path)
+        inputs[path] = [file_stat.st_mtime, file_stat.st_size, hash_file(path)]
+
+    return {
+        'options': options['__python_webpack_hash__'],
+        'config': hash_file(options['config']),
+        'inputs': inputs,
+    }
+
+
+def is_fresh(fingerprint, options):
+    """
+    Indicates that a build with the fingerprint would produce the same output, if run with `options`.
+
+    Source files are only hashed if their modification time has changed but their size has not.
+    Fingerprints which record no source files - as occurs if the build server omitted the modules
+    from its stats - are always stale, as there is nothing to detect a change with.
+    """
+    if not fingerprint or fingerprint.get('options', None) != options['__python_webpack_hash__']:
+        return False
+
+    if not fingerprint.get('inputs', None):
+        return False
+
+    try:
+        if fingerprint.get('config', None) != hash_file(options['config']):
+            return False
+
+        for path, (mtime, size, digest) in fingerprint['inputs'].items():
+            file_stat = os.stat(path)
+            if file_stat.st_size != size:
+                return False
+            if file_stat.st_mtime != mtime and hash_file(path) != digest:
+                return False
+    except (OSError, IOError):
+        return False
+
+    return True
+
+
+def _encode_value(obj):
+    if isinstance(obj, (set, frozenset)):
+        # Sets are unordered, so their members are sorted by their own serialization
+        return sorted(obj, key=_serialize)
+    if isinstance(obj, (datetime.datetime, datetime.date, datetime.time)):
+        return obj.isoformat()
+    if isinstance(obj, (decimal.Decimal, uuid.UUID)):
+        return str(obj)
+    raise TypeError('Values of type {} cannot be included in a context hash'.format(type(obj).__name__))
+
+
+def _serialize(obj):
+    return json.dumps(obj, sort_keys=True, default=_encode_value)
+
+
+def _hash_context(context):
+    return hashlib.md5(_serialize(context).encode('utf-8')).hexdigest()
+
+
+class FrozenContext(dict):
+    """
+    An immutable context which hashes itself once, on creation. FrozenContext objects can be
+    passed anywhere that a context is accepted, and avoid the cost of hashing the context when
+    reading from a manifest.
+
+        CONTEXT = FrozenContext({'foo': 'bar'})
+
+        webpack('path/to/webpack.config.js', context=CONTEXT)
+    """
+    __slots__ = ('context_hash',)
+
+    def __init__(self, *args, **kwargs):
+        super(FrozenContext, self).__init__(*args, **kwargs)
+        self.context_hash = _hash_context(self)
+
+    def _immutable(self, *args, **kwargs):
+        raise TypeError('FrozenContext objects are immutable')
+
+    __setitem__ = __delitem__ = clear = pop = popitem = setdefault = update = _immutable
+
+    def __hash__(self):
+        return hash(self.context_hash)
+
+    def __reduce__(self):
+        return FrozenContext, (dict(self),)
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+
+_context_hashes = {}
+
+
+def _is_identical(obj, other):
+    """
+    Compares `obj` and `other` along with the types of their values, as values such as 1, 1.0
+    and True compare equal but are serialized differently.
+    """
+    if type(obj) is not type(other):
+        return False
+    if isinstance(obj, dict):
+        if set((type(key), key) for key in obj) != set((type(key), key) for key in other):
+            return False
+        return all(_is_identical(value, other[key]) for key, value in six.iteritems(obj))
+    if isinstance(obj, (list, tuple)):
+        return len(obj) == len(other) and all(_is_identical(a, b) for a, b in zip(obj, other))
+    if isinstance(obj, (set, frozenset)):
+        return _serialize(obj) == _serialize(other)
+    return obj == other
+
+
+def hash_context(context):
+    """
+    Returns the md5 hash of a canonical serialization of `context`, so that equal contexts have
+    equal hashes regardless of the order of their keys. Nested dicts, lists and tuples are
+    supported, as are sets, dates, times, decimals and UUIDs.
+
+    Hashes are memoized against the identity of the context object, so that repeated calls with
+    the same object only compare it to a copy of the hashed value. Contexts which are created
+    per call should be passed as a FrozenContext to avoid hashing them.
+    """
+    if isinstance(context, FrozenContext):
+        return context.context_hash
+
+    key = id(context)
+    entry = _context_hashes.get(key, None)
+    # Entries hold a reference to the context, so that its id is not reused while memoized, and
+    # compare it to a copy of the hashed value to detect mutations
+    if entry is not None and entry[0] is context and entry[1] is not None and _is_identical(context, entry[1]):
+        return entry[2]
+
+    context_hash = _hash_context(context)
+
+    snapshot = None
+    if entry is not None and entry[0] is context:
+        # Contexts are only copied once they have been seen twice, so that contexts which are
+        # created per call are not copied
+        try:
+            snapshot = copy.deepcopy(context)
+        except Exception:
+            pass
+
+    if len(_context_hashes) >= CONTEXT_HASH_CACHE_SIZE:
+        _context_hashes.clear()
+    _context_hashes[key] = (context, snapshot, context_hash)
+
+    return context_hash
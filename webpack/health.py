@@ -0,0 +1,126 @@
+import socket
+import threading
+from optional_django.six.moves.urllib.parse import urlparse
+from . import conf
+from .cache import _clock
+
+
+def probe(url, timeout):
+    """
+    Indicates that a TCP connection can be opened to the host and port of `url`.
+    """
+    parsed = urlparse(url)
+    port = parsed.port or (443 if parsed.scheme == 'https' else 80)
+    try:
+        connection = socket.create_connection((parsed.hostname, port), timeout)
+    except (socket.error, socket.timeout):
+        return False
+    connection.close()
+    return True
+
+
+class HealthCheck(object):
+    """
+    Probes a server and caches the result for `ttl` seconds, which defaults to the
+    BUILD_HEALTH_CHECK_TTL setting. The outcome of other requests to the server can
+    be recorded with `set`.
+    """
+    def __init__(self, url, ttl=None, timeout=None):
+        self.url = url
+        self.ttl = ttl
+        self.timeout = timeout
+        self._state = None
+
+    def get_ttl(self):
+        if self.ttl is None:
+            return conf.settings.BUILD_HEALTH_CHECK_TTL
+        return self.ttl
+
+    def check(self, force=False):
+        state = self._state
+        if not force and state is not None and _clock() - state[1] < self.get_ttl():
+            return state[0]
+
+        timeout = self.timeout
+        if timeout is None:
+            timeout = conf.settings.BUILD_CONNECT_TIMEOUT
+
+        healthy = probe(self.url, timeout)
+        self.set(healthy)
+        return healthy
+
+    def set(self, healthy):
+        self._state = (healthy, _clock())
+
+
+class CircuitBreaker(object):
+    """
+    Stops requests to a failing server.
+
+    Once `threshold` consecutive failures have been recorded, the breaker opens and `allow`
+    returns False for `cooldown` seconds. After the cooldown, a single trial request is
+    allowed: if it succeeds, the breaker closes, otherwise it opens for another cooldown.
+
+    Unless provided, the threshold and cooldown are read from the BUILD_FAILURE_THRESHOLD and
+    BUILD_FAILURE_COOLDOWN settings. A threshold of None or 0 disables the breaker.
+    """
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half-open'
+
+    def __init__(self, threshold=None, cooldown=None):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.state = self.CLOSED
+        self.failures = 0
+        self._opened_at = None
+        self._lock = threading.Lock()
+
+    def get_threshold(self):
+        if self.threshold is None:
+            return conf.settings.BUILD_FAILURE_THRESHOLD
+        return self.threshold
+
+    def get_cooldown(self):
+        if self.cooldown is None:
+            return conf.settings.BUILD_FAILURE_COOLDOWN
+        return self.cooldown
+
+    def allow(self):
+        """
+        Indicates that a request may be sent. When the cooldown has elapsed, the first caller
+        is allowed through as a trial and the breaker moves to the half-open state.
+        """
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and _clock() - self._opened_at >= self.get_cooldown():
+                self.state = self.HALF_OPEN
+                return True
+            return False
+
+    def retry_after(self):
+        """
+        Returns the number of seconds until a trial request will be allowed.
+        """
+        with self._lock:
+            if self.state != self.OPEN:
+                return 0
+            return max(0, self.get_cooldown() - (_clock() - self._opened_at))
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+            self._opened_at = None
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            threshold = self.get_threshold()
+            if self.state == self.HALF_OPEN or (threshold and self.failures >= threshold):
+                self.state = self.OPEN
+                self._opened_at = _clock()
+
+    def reset(self):
+        self.record_success()
@@ -0,0 +1,101 @@
+import io
+import os
+import re
+from . import conf
+from .cache import ResultCache
+
+INLINE_ELEMENTS = {
+    'js': ('<script>', '</script>'),
+    'css': ('<style>', '</style>'),
+}
+
+# Prevent the content from closing the element that it is inlined into
+_CLOSING_TAGS = {
+    'js': re.compile(r'</(script)', re.IGNORECASE),
+    'css': re.compile(r'</(style)', re.IGNORECASE),
+}
+
+
+class AssetContentCache(object):
+    """
+    A bounded, in-memory cache of the contents of assets. Entries are keyed by path and
+    modification time, so changed files are read again.
+    """
+    def __init__(self, size=None):
+        # If undefined, the size is read from the INLINE_CACHE_SIZE setting
+        self.size = size
+        self._cache = ResultCache()
+
+    def read(self, path, max_size):
+        """
+        Returns the content of the file at `path`, or None if the file does not exist, is
+        larger than `max_size` bytes, or is not encoded as UTF-8.
+        """
+        try:
+            file_stat = os.stat(path)
+        except OSError:
+            return None
+
+        if file_stat.st_size > max_size:
+            return None
+
+        self._cache.size = self.size or conf.settings.INLINE_CACHE_SIZE
+
+        key = (path, file_stat.st_mtime, file_stat.st_size)
+        content = self._cache.get(key)
+        if content is None:
+            try:
+                with io.open(path, 'r', encoding='utf-8') as asset_file:
+                    content = asset_file.read()
+            except UnicodeDecodeError:
+                # Record that the file cannot be inlined, so that it is not read on every render
+                content = False
+            self._cache.set(key, content)
+
+        if content is False:
+            return None
+
+        return content
+
+    def clear(self):
+        self._cache.invalidate()
+
+
+content_cache = AssetContentCache()
+
+
+def get_asset_path(url, path):
+    """
+    Returns the location of an asset. If the path recorded during the build does not exist
+    - for example, if a manifest was generated on another machine - the path is derived from
+    the url and the OUTPUT_ROOT and STATIC_URL settings.
+    """
+    if path and os.path.exists(path):
+        return path
+
+    static_url = conf.settings.STATIC_URL
+    if static_url and url.startswith(static_url):
+        relative_path = url[len(static_url):].lstrip('/')
+        return os.path.join(conf.settings.OUTPUT_ROOT, *relative_path.split('/'))
+
+    return path
+
+
+def render_inline(asset_type, url, path, max_size=None, cache=content_cache):
+    """
+    Returns an element containing the asset's content, or None if the asset cannot be inlined.
+    """
+    if max_size is None:
+        max_size = conf.settings.INLINE_MAX_SIZE
+
+    path = get_asset_path(url, path)
+    if not path:
+        return None
+
+    content = cache.read(path, max_size)
+    if content is None:
+        return None
+
+    opening_tag, closing_tag = INLINE_ELEMENTS[asset_type]
+    content = _CLOSING_TAGS[asset_type].sub(r'<\\/\1', content)
+    return u'{}{}{}'.format(opening_tag, content, closing_tag)
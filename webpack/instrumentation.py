@@ -0,0 +1,186 @@
+import threading
+import warnings
+from . import conf
+from .cache import _clock
+from .exceptions import WebpackWarning
+
+# The upper bounds, in seconds, of the histogram buckets
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, float('inf'))
+
+
+class Event(object):
+    """
+    An instrumented operation. `name` is one of 'build', 'manifest.load', 'manifest.read' or
+    'render', and `data` contains details of the operation, such as the options hash or the
+    size of the payload. Once the operation has finished, `duration` is the number of seconds
+    that it took and `outcome` describes its result.
+    """
+    __slots__ = ('name', 'data', 'started', 'duration', 'outcome', 'error')
+
+    def __init__(self, name, data):
+        self.name = name
+        self.data = data
+        self.started = _clock()
+        self.duration = None
+        self.outcome = None
+        self.error = None
+
+    def __repr__(self):
+        return '<Event {} {} {}>'.format(self.name, self.outcome, self.data)
+
+
+class Hook(object):
+    """
+    A list of callbacks which are called with each Event.
+    """
+    def __init__(self):
+        self.receivers = []
+
+    def connect(self, callback):
+        if callback not in self.receivers:
+            self.receivers = self.receivers + [callback]
+
+    def disconnect(self, callback):
+        self.receivers = [receiver for receiver in self.receivers if receiver != callback]
+
+    def send(self, event):
+        for receiver in self.receivers:
+            try:
+                receiver(event)
+            except Exception as e:
+                # Instrumentation should never break the operation that it observes
+                warnings.warn('Instrumentation hook {!r} failed: {}'.format(receiver, e), WebpackWarning)
+
+
+# Called when an operation starts and finishes
+before = Hook()
+after = Hook()
+
+
+class Histogram(object):
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0
+
+    def observe(self, value):
+        self.count += 1
+        self.sum += value
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+
+    def dump(self):
+        cumulative = 0
+        buckets = []
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            buckets.append((bound, cumulative))
+        return {'count': self.count, 'sum': self.sum, 'buckets': buckets}
+
+
+class Metrics(object):
+    """
+    In-process counters and histograms of instrumented operations.
+
+    Events are counted by name and outcome, their durations are recorded in a histogram per
+    name, and the sizes of payloads are summed per name.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.counters = {}
+            self.durations = {}
+            self.sizes = {}
+
+    def record(self, event):
+        with self._lock:
+            key = (event.name, event.outcome)
+            self.counters[key] = self.counters.get(key, 0) + 1
+
+            histogram = self.durations.get(event.name, None)
+            if histogram is None:
+                histogram = self.durations[event.name] = Histogram()
+            histogram.observe(event.duration)
+
+            size = event.data.get('size', None)
+            if size is not None:
+                self.sizes[event.name] = self.sizes.get(event.name, 0) + size
+
+    def dump(self):
+        """
+        Returns a JSON-serializable snapshot of the metrics.
+        """
+        with self._lock:
+            counters = {}
+            for (name, outcome), count in self.counters.items():
+                counters.setdefault(name, {})[outcome] = count
+            return {
+                'counters': counters,
+                'durations': dict((name, histogram.dump()) for name, histogram in self.durations.items()),
+                'sizes': dict(self.sizes),
+            }
+
+    def render_prometheus(self):
+        """
+        Returns the metrics in Prometheus' text exposition format.
+        """
+        dump = self.dump()
+        lines = [
+            '# TYPE webpack_events_total counter',
+        ]
+        for name, outcomes in sorted(dump['counters'].items()):
+            for outcome, count in sorted(outcomes.items()):
+                lines.append('webpack_events_total{{event="{}",outcome="{}"}} {}'.format(name, outcome, count))
+
+        lines.append('# TYPE webpack_event_duration_seconds histogram')
+        for name, histogram in sorted(dump['durations'].items()):
+            for bound, count in histogram['buckets']:
+                le = '+Inf' if bound == float('inf') else repr(bound)
+                lines.append('webpack_event_duration_seconds_bucket{{event="{}",le="{}"}} {}'.format(name, le, count))
+            lines.append('webpack_event_duration_seconds_sum{{event="{}"}} {}'.format(name, histogram['sum']))
+            lines.append('webpack_event_duration_seconds_count{{event="{}"}} {}'.format(name, histogram['count']))
+
+        lines.append('# TYPE webpack_payload_bytes_total counter')
+        for name, size in sorted(dump['sizes'].items()):
+            lines.append('webpack_payload_bytes_total{{event="{}"}} {}'.format(name, size))
+
+        return '\n'.join(lines) + '\n'
+
+
+metrics = Metrics()
+
+
+def start(name, **data):
+    """
+    Returns an Event for an operation, or None if nothing is observing operations - in which
+    case `finish` does nothing.
+    """
+    if not before.receivers and not after.receivers and not conf.settings.METRICS:
+        return None
+
+    event = Event(name, data)
+    before.send(event)
+    return event
+
+
+def finish(event, outcome='success', error=None, **data):
+    """
+    Records the outcome of an operation which was started with `start`.
+    """
+    if event is None:
+        return
+
+    event.duration = _clock() - event.started
+    event.error = error
+    event.outcome = 'error' if error is not None else outcome
+    event.data.update(data)
+
+    if conf.settings.METRICS:
+        metrics.record(event)
+    after.send(event)
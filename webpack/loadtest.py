@@ -0,0 +1,172 @@
+import math
+import threading
+import time
+import requests
+from . import conf
+from .build_server import BuildServer
+from .cache import _clock
+from .exceptions import ImproperlyConfigured
+from .manifest import _iter_entries
+from .options import generate_compiler_options
+
+
+def percentile(values, percent):
+    """
+    Returns the nearest-rank percentile of a sorted list of values.
+    """
+    if not values:
+        return None
+    index = int(math.ceil(percent / 100.0 * len(values))) - 1
+    return values[max(0, min(len(values) - 1, index))]
+
+
+class LoadTestResult(object):
+    def __init__(self):
+        self.latencies = []
+        self.errors = {}
+        self.elapsed = 0
+        self._lock = threading.Lock()
+
+    @property
+    def requests(self):
+        return len(self.latencies) + sum(self.errors.values())
+
+    @property
+    def throughput(self):
+        if not self.elapsed:
+            return 0
+        return self.requests / self.elapsed
+
+    def record(self, latency, error=None):
+        with self._lock:
+            if error is None:
+                self.latencies.append(latency)
+            else:
+                self.errors[error] = self.errors.get(error, 0) + 1
+
+    def summary(self):
+        latencies = sorted(self.latencies)
+        return {
+            'requests': self.requests,
+            'errors': dict(self.errors),
+            'elapsed': self.elapsed,
+            'throughput': self.throughput,
+            'p50': percentile(latencies, 50),
+            'p95': percentile(latencies, 95),
+            'p99': percentile(latencies, 99),
+            'max': latencies[-1] if latencies else None,
+        }
+
+    def format(self):
+        summary = self.summary()
+        lines = [
+            'Requests:   {} in {:.2f}s'.format(summary['requests'], summary['elapsed']),
+            'Throughput: {:.1f} requests/s'.format(summary['throughput']),
+        ]
+        for key in ('p50', 'p95', 'p99', 'max'):
+            if summary[key] is not None:
+                lines.append('{:<12}{:.1f}ms'.format(key + ':', summary[key] * 1000))
+        if summary['errors']:
+            for error, count in sorted(summary['errors'].items()):
+                lines.append('Errors:     {} {}'.format(count, error))
+        else:
+            lines.append('Errors:     0')
+        return '\n'.join(lines)
+
+
+def get_entries(configs=None):
+    """
+    Returns a list of (config_file, context) tuples for `configs` or, if not provided, the
+    entries of the MANIFEST setting.
+    """
+    entries = configs or conf.settings.MANIFEST
+    if not entries:
+        raise ImproperlyConfigured('No config files were provided and the MANIFEST setting has not been defined')
+    return list(_iter_entries(entries))
+
+
+def send_request(build_server, options):
+    """
+    Sends a build request and returns the name of the error that occurred, if any.
+    """
+    try:
+        res = build_server.post(json=options)
+    except requests.Timeout:
+        return 'timeout'
+    except requests.ConnectionError:
+        return 'connection'
+
+    if res.status_code != 200:
+        return 'status {}'.format(res.status_code)
+
+    try:
+        output = res.json()
+    except ValueError:
+        return 'invalid response'
+
+    if output.get('error', None):
+        return 'build'
+
+
+def run_load_test(entries, url=None, concurrency=10, rate=None, total=100, duration=None, setting_overrides=None):
+    """
+    Replays build requests for `entries` - a list of (config_file, context) tuples - against the build
+    server at `url`, which defaults to the BUILD_URL setting.
+
+    `concurrency` threads send requests until `total` requests have been sent or, if provided,
+    `duration` seconds have passed. If `rate` is provided, requests are started at that many per
+    second and their latency is measured from when they were scheduled, so that a slow server
+    is not hidden by requests that were delayed while waiting for a thread.
+
+    Requests are sent directly rather than via `BuildServer.build`, so identical concurrent requests
+    are not coalesced and failures do not open the circuit breaker.
+    """
+    build_server = BuildServer(url or conf.settings.BUILD_URL)
+    options = [
+        generate_compiler_options(config_file, context, setting_overrides) for config_file, context in entries
+    ]
+
+    result = LoadTestResult()
+    lock = threading.Lock()
+    counter = [0]
+    started = _clock()
+
+    def next_request():
+        with lock:
+            index = counter[0]
+            if duration is None and index >= total:
+                return None
+            counter[0] += 1
+
+        if rate:
+            scheduled = started + index / float(rate)
+        else:
+            scheduled = _clock()
+
+        if duration is not None and scheduled - started >= duration:
+            return None
+
+        delay = scheduled - _clock()
+        if delay > 0:
+            time.sleep(delay)
+
+        return index, scheduled
+
+    def worker():
+        while True:
+            request = next_request()
+            if request is None:
+                return
+            index, scheduled = request
+            error = send_request(build_server, options[index % len(options)])
+            result.record(_clock() - scheduled, error)
+
+    threads = [threading.Thread(target=worker) for i in range(concurrency)]
+    for thread in threads:
+        thread.daemon = True
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    result.elapsed = _clock() - started
+    return result
@@ -1,11 +1,162 @@
-from django.core.management.base import BaseCommand
+import json
+from optparse import make_option
+import django
+from django.core.management.base import BaseCommand, CommandError
 from ...manifest import populate_manifest_file
 from ...conf import settings
 
+ACTIONS = ('populate', 'loadtest')
+
+# Tuples of (flag, options), which are declared with argparse or - for Django < 1.8 - optparse
+OPTIONS = (
+    ('--parallel', {
+        'type': int,
+        'default': None,
+        'dest': 'parallel',
+        'help': 'The number of manifest entries to build concurrently. Defaults to the MANIFEST_WORKERS setting.',
+    }),
+    ('--incremental', {
+        'action': 'store_true',
+        'default': None,
+        'dest': 'incremental',
+        'help': 'Only rebuild the entries of the existing manifest which are stale.',
+    }),
+    ('--no-resume', {
+        'action': 'store_false',
+        'default': True,
+        'dest': 'resume',
+        'help': 'Rebuild every entry, rather than resuming from the journal of a previous run which did not complete.',
+    }),
+    ('--config', {
+        'action': 'append',
+        'default': None,
+        'dest': 'configs',
+        'help': 'loadtest: a config file to send build requests for. Defaults to the entries of the MANIFEST setting.',
+    }),
+    ('--concurrency', {
+        'type': int,
+        'default': 10,
+        'dest': 'concurrency',
+        'help': 'loadtest: the number of requests to send concurrently.',
+    }),
+    ('--rate', {
+        'type': float,
+        'default': None,
+        'dest': 'rate',
+        'help': 'loadtest: the number of requests to start per second. Defaults to as many as possible.',
+    }),
+    ('--requests', {
+        'type': int,
+        'default': 100,
+        'dest': 'requests',
+        'help': 'loadtest: the number of requests to send.',
+    }),
+    ('--duration', {
+        'type': float,
+        'default': None,
+        'dest': 'duration',
+        'help': 'loadtest: send requests for this many seconds, rather than a fixed number of requests.',
+    }),
+    ('--url', {
+        'default': None,
+        'dest': 'url',
+        'help': 'loadtest: the url of the build server. Defaults to the BUILD_URL setting.',
+    }),
+    ('--stub', {
+        'action': 'store_true',
+        'default': False,
+        'dest': 'stub',
+        'help': 'loadtest: send requests to a local stub of the build server, rather than webpack-build.',
+    }),
+    ('--stub-latency', {
+        'type': float,
+        'default': 0,
+        'dest': 'stub_latency',
+        'help': 'loadtest: the number of seconds that the stub waits before each response.',
+    }),
+    ('--json', {
+        'action': 'store_true',
+        'default': False,
+        'dest': 'json',
+        'help': 'loadtest: output the results as JSON.',
+    }),
+)
+
+
+def _make_option(flag, options):
+    if 'type' in options:
+        # optparse identifies types by name
+        options = dict(options, type=options['type'].__name__)
+    return make_option(flag, **options)
+
 
 class Command(BaseCommand):
-    help = 'Populates webpack\'s manifest file'
+    help = (
+        'Populates webpack\'s manifest file or, with the `loadtest` action, measures the throughput '
+        'and latency of the build server'
+    )
+    args = '[{}]'.format('|'.join(ACTIONS))
+
+    if django.VERSION < (1, 8):
+        # Earlier versions do not call `add_arguments`
+        option_list = BaseCommand.option_list + tuple(_make_option(flag, options) for flag, options in OPTIONS)
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'action',
+            nargs='?',
+            default='populate',
+            choices=ACTIONS,
+            help='Defaults to populating the manifest file.',
+        )
+        for flag, options in OPTIONS:
+            parser.add_argument(flag, **options)
 
     def handle(self, *args, **options):
-        populate_manifest_file()
+        # Django < 1.8 passes the action as a positional argument
+        action = options.get('action', None)
+        if action is None:
+            if len(args) > 1:
+                raise CommandError('Expected a single action, received: {}'.format(', '.join(args)))
+            action = args[0] if args else 'populate'
+        if action not in ACTIONS:
+            raise CommandError('Unknown action "{}", expected one of {}'.format(action, ', '.join(ACTIONS)))
+
+        if action == 'loadtest':
+            return self.loadtest(options)
+
+        populate_manifest_file(
+            workers=options.get('parallel'),
+            incremental=options.get('incremental'),
+            resume=options.get('resume', True),
+        )
         print('Manifest written to: {}'.format(settings.MANIFEST_PATH))
+
+    def loadtest(self, options):
+        # The build server is only imported when it is needed
+        from ...loadtest import get_entries, run_load_test
+        from ...stub_server import StubBuildServer
+
+        stub = None
+        url = options.get('url')
+        if options.get('stub'):
+            stub = StubBuildServer(latency=options.get('stub_latency')).start()
+            url = stub.url
+
+        try:
+            result = run_load_test(
+                get_entries(options.get('configs')),
+                url=url,
+                concurrency=options.get('concurrency'),
+                rate=options.get('rate'),
+                total=options.get('requests'),
+                duration=options.get('duration'),
+            )
+        finally:
+            if stub is not None:
+                stub.stop()
+
+        if options.get('json'):
+            print(json.dumps(result.summary(), indent=2, sort_keys=True))
+        else:
+            print(result.format())
@@ -1,90 +1,567 @@
+import functools
 import json
-import hashlib
 import os
+import stat
+import tempfile
+import threading
+import warnings
 from optional_django import six
-from . import conf
+from . import conf, instrumentation
 from .bundle import WebpackBundle
-from .exceptions import ImproperlyConfigured, ManifestMissingEntry, ManifestDoesNotExist
+from .cache import _clock
+from .fingerprint import generate_fingerprint, hash_context, is_fresh
+from .options import generate_compiler_options
+from .exceptions import (
+    ImproperlyConfigured, ManifestMissingEntry, ManifestDoesNotExist, ManifestChanged, ManifestGenerationError,
+    WebpackWarning
+)
 
 
 def generate_key(config_file, context=None):
     if not context:
         return config_file
 
-    hashable_context = json.dumps(context).encode('utf-8')
-    context_hash = hashlib.md5(hashable_context).hexdigest()
-    return '{}__{}'.format(config_file, context_hash)
+    return '{}__{}'.format(config_file, hash_context(context))
 
 
-def _add_entry_to_manifest(manifest, settings, config_file, context=None):
+def _iter_entries(entries):
+    if isinstance(entries, dict):
+        for config_file, contexts in six.iteritems(entries):
+            contexts = contexts or (None,)
+            for context in contexts:
+                yield config_file, context
+    else:
+        for config_file in entries:
+            yield config_file, None
+
+
+def _prerender(bundle, data, prerender):
+    if not prerender:
+        return data
+    if prerender is True:
+        rendered = bundle.prerender()
+    else:
+        rendered = bundle.prerender(prerender)
+    return dict(data, rendered=rendered)
+
+
+def _build_entry(settings, prerender, config_file, context=None):
     from .compiler import webpack  # Avoiding a circular import
 
     key = generate_key(config_file, context)
     bundle = webpack(config_file, context=context, settings=settings)
-    manifest[key] = bundle.data
 
+    # Stats which are loaded lazily - for example, if the bundle was read from a manifest - are
+    # only included in the bundle's data once requested
+    bundle.get_stats()
+    data = bundle.data
+    if bundle.options is not None:
+        data['fingerprint'] = generate_fingerprint(bundle.options, data.get('stats', None))
 
-def generate_manifest(entries, settings=None):
-    manifest = {}
+    return key, _prerender(bundle, data, prerender)
 
-    if isinstance(entries, dict):
-        for config_file, contexts in six.iteritems(entries):
-            contexts = contexts or (None,)
-            for context in contexts:
-                _add_entry_to_manifest(manifest, settings, config_file, context)
+
+def _build_entry_safely(args):
+    settings, prerender, config_file, context = args
+    try:
+        return _build_entry(settings, prerender, config_file, context) + (None,)
+    except Exception as e:
+        return generate_key(config_file, context), None, e
+
+
+def _reuse_entry(data, settings, prerender, config_file, context):
+    """
+    Returns a copy of an entry from a previous manifest, or None if the entry is stale.
+    """
+    options = generate_compiler_options(config_file, extra_context=context, setting_overrides=settings)
+    if not is_fresh(data.get('fingerprint', None), options):
+        return None
+
+    if not all(os.path.exists(path) for path in data.get('assets', ())):
+        return None
+
+    data = dict(data)
+    data.pop('rendered', None)
+    return _prerender(WebpackBundle(data), data, prerender)
+
+
+def _find_reusable_entry(sources, key, settings, prerender, config_file, context):
+    """
+    Returns a tuple of (data, source) for the first fresh entry in `sources`, where `source` is
+    None unless it holds an identical copy of the data. Returns (None, None) if no entry is fresh.
+    """
+    for source in sources:
+        if source is None or key not in source:
+            continue
+        try:
+            entry = source[key]
+            data = _reuse_entry(entry, settings, prerender, config_file, context)
+        except Exception:
+            # Errors are reported by the build
+            data = None
+        if data is not None:
+            return data, (source if data == entry else None)
+    return None, None
+
+
+def _iter_manifest(entries, settings=None, workers=None, prerender=False, previous=()):
+    """
+    Yields a tuple of (key, data, source) for each entry as soon as it has been built or reused
+    from one of the `previous` mappings. `source` is the mapping which already holds the data, or
+    None if the entry was built or changed. See `generate_manifest`.
+    """
+    if workers is None:
+        workers = conf.settings.MANIFEST_WORKERS
+
+    jobs = []
+    for config_file, context in _iter_entries(entries):
+        key = generate_key(config_file, context)
+        data, source = _find_reusable_entry(previous, key, settings, prerender, config_file, context)
+        if data is not None:
+            yield key, data, source
+            continue
+        jobs.append((settings, prerender, config_file, context))
+
+    if workers <= 1 or len(jobs) <= 1:
+        for job in jobs:
+            yield _build_entry(*job) + (None,)
+        return
+
+    # Only imported when generating, as it is comparatively slow to import
+    from multiprocessing.pool import ThreadPool
+
+    pool = ThreadPool(min(workers, len(jobs)))
+    errors = []
+    try:
+        # Entries are yielded as they complete, so that they need not be held in memory
+        for index, key, data, error in pool.imap_unordered(_build_indexed_entry, enumerate(jobs)):
+            if error is None:
+                yield key, data, None
+            else:
+                errors.append((index, key, error))
+    finally:
+        pool.close()
+        pool.join()
+
+    if errors:
+        errors = [(key, error) for index, key, error in sorted(errors, key=lambda error: error[0])]
+        message = 'Failed to build {} of {} manifest entries'.format(len(errors), len(jobs))
+        for key, error in errors:
+            message += '\n\n{}: {}: {}'.format(key, type(error).__name__, error)
+        raise ManifestGenerationError(message, errors)
+
+
+def _build_indexed_entry(args):
+    index, job = args
+    return (index,) + _build_entry_safely(job)
+
+
+def generate_manifest(entries, settings=None, workers=None, prerender=False, previous=None):
+    """
+    Builds every entry and returns a dictionary mapping manifest keys to the build output.
+
+    If `workers` - which defaults to the MANIFEST_WORKERS setting - is greater than 1, entries
+    are built concurrently. In that case, every entry is attempted and any failures are
+    reported together in a ManifestGenerationError.
+
+    If `prerender` is True, each entry also stores its rendered elements under a `rendered` key.
+    `prerender` can also be an iterable of the renderers to store, see WebpackBundle.prerender.
+
+    Each entry records a `fingerprint` of its build. If `previous` - a manifest generated
+    earlier - is provided, its entries are reused whenever their fingerprints show that the
+    options, config file and source files are unchanged, and only stale entries are rebuilt.
+    """
+    return dict((key, data) for key, data, source in _iter_manifest(entries, settings, workers, prerender, (previous,)))
+
+
+def _replace_file(src, dest):
+    if hasattr(os, 'replace'):
+        os.replace(src, dest)
     else:
-        for config_file in entries:
-            _add_entry_to_manifest(manifest, settings, config_file)
+        # Python 2: renames are atomic on POSIX systems, but fail on Windows if `dest` exists
+        if os.name == 'nt' and os.path.exists(dest):
+            os.remove(dest)
+        os.rename(src, dest)
+
+
+def write_file_atomically(path, content):
+    """
+    Writes `content` to a temporary file alongside `path`, then renames it over `path`, so
+    that readers will only ever see the previous or the new content. `content` can be either
+    text, bytes or an iterable of text chunks.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix='.{}.'.format(os.path.basename(path)), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb' if isinstance(content, bytes) else 'w') as temp_file:
+            if isinstance(content, (bytes, six.string_types)):
+                temp_file.write(content)
+            else:
+                for chunk in content:
+                    temp_file.write(chunk)
+            temp_file.flush()
+            os.fsync(temp_file.fileno())
+
+        # Preserve the permissions of an existing file, as temporary files are only readable by their owner
+        if os.path.exists(path):
+            os.chmod(temp_path, stat.S_IMODE(os.stat(path).st_mode))
+        else:
+            os.chmod(temp_path, 0o644)
+
+        _replace_file(temp_path, path)
+    except Exception:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+def _iter_manifest_content(keys, get_entry):
+    """
+    Yields the serialized manifest in chunks of one entry, with the same formatting as
+    `json.dumps(manifest, indent=4, sort_keys=True)`.
+    """
+    keys = sorted(set(keys))
+    if not keys:
+        yield '{}'
+        return
 
-    return manifest
+    yield '{'
+    for i, key in enumerate(keys):
+        content = json.dumps(get_entry(key), indent=4, sort_keys=True, separators=(',', ': '))
+        # Serialized strings never contain newlines, so each line of the entry can be indented
+        yield '{}\n    {}: {}'.format(',' if i else '', json.dumps(key), content.replace('\n', '\n    '))
+    yield '\n}'
 
 
 def write_manifest(path, manifest):
-    content = json.dumps(manifest, indent=4, sort_keys=True)
+    write_file_atomically(path, _iter_manifest_content(manifest, manifest.__getitem__))
 
-    with open(path, 'w') as manifest_file:
-        manifest_file.write(content)
 
+class ManifestJournal(object):
+    """
+    An append-only file of manifest entries, which records each entry as soon as it has been
+    built so that an interrupted or failed `populate_manifest_file` can resume from the entries
+    that were completed.
 
-def read_manifest(path):
-    if not os.path.exists(path):
-        raise ManifestDoesNotExist('Cannot find webpack manifest file at {}'.format(path))
+    Each line of the file is a JSON object containing an entry's key and data. Only the offsets
+    of the entries are held in memory, and a later entry with the same key replaces an earlier
+    one. Entries are read through a single handle, which is held open until the journal is closed.
+    """
+    def __init__(self, path):
+        self.path = path
+        self.offsets = {}
+        self._file = None
+        self._reader = None
+        self._size = 0
+
+    def open(self, resume=True):
+        """
+        Opens the journal for writing. If `resume` is True, the entries of an existing journal are
+        kept, otherwise the journal is emptied.
+        """
+        self.offsets = {}
+        if resume and os.path.exists(self.path):
+            self._size = self._load_offsets()
+            self._file = open(self.path, 'r+b')
+            # Discard any partially written entry
+            self._file.truncate(self._size)
+            self._file.seek(self._size)
+        else:
+            self._size = 0
+            self._file = open(self.path, 'wb')
+
+    def _load_offsets(self):
+        offset = 0
+        with open(self.path, 'rb') as journal_file:
+            for line in journal_file:
+                if not line.endswith(b'\n'):
+                    break
+                try:
+                    key = json.loads(line.decode('utf-8'))['key']
+                except (ValueError, KeyError, TypeError):
+                    break
+                self.offsets[key] = offset
+                offset += len(line)
+        return offset
+
+    def append(self, key, data):
+        line = (json.dumps({'key': key, 'data': data}, sort_keys=True) + '\n').encode('utf-8')
+        self._file.write(line)
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self.offsets[key] = self._size
+        self._size += len(line)
+
+    def __contains__(self, key):
+        return key in self.offsets
+
+    def __getitem__(self, key):
+        offset = self.offsets[key]
+        if self._reader is None:
+            self._reader = open(self.path, 'rb')
+        self._reader.seek(offset)
+        return json.loads(self._reader.readline().decode('utf-8'))['data']
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if self._reader is not None:
+            self._reader.close()
+            self._reader = None
+
+    def remove(self):
+        self.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+def _get_signature(file_stat):
+    return file_stat.st_mtime, file_stat.st_ino, file_stat.st_size
+
+
+def _load_manifest(path):
+    """
+    Returns a tuple of the manifest at `path` and a signature which identifies the version of
+    the file that was read.
+    """
+    try:
+        manifest_file = open(path, 'r')
+    except IOError:
+        if not os.path.exists(path):
+            raise ManifestDoesNotExist('Cannot find webpack manifest file at {}'.format(path))
+        raise
 
-    with open(path, 'r') as manifest_file:
+    with manifest_file:
+        # Stat the open file, so the signature matches the content even if the file is replaced
+        signature = _get_signature(os.fstat(manifest_file.fileno()))
         content = manifest_file.read()
 
-    return json.loads(content)
+    return json.loads(content), signature
 
 
-def populate_manifest_file():
+def read_manifest(path):
+    return _load_manifest(path)[0]
+
+
+def _read_stats(path, key, signature):
+    manifest, current_signature = _load_manifest(path)
+    # Avoid returning stats which do not match the rest of the bundle
+    if current_signature != signature:
+        raise ManifestChanged(
+            'The webpack manifest file at {} has changed since it was loaded, reload it to read the stats '
+            'of {}'.format(path, key)
+        )
+    return manifest.get(key, {}).get('stats', None)
+
+
+def populate_manifest_file(workers=None, incremental=None, resume=True):
+    """
+    Builds the entries in the MANIFEST setting and writes the manifest to MANIFEST_PATH.
+
+    Entries are written to a journal alongside the manifest as they are built, and the manifest
+    is only written once every entry has been built. If the manifest is not written - for example,
+    because an entry failed to build or the process was interrupted - the next call resumes from
+    the journal and only rebuilds the entries that are missing or stale, unless `resume` is False.
+
+    If `incremental` - which defaults to the MANIFEST_INCREMENTAL setting - is True, entries of the
+    existing manifest are reused unless they are stale, see `generate_manifest`.
+    """
     if not conf.settings.MANIFEST:
         raise ImproperlyConfigured('webpack\'s MANIFEST setting has not been defined')
 
-    if not conf.settings.MANIFEST_PATH:
+    path = conf.settings.MANIFEST_PATH
+    if not path:
         raise ImproperlyConfigured('webpack\'s MANIFEST_PATH setting has not been defined')
 
-    manifest = generate_manifest(
-        conf.settings.MANIFEST,
-        conf.settings.MANIFEST_SETTINGS,
-    )
+    if incremental is None:
+        incremental = conf.settings.MANIFEST_INCREMENTAL
+
+    previous = None
+    if incremental and os.path.exists(path):
+        try:
+            previous = read_manifest(path)
+        except ValueError:
+            # A corrupt manifest is rebuilt from scratch
+            previous = None
+
+    settings = conf.settings.MANIFEST_SETTINGS
+    compress = conf.settings.COMPRESS_ASSETS
+    if compress:
+        # Assets are compressed together once every entry has been built
+        settings = dict(settings or {}, COMPRESS_ASSETS=False)
+
+    journal = ManifestJournal(get_journal_path(path))
+    journal.open(resume=resume)
+
+    keys = set()
+    assets = []
+    try:
+        entries = _iter_manifest(
+            conf.settings.MANIFEST,
+            settings,
+            workers=workers,
+            prerender=conf.settings.MANIFEST_PRERENDER,
+            previous=(journal, previous),
+        )
+        for key, data, source in entries:
+            # Entries resumed from the journal are already recorded
+            if source is not journal:
+                journal.append(key, data)
+            keys.add(key)
+            assets.extend(data.get('assets', ()))
+    finally:
+        journal.close()
 
-    write_manifest(conf.settings.MANIFEST_PATH, manifest)
+    if compress:
+        from .compression import compress_assets  # Avoiding a circular import
+        compress_assets(assets)
+
+    try:
+        write_file_atomically(path, _iter_manifest_content(keys, journal.__getitem__))
+    finally:
+        journal.close()
+    journal.remove()
+
+
+def get_journal_path(path):
+    """
+    Returns the path to the journal used when populating the manifest at `path`.
+    """
+    return path + '.journal'
 
 
 class ManifestReader(object):
-    manifest = None
+    """
+    Reads bundles from the manifest file at `path`, which defaults to the MANIFEST_PATH setting.
+
+    A bundle is created for each entry when the manifest is loaded, and is reused for every read
+    of that entry. webpack's stats are omitted from the bundles and are re-read from the file if
+    they are requested with `get_stats`. If the file has changed since it was loaded, a
+    ManifestChanged exception is raised rather than returning stats from another version.
+
+    If the MANIFEST_RELOAD setting is True, the file is checked for changes at most once every
+    MANIFEST_RELOAD_INTERVAL seconds. When a change is detected, the new manifest is parsed in a
+    background thread and swapped in once complete, while reads continue to use the previous
+    manifest.
+    """
+    def __init__(self, path=None):
+        self.path = path
+        self.bundles = None
+        self._loaded_path = None
+        self._signature = None
+        self._last_check = None
+        self._reloading = False
+        self._lock = threading.Lock()
+
+    def get_path(self):
+        return self.path or conf.settings.MANIFEST_PATH
+
+    def load(self, path=None):
+        """
+        Synchronously (re)loads the manifest.
+        """
+        path = path or self.get_path()
+        bundles, signature = self._load_bundles(path)
+        with self._lock:
+            self._swap(path, bundles, signature)
+
+    def _load_bundles(self, path):
+        event = instrumentation.start('manifest.load', path=path)
+        try:
+            manifest, signature = _load_manifest(path)
+        except Exception as e:
+            instrumentation.finish(event, error=e)
+            raise
+
+        bundles = {}
+        for key, data in six.iteritems(manifest):
+            # webpack's stats are typically the bulk of an entry, so they are only read if requested
+            stats_loader = None
+            if 'stats' in data:
+                del data['stats']
+                stats_loader = functools.partial(_read_stats, path, key, signature)
+            # Fingerprints are only used when regenerating the manifest
+            data.pop('fingerprint', None)
+            bundles[key] = WebpackBundle(data, rendered=data.get('rendered', None), stats_loader=stats_loader)
+
+        instrumentation.finish(event, size=signature[2], entries=len(bundles))
+
+        return bundles, signature
+
+    def _swap(self, path, bundles, signature):
+        self.bundles = bundles
+        self._loaded_path = path
+        self._signature = signature
+        self._last_check = _clock()
+
+    def _reload_in_background(self, path):
+        try:
+            bundles, signature = self._load_bundles(path)
+        except Exception as e:
+            # Continue to serve the previous manifest, the load will be retried on the next check
+            warnings.warn('Failed to reload manifest file {}: {}'.format(path, e), WebpackWarning)
+            with self._lock:
+                self._reloading = False
+            return
+
+        with self._lock:
+            self._reloading = False
+            if path == self._loaded_path:
+                self._swap(path, bundles, signature)
+
+    def check_for_changes(self):
+        """
+        Starts a background reload if the manifest file has been modified or replaced.
+        """
+        path = self._loaded_path
+        now = _clock()
+
+        with self._lock:
+            if self._reloading or now - self._last_check < conf.settings.MANIFEST_RELOAD_INTERVAL:
+                return
+            self._last_check = now
+
+        try:
+            signature = _get_signature(os.stat(path))
+        except OSError:
+            return
+
+        if signature == self._signature:
+            return
+
+        with self._lock:
+            if self._reloading:
+                return
+            self._reloading = True
+
+        thread = threading.Thread(target=self._reload_in_background, args=(path,))
+        thread.daemon = True
+        thread.start()
 
     def read(self, config_file, context):
-        if self.manifest is None:
-            self.manifest = read_manifest(path=conf.settings.MANIFEST_PATH)
+        path = self.get_path()
+        if not path:
+            raise ImproperlyConfigured('webpack\'s MANIFEST_PATH setting has not been defined')
+
+        if self.bundles is None or path != self._loaded_path:
+            self.load(path)
+        elif conf.settings.MANIFEST_RELOAD:
+            self.check_for_changes()
+
+        # Hold a reference, as the bundles may be swapped by another thread
+        bundles = self.bundles
 
         key = generate_key(config_file, context)
 
-        if key not in self.manifest:
+        event = instrumentation.start('manifest.read', key=key)
+        try:
+            bundle = bundles[key]
+        except KeyError:
+            instrumentation.finish(event, outcome='miss')
             raise ManifestMissingEntry(
-                'Key "{}" missing from manifest file {}"'.format(key, conf.settings.MANIFEST_PATH)
+                'Key "{}" missing from manifest file {}"'.format(key, path)
             )
+        instrumentation.finish(event, outcome='hit')
 
-        data = self.manifest[key]
-
-        return WebpackBundle(data)
\ No newline at end of file
+        return bundle
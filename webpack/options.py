@@ -1,6 +1,8 @@
+import copy
 import json
 import os
 import hashlib
+from optional_django import six
 from . import conf, __version__
 from .resolver import find_config_file
 from .exceptions import ImproperlyConfigured
@@ -9,10 +11,59 @@ from .exceptions import ImproperlyConfigured
 def _setting(overrides, key):
     if overrides and key in overrides:
         return overrides[key]
-    return getattr(conf.settings, key)
+    return conf.settings.get_snapshot()[key]
+
+
+def _freeze(obj):
+    """
+    Converts `obj` into a hashable equivalent which compares equal for equal inputs,
+    regardless of dictionary ordering. Raises a TypeError for unhashable values.
+    """
+    if isinstance(obj, dict):
+        return frozenset((key, _freeze(value)) for key, value in six.iteritems(obj))
+    if isinstance(obj, (list, tuple)):
+        return tuple(_freeze(value) for value in obj)
+    if isinstance(obj, six.string_types) or obj is None:
+        return obj
+    # Ensure that values such as True, 1 and 1.0 - which are serialized differently - are distinct
+    return type(obj), obj
 
 
 def generate_compiler_options(config_file, extra_context=None, setting_overrides=None):
+    """
+    Returns the options sent to the build server for a build of `config_file`.
+
+    Options are memoized against a snapshot of the settings and the resolved path of the
+    config file, so repeated calls with the same arguments avoid hashing the options. The
+    config file is resolved on every call, but the resolver's index is trusted for
+    CONFIG_FILE_CACHE_TTL seconds, so a memoized call typically does not touch the file system.
+    The memoized options are discarded whenever the settings are reconfigured.
+    """
+    snapshot = conf.settings.get_snapshot()
+    config_path = find_config_file(config_file)
+
+    try:
+        key = (config_path, _freeze(extra_context), _freeze(setting_overrides))
+        hash(key)
+    except TypeError:
+        key = None
+
+    options = None
+    if key is not None:
+        options = snapshot.options_cache.get(key)
+
+    if options is None:
+        options = _generate_compiler_options(snapshot, config_path, extra_context, setting_overrides)
+        if key is not None:
+            # Detach the memoized context from any values held by the caller
+            options['context'] = copy.deepcopy(options['context'])
+            snapshot.options_cache.set(key, options)
+
+    # Protect the memoized options - including the nested context - from mutation
+    return dict(options, context=copy.deepcopy(options['context']))
+
+
+def _generate_compiler_options(snapshot, config_path, extra_context=None, setting_overrides=None):
     if not _setting(setting_overrides, 'OUTPUT_ROOT'):
         raise ImproperlyConfigured('webpack.conf.settings.OUTPUT_ROOT has not been defined.')
 
@@ -20,29 +71,29 @@ def generate_compiler_options(config_file, extra_context=None, setting_overrides
         raise ImproperlyConfigured('webpack.conf.settings.STATIC_URL has not been defined.')
 
     context = {}
-    if conf.settings.CONTEXT:
-        context.update(conf.settings.CONTEXT)
+    if snapshot['CONTEXT']:
+        context.update(snapshot['CONTEXT'])
     if extra_context:
         context.update(extra_context)
 
     options = {
-        'config': find_config_file(config_file),
+        'config': config_path,
         'watch': _setting(setting_overrides, 'WATCH'),
         'cache': _setting(setting_overrides, 'CACHE'),
         'hmr': _setting(setting_overrides, 'HMR'),
         'context': context,
-        'outputPath': conf.settings.get_path_to_output_dir(),
-        'publicPath': conf.settings.get_public_path(),
+        'outputPath': snapshot.path_to_output_dir,
+        'publicPath': snapshot.public_path,
         'staticRoot': _setting(setting_overrides, 'OUTPUT_ROOT'),
         'staticUrl': _setting(setting_overrides, 'STATIC_URL'),
         'aggregateTimeout': _setting(setting_overrides, 'AGGREGATE_TIMEOUT'),
     }
 
-    if conf.settings.CACHE_DIR:
+    if snapshot['CACHE_DIR']:
         options['cacheDir'] = _setting(setting_overrides, 'CACHE_DIR')
 
     # As it defaults to `undefined` it's only defined if necessary
-    if conf.settings.POLL is not None:
+    if snapshot['POLL'] is not None:
         options['poll'] = _setting(setting_overrides, 'POLL')
 
     # Avoid collisions by directing output into unique directories
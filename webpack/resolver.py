@@ -1,21 +1,106 @@
 import os
+import threading
+from . import conf
+from .cache import _clock
 from .exceptions import ConfigFileNotFound
-from .conf import settings
 
 
-def find_config_file(config_file):
-    if not os.path.isabs(config_file) and settings.CONFIG_DIRS:
-        for dir_path in settings.CONFIG_DIRS:
+def _find_config_file(config_file, config_dirs):
+    if not os.path.isabs(config_file) and config_dirs:
+        for dir_path in config_dirs:
             abs_path = os.path.join(dir_path, config_file)
             if os.path.exists(abs_path):
                 return abs_path
 
         config_dirs = ' tried: {}'.format(
-            [os.path.join(dir_path, config_file) for dir_path in settings.CONFIG_DIRS]
+            [os.path.join(dir_path, config_file) for dir_path in config_dirs]
         )
         raise ConfigFileNotFound('{}{}'.format(config_file, config_dirs))
 
     if not os.path.exists(config_file):
         raise ConfigFileNotFound(config_file)
 
-    return config_file
\ No newline at end of file
+    return config_file
+
+
+def _get_mtime(path):
+    try:
+        return os.stat(path).st_mtime
+    except OSError:
+        return None
+
+
+class ConfigFileResolver(object):
+    """
+    Resolves config files to absolute paths and maintains an index of the results.
+
+    An indexed path is trusted for `CONFIG_FILE_CACHE_TTL` seconds. After that, it is
+    revalidated by a stat of each directory which was searched - those of every entry in
+    `CONFIG_DIRS` up to and including the match - and if any of their modification times
+    have changed, the config file is resolved again. This ensures that a file added to a
+    directory with a higher priority is picked up. Lookups which fail are never indexed.
+    """
+    def __init__(self):
+        self._index = {}
+        self._lock = threading.Lock()
+
+    def resolve(self, config_file):
+        config_dirs = conf.settings.CONFIG_DIRS
+        key = (tuple(config_dirs or ()), config_file)
+
+        entry = self._index.get(key, None)
+        if entry is not None:
+            path, mtimes, timestamp = entry
+            now = _clock()
+            if now - timestamp < conf.settings.CONFIG_FILE_CACHE_TTL:
+                return path
+            if mtimes[-1][1] is not None and all(_get_mtime(directory) == mtime for directory, mtime in mtimes):
+                with self._lock:
+                    self._index[key] = (path, mtimes, now)
+                return path
+
+        path = _find_config_file(config_file, config_dirs)
+        mtimes = [(directory, _get_mtime(directory)) for directory in self._get_searched_dirs(config_file, path)]
+
+        with self._lock:
+            self._index[key] = (path, mtimes, _clock())
+
+        return path
+
+    def _get_searched_dirs(self, config_file, path):
+        """
+        Returns the directories which were searched to resolve `config_file` to `path`, ending
+        with the directory which contains `path`.
+        """
+        config_dirs = conf.settings.CONFIG_DIRS
+        if os.path.isabs(config_file) or not config_dirs:
+            return [os.path.dirname(path)]
+
+        directories = []
+        for dir_path in config_dirs:
+            abs_path = os.path.join(dir_path, config_file)
+            directories.append(os.path.dirname(abs_path))
+            if abs_path == path:
+                break
+        return directories
+
+    def invalidate(self, config_file=None):
+        """
+        Removes `config_file` from the index. If `config_file` is None, the entire index is cleared.
+        """
+        with self._lock:
+            if config_file is None:
+                self._index.clear()
+            else:
+                for key in list(self._index.keys()):
+                    if key[1] == config_file:
+                        del self._index[key]
+
+
+resolver = ConfigFileResolver()
+
+
+def find_config_file(config_file):
+    if conf.settings.CONFIG_FILE_CACHE:
+        return resolver.resolve(config_file)
+    return _find_config_file(config_file, conf.settings.CONFIG_DIRS)
@@ -0,0 +1,285 @@
+import mimetypes
+import os
+import re
+import stat
+from email.utils import formatdate, parsedate_tz, mktime_tz
+from optional_django import six
+from . import conf
+from .compression import ENCODINGS
+
+STATUS_TEXT = {
+    200: '200 OK',
+    206: '206 Partial Content',
+    304: '304 Not Modified',
+    404: '404 Not Found',
+    405: '405 Method Not Allowed',
+    416: '416 Range Not Satisfiable',
+}
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+CHUNK_SIZE = 64 * 1024
+
+
+class Asset(object):
+    """
+    A file that can be served, along with the metadata used to build the response headers.
+    """
+    def __init__(self, path, file_stat, content_type, encoding=None):
+        self.path = path
+        self.size = file_stat.st_size
+        self.mtime = file_stat.st_mtime
+        self.content_type = content_type
+        self.encoding = encoding
+        # Each encoding of an asset is a distinct representation, so it has a distinct tag
+        self.etag = '"{:x}-{:x}{}"'.format(int(file_stat.st_mtime * 1000000), file_stat.st_size,
+                                           '-' + encoding if encoding else '')
+        self.last_modified = formatdate(file_stat.st_mtime, usegmt=True)
+
+
+class Response(object):
+    """
+    A framework agnostic description of a response. If `asset` is defined, the body is the
+    `length` bytes of the asset's file which start at `offset`.
+    """
+    def __init__(self, status, headers=None, asset=None, offset=0, length=0):
+        self.status = status
+        self.headers = headers or []
+        self.asset = asset
+        self.offset = offset
+        self.length = length
+
+
+def _stat_file(path):
+    try:
+        file_stat = os.stat(path)
+    except OSError:
+        return None
+    if not stat.S_ISREG(file_stat.st_mode):
+        return None
+    return file_stat
+
+
+def parse_accept_encoding(header):
+    """
+    Returns a dictionary mapping the encodings in an Accept-Encoding header to their quality values.
+    """
+    accepted = {}
+    for item in (header or '').split(','):
+        parts = item.strip().split(';')
+        encoding = parts[0].strip().lower()
+        if not encoding:
+            continue
+        quality = 1.0
+        for param in parts[1:]:
+            name, _, value = param.strip().partition('=')
+            if name.strip() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        accepted[encoding] = quality
+    return accepted
+
+
+def parse_range(header, size):
+    """
+    Returns the (offset, length) of a single byte range, None if the header should be ignored,
+    or False if the range cannot be satisfied.
+    """
+    match = RANGE_RE.match(header.strip())
+    # Multiple ranges and other units are ignored, and the full content is served
+    if not match:
+        return None
+
+    start, end = match.groups()
+    if not start and not end:
+        return None
+
+    if not start:
+        length = min(int(end), size)
+        if length == 0:
+            return False
+        return size - length, length
+
+    start = int(start)
+    end = min(int(end), size - 1) if end else size - 1
+    if start >= size or end < start:
+        return False
+    return start, end - start + 1
+
+
+def _etag_matches(header, etag):
+    if header.strip() == '*':
+        return True
+    tags = [tag.strip() for tag in header.split(',')]
+    # If-None-Match uses weak comparison
+    return etag in tags or 'W/' + etag in tags
+
+
+class AssetServer(object):
+    """
+    Serves the assets in `root` - which defaults to webpack's output directory - with headers
+    suited to files whose names are unique to their content:
+
+    - far-future, immutable Cache-Control headers
+    - strong ETags, with conditional requests answered by 304 responses
+    - single byte ranges
+    - pre-compressed copies of assets - see the COMPRESS_ASSETS setting - which are selected by
+      the request's Accept-Encoding header
+
+    Instances are WSGI applications, which serve the path in PATH_INFO after removing `prefix`.
+    Files are sent via the server's `wsgi.file_wrapper`, allowing zero-copy transfers.
+    """
+    def __init__(self, root=None, prefix='', max_age=None):
+        self.root = root
+        self.prefix = prefix
+        self.max_age = max_age
+
+    def get_root(self):
+        return os.path.abspath(self.root or conf.settings.get_path_to_output_dir())
+
+    def get_cache_control(self):
+        max_age = self.max_age
+        if max_age is None:
+            max_age = conf.settings.SERVE_MAX_AGE
+        return 'public, max-age={}, immutable'.format(max_age)
+
+    def resolve(self, name):
+        """
+        Returns the absolute path of `name` within the root, or None if it lies outside of the root.
+        """
+        root = self.get_root()
+        parts = [part for part in name.replace('\\', '/').split('/') if part and part != '.']
+        if '..' in parts:
+            return None
+        path = os.path.join(root, *parts)
+        if not path.startswith(root + os.sep):
+            return None
+        return path
+
+    def find_asset(self, name, accept_encoding=None):
+        """
+        Returns the representation of `name` which best matches `accept_encoding`, and a flag
+        indicating that compressed copies of the asset exist.
+        """
+        path = self.resolve(name)
+        if path is None:
+            return None, False
+
+        file_stat = _stat_file(path)
+        if file_stat is None:
+            return None, False
+
+        content_type = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+        accepted = parse_accept_encoding(accept_encoding)
+
+        has_variants = False
+        for encoding, extension in ENCODINGS:
+            variant_stat = _stat_file(path + extension)
+            if variant_stat is None:
+                continue
+            has_variants = True
+            if accepted.get(encoding, accepted.get('*', 0)) > 0:
+                return Asset(path + extension, variant_stat, content_type, encoding), True
+
+        return Asset(path, file_stat, content_type), has_variants
+
+    def get_response(self, method, name, headers):
+        """
+        Returns a Response for a request of `name`. `headers` should be a dictionary of the
+        request's headers, keyed by their lowercased names.
+        """
+        if method not in ('GET', 'HEAD'):
+            return Response(405, [('Allow', 'GET, HEAD'), ('Content-Length', '0')])
+
+        range_header = headers.get('range', None)
+        # Ranges are served from the uncompressed file, so that offsets are consistent between requests
+        accept_encoding = None if range_header else headers.get('accept-encoding', None)
+
+        asset, has_variants = self.find_asset(name, accept_encoding)
+        if asset is None:
+            return Response(404, [('Content-Length', '0')])
+
+        response_headers = [
+            ('Cache-Control', self.get_cache_control()),
+            ('ETag', asset.etag),
+            ('Last-Modified', asset.last_modified),
+        ]
+        if has_variants:
+            response_headers.append(('Vary', 'Accept-Encoding'))
+
+        if_none_match = headers.get('if-none-match', None)
+        if if_none_match is not None:
+            if _etag_matches(if_none_match, asset.etag):
+                return Response(304, response_headers)
+        else:
+            if_modified_since = headers.get('if-modified-since', None)
+            if if_modified_since:
+                parsed = parsedate_tz(if_modified_since)
+                if parsed is not None and int(asset.mtime) <= mktime_tz(parsed):
+                    return Response(304, response_headers)
+
+        response_headers.append(('Content-Type', asset.content_type))
+        response_headers.append(('Accept-Ranges', 'bytes'))
+        if asset.encoding:
+            response_headers.append(('Content-Encoding', asset.encoding))
+
+        if range_header:
+            if_range = headers.get('if-range', None)
+            if if_range is None or if_range.strip() == asset.etag:
+                byte_range = parse_range(range_header, asset.size)
+                if byte_range is False:
+                    response_headers.append(('Content-Range', 'bytes */{}'.format(asset.size)))
+                    response_headers.append(('Content-Length', '0'))
+                    return Response(416, response_headers)
+                if byte_range is not None:
+                    offset, length = byte_range
+                    response_headers.append(
+                        ('Content-Range', 'bytes {}-{}/{}'.format(offset, offset + length - 1, asset.size))
+                    )
+                    response_headers.append(('Content-Length', str(length)))
+                    return Response(206, response_headers, asset, offset, length)
+
+        response_headers.append(('Content-Length', str(asset.size)))
+        return Response(200, response_headers, asset, 0, asset.size)
+
+    def __call__(self, environ, start_response):
+        name = environ.get('PATH_INFO', '')
+        if self.prefix:
+            if not name.startswith(self.prefix):
+                start_response(STATUS_TEXT[404], [('Content-Length', '0')])
+                return []
+            name = name[len(self.prefix):]
+
+        headers = dict(
+            (key[5:].replace('_', '-').lower(), value)
+            for key, value in six.iteritems(environ) if key.startswith('HTTP_')
+        )
+
+        response = self.get_response(environ.get('REQUEST_METHOD', 'GET'), name, headers)
+        start_response(STATUS_TEXT[response.status], response.headers)
+
+        if response.asset is None or environ.get('REQUEST_METHOD') == 'HEAD':
+            return []
+
+        asset_file = open(response.asset.path, 'rb')
+        if response.status == 200 and 'wsgi.file_wrapper' in environ:
+            return environ['wsgi.file_wrapper'](asset_file, CHUNK_SIZE)
+        return iter_file(asset_file, response.offset, response.length)
+
+
+def iter_file(asset_file, offset, length, chunk_size=CHUNK_SIZE):
+    """
+    Yields `length` bytes of `asset_file`, starting at `offset`, and closes the file once complete.
+    """
+    try:
+        asset_file.seek(offset)
+        while length > 0:
+            chunk = asset_file.read(min(chunk_size, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+    finally:
+        asset_file.close()
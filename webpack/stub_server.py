@@ -0,0 +1,156 @@
+import argparse
+import hashlib
+import json
+import threading
+import time
+from optional_django.six.moves import BaseHTTPServer, socketserver
+
+
+class StubRequestHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    # Avoid the delayed acknowledgements which would otherwise add ~40ms to each response
+    disable_nagle_algorithm = True
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        body = self.rfile.read(length).decode('utf-8')
+        stub = self.server.stub
+
+        if stub.latency:
+            time.sleep(stub.latency)
+
+        stub.record_request()
+
+        content = json.dumps(stub.get_response(json.loads(body) if body else {})).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, *args):
+        pass
+
+
+class ThreadedHTTPServer(socketserver.ThreadingMixIn, BaseHTTPServer.HTTPServer):
+    daemon_threads = True
+
+
+class StubBuildServer(object):
+    """
+    A stand-in for webpack-build's server which responds to build requests without running webpack.
+
+    Each response describes `entries` bundles, is delayed by `latency` seconds and is padded
+    with fake module records to roughly `size` bytes. Intended for benchmarks and load tests
+    where the cost of webpack itself would drown out the cost of python-webpack.
+
+        with StubBuildServer(latency=0.05) as server:
+            webpack('path/to/webpack.config.js', settings={'BUILD_URL': server.url})
+    """
+    def __init__(self, host='127.0.0.1', port=0, latency=0, size=0, entries=1):
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.size = size
+        self.entries = entries
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._server = None
+        self._thread = None
+
+    @property
+    def url(self):
+        return 'http://{}:{}/build'.format(self.host, self.port)
+
+    def start(self):
+        self._server = ThreadedHTTPServer((self.host, self.port), StubRequestHandler)
+        self._server.stub = self
+        # Binding to port 0 selects an unused port
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever)
+        self._thread.daemon = True
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._thread.join()
+            self._server = None
+            self._thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *args):
+        self.stop()
+
+    def record_request(self):
+        with self._lock:
+            self.requests += 1
+
+    def get_response(self, options):
+        """
+        Returns the JSON-serializable response to a build request with `options`.
+        """
+        if not options.get('config', None):
+            return {'error': 'webpack-build: Config file not defined', 'data': None}
+
+        build_hash = hashlib.md5(json.dumps(options, sort_keys=True).encode('utf-8')).hexdigest()[:20]
+        output_path = options.get('outputPath', '')
+        public_path = options.get('publicPath', '')
+
+        output = {}
+        urls = {}
+        assets = []
+        for i in range(self.entries):
+            name = 'main' if i == 0 else 'entry_{}'.format(i)
+            filename = '{}-{}.js'.format(name, build_hash)
+            path = '{}/{}'.format(output_path, filename)
+            assets.append(path)
+            output[name] = {'js': [path], 'css': []}
+            urls[name] = {'js': ['{}/{}'.format(public_path, filename)], 'css': []}
+
+        data = {
+            'stats': {'hash': build_hash, 'warnings': [], 'errors': [], 'modules': []},
+            'assets': assets,
+            'output': output,
+            'urls': urls,
+            'outputOptions': {'path': output_path, 'publicPath': public_path + '/'},
+            'buildOptions': options,
+        }
+
+        padding = self.size - len(json.dumps(data))
+        if padding > 0:
+            module = {'identifier': '/stub/module_000000.js', 'name': './module_000000.js'}
+            # Account for the separator between records
+            count = padding // (len(json.dumps(module)) + 2)
+            data['stats']['modules'] = [
+                {'identifier': '/stub/module_{:06d}.js'.format(i), 'name': './module_{:06d}.js'.format(i)}
+                for i in range(count)
+            ]
+
+        return {'error': None, 'data': data}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Run a stand-in for webpack-build\'s server')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=9009)
+    parser.add_argument('--latency', type=float, default=0, help='Seconds to wait before each response')
+    parser.add_argument('--size', type=int, default=0, help='Approximate size of each response, in bytes')
+    parser.add_argument('--entries', type=int, default=1, help='Number of entries in each bundle')
+    args = parser.parse_args(argv)
+
+    server = StubBuildServer(args.host, args.port, args.latency, args.size, args.entries).start()
+    print('Stub build server listening at {}'.format(server.url))
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -8,7 +8,7 @@ register = Library()
 
 
 @register.assignment_tag(name='webpack')
-def webpack_template_tag(path_to_config):
+def webpack_template_tag(path_to_config, entries=None, js_mode=None, css_mode=None):
     """
     A template tag that will output a webpack bundle.
 
@@ -21,12 +21,31 @@ def webpack_template_tag(path_to_config):
         {{ bundle.render_css|safe }}
 
         {{ bundle.render_js|safe }}
-    """
 
-    # TODO: allow selection of entries
+    To only render the elements for specific entries, provide the `entries` argument as either an
+    entry's name, a comma-separated list of names, or a list of names.
+
+        {% webpack 'path/to/webpack.config.js' entries='main,admin' as bundle %}
+
+    Scripts can be rendered with the `async` or `defer` attributes by providing the `js_mode` argument.
+    Small scripts and stylesheets can be inlined by setting `js_mode` or `css_mode` to 'inline'.
+    Resource hints are available via the `render_preload`, `render_modulepreload` and `render_prefetch`
+    methods, where prefetching applies to the entries that were not selected.
+
+        {% webpack 'path/to/webpack.config.js' entries='main' js_mode='defer' as bundle %}
+
+        {{ bundle.render_preload|safe }}
+
+        {{ bundle.render_prefetch|safe }}
+    """
 
     # Django's template system silently fails on some exceptions
     try:
-        return webpack(path_to_config)
+        bundle = webpack(path_to_config)
+        if entries or js_mode or css_mode:
+            if isinstance(entries, six.string_types):
+                entries = [entry.strip() for entry in entries.split(',')]
+            bundle = bundle.select(entries or None, js_mode=js_mode or None, css_mode=css_mode or None)
+        return bundle
     except (AttributeError, ValueError) as e:
-        raise six.reraise(BundlingError, BundlingError(*e.args), sys.exc_info()[2])
\ No newline at end of file
+        raise six.reraise(BundlingError, BundlingError(*e.args), sys.exc_info()[2])